@@ -0,0 +1,235 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+from mundo import compor_cena, matriz_rotacao_y, matriz_translacao
+from solidos.spline_hermite import SplineHermite
+from camera import Camera
+from rasterizacao import rasterizar_quadro
+
+# --- Sequências Animadas (Fly-through) ---
+# Os quadros são produzidos sob demanda por um gerador e entregues a um escritor
+# com buffer duplo: enquanto uma thread grava o quadro N no disco, o quadro N+1
+# já está sendo rasterizado. Só existem dois framebuffers de saída em memória,
+# então o consumo não depende do tamanho da sequência.
+
+def caminho_camera_hermite(P0, P1, T0, T1, num_quadros, velocidade_constante=False):
+    """
+    Gera as posições da câmera ao longo de uma curva de Hermite.
+
+    Args:
+        velocidade_constante (bool): Se True, as posições ficam igualmente
+                                     espaçadas em comprimento de arco (a câmera
+                                     não acelera onde a curva se estica); se
+                                     False, igualmente espaçadas no parâmetro.
+
+    Returns:
+        np.array: Array (num_quadros, 3) com uma posição de câmera por quadro.
+    """
+    spline = SplineHermite([P0, P1], [T0, T1])
+    return spline.amostrar(num_quadros, uniforme=velocidade_constante)
+
+def transformar_por_objeto(vertices, objeto_de_vertice, matrizes):
+    """
+    Aplica uma matriz 4x4 diferente a cada objeto da cena.
+
+    Args:
+        vertices (np.array): Array (N, 3) de vértices da cena.
+        objeto_de_vertice (np.array): Array (N,) com o índice do objeto de cada vértice.
+        matrizes (np.array): Array (K, 4, 4) com uma matriz por objeto.
+
+    Returns:
+        np.array: Novo array (N, 3) com os vértices transformados.
+    """
+    matrizes = np.asarray(matrizes, dtype=float)
+    # Vértices de objetos sem matriz ficam como estão
+    resultado = np.array(vertices, dtype=float)
+    for k in range(matrizes.shape[0]):
+        selecao = objeto_de_vertice == k
+        resultado[selecao] = vertices[selecao] @ matrizes[k, :3, :3].T + matrizes[k, :3, 3]
+    return resultado
+
+def gerar_quadros(vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha,
+                  caminho_camera, ponto_alvo, up_mundo, res, objeto_de_vertice=None,
+                  transformacoes=None, sombreamento='flat', direcao_luz=(-0.3, -0.5, -1.0)):
+    """
+    Gerador preguiçoso de quadros de uma sequência.
+
+    Args:
+        vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha:
+            Cena como devolvida por compor_cena().
+        caminho_camera (np.array): Array (Q, 3) com a posição da câmera em cada quadro.
+        ponto_alvo (np.array): Alvo fixo (3,) ou um alvo por quadro (Q, 3).
+        up_mundo (np.array): Vetor "para cima" do mundo.
+        res (int): Resolução (res x res) dos quadros.
+        objeto_de_vertice (np.array, opcional): Índice do objeto de cada vértice.
+        transformacoes (callable, opcional): Função que recebe o índice do quadro e
+            devolve um array (K, 4, 4) com a transformação de cada objeto.
+        sombreamento (str): Repassado para rasterizar_quadro.
+
+    Yields:
+        np.array: Quadro RGB (res, res, 3) em uint8, com a linha 0 no topo da imagem.
+    """
+    ponto_alvo = np.asarray(ponto_alvo, dtype=float)
+    faces_array = np.asarray(faces_cena)
+    caminho_camera = np.asarray(caminho_camera, dtype=float)
+    # Uma única câmera para a sequência: a projeção fica em cache entre os quadros
+    camera = Camera(caminho_camera[0], ponto_alvo[0] if ponto_alvo.ndim == 2 else ponto_alvo, up_mundo)
+    for i, camera_pos in enumerate(caminho_camera):
+        vertices = vertices_cena
+        if transformacoes is not None:
+            vertices = transformar_por_objeto(vertices_cena, objeto_de_vertice, transformacoes(i))
+        camera.posicao = camera_pos
+        camera.alvo = ponto_alvo[i] if ponto_alvo.ndim == 2 else ponto_alvo
+
+        framebuffer = rasterizar_quadro(vertices, faces_array, cores_faces, vertices_linha, arestas_linha,
+                                        None, None, None, res, sombreamento=sombreamento,
+                                        direcao_luz=direcao_luz, camera=camera)
+        # O framebuffer tem a origem embaixo (como no imshow com origin='lower');
+        # arquivos de imagem e vídeo esperam a primeira linha no topo.
+        yield (framebuffer[::-1] * 255 + 0.5).astype(np.uint8)
+
+class EscritorQuadros:
+    """
+    Escritor de quadros com buffer duplo e gravação em uma thread separada.
+
+    Formatos:
+        'raw': um único arquivo com os quadros RGB24 concatenados (ex.: para
+               'ffmpeg -f rawvideo -pix_fmt rgb24 -s LxA -i arquivo.rgb').
+        'ppm': uma sequência de imagens PPM (quadro_00000.ppm, ...) em um diretório.
+    """
+
+    def __init__(self, destino, largura, altura, formato='raw'):
+        if formato not in ('raw', 'ppm'):
+            raise ValueError(f"Formato desconhecido: {formato}")
+        self.destino = destino
+        self.formato = formato
+        self.forma = (altura, largura, 3)
+        self.quadros_gravados = 0
+
+        # Dois buffers pré-alocados circulam entre o renderizador e a thread de gravação
+        self._livres = queue.Queue()
+        self._prontos = queue.Queue()
+        for _ in range(2):
+            self._livres.put(np.empty(self.forma, dtype=np.uint8))
+
+        if formato == 'raw':
+            self._arquivo = open(destino, 'wb')
+        else:
+            os.makedirs(destino, exist_ok=True)
+            self._arquivo = None
+        self._erro = None
+        self._fechado = False
+        self._thread = threading.Thread(target=self._gravar, daemon=True)
+        self._thread.start()
+
+    def escrever(self, quadro):
+        """Copia o quadro para um buffer livre e o entrega para gravação."""
+        if self._fechado:
+            # Depois do sinal de parada nenhuma thread consumiria o quadro
+            raise ValueError("Escrita em um EscritorQuadros já fechado")
+        if self._erro is not None:
+            raise self._erro
+        buffer = self._livres.get()  # Bloqueia se os dois buffers ainda estão em uso
+        try:
+            np.copyto(buffer, quadro)
+        except Exception:
+            self._livres.put(buffer)
+            raise
+        self._prontos.put(buffer)
+
+    def _gravar(self):
+        while True:
+            buffer = self._prontos.get()
+            if buffer is None:
+                break
+            try:
+                if self.formato == 'raw':
+                    self._arquivo.write(buffer.tobytes())
+                else:
+                    caminho = os.path.join(self.destino, f"quadro_{self.quadros_gravados:05d}.ppm")
+                    with open(caminho, 'wb') as arquivo:
+                        arquivo.write(f"P6 {self.forma[1]} {self.forma[0]} 255\n".encode('ascii'))
+                        arquivo.write(buffer.tobytes())
+                self.quadros_gravados += 1
+            except Exception as erro:
+                # Qualquer falha fica guardada e é relançada em escrever/fechar: a
+                # thread continua devolvendo os buffers, então ninguém fica bloqueado
+                self._erro = erro
+            finally:
+                self._livres.put(buffer)
+
+    def fechar(self):
+        """Espera a gravação dos quadros pendentes e fecha o destino."""
+        if self._fechado:
+            return
+        self._fechado = True
+        self._prontos.put(None)
+        self._thread.join()
+        if self._arquivo is not None:
+            self._arquivo.close()
+        if self._erro is not None:
+            raise self._erro
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+def renderizar_sequencia(quadros, escritor):
+    """
+    Consome um gerador de quadros, gravando cada um no escritor.
+
+    Returns:
+        dict: Estatísticas com o número de quadros, o tempo total (s) e os
+              quadros por segundo sustentados (incluindo a gravação).
+    """
+    inicio = time.perf_counter()
+    num_quadros = 0
+    for quadro in quadros:
+        escritor.escrever(quadro)
+        num_quadros += 1
+    escritor.fechar()
+    segundos = time.perf_counter() - inicio
+    return {
+        'quadros': num_quadros,
+        'segundos': segundos,
+        'quadros_por_segundo': num_quadros / segundos if segundos > 0 else float('inf'),
+    }
+
+if __name__ == '__main__':
+
+    vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha = compor_cena()
+
+    # Cada objeto de compor_cena tem uma cor própria: usamos a cor para saber a
+    # qual objeto cada vértice pertence (0 = caixa, 1 = cilindro, ...).
+    nomes_objetos = ['gray', 'cornflowerblue', 'lightgreen', 'deepskyblue']
+    objeto_da_face = np.array([nomes_objetos.index(cor) for cor in cores_faces])
+    objeto_de_vertice = np.zeros(len(vertices_cena), dtype=np.int64)
+    objeto_de_vertice[np.asarray(faces_cena).ravel()] = np.repeat(objeto_da_face, 3)
+
+    # O cilindro gira em torno do próprio eixo; os demais objetos ficam parados
+    centro_cilindro = np.array([5, 0, 5])
+    def transformacoes(indice_quadro):
+        matrizes = np.tile(np.eye(4), (len(nomes_objetos), 1, 1))
+        matrizes[1] = (matriz_translacao(*centro_cilindro) @ matriz_rotacao_y(3 * indice_quadro)
+                       @ matriz_translacao(*-centro_cilindro))
+        return matrizes
+
+    # Fly-through: a câmera percorre uma curva de Hermite olhando para a origem
+    num_quadros, res = 120, 250
+    caminho = caminho_camera_hermite([15, 13, 12], [-12, 14, 10], [-20, 10, 0], [-10, -20, 0], num_quadros,
+                                     velocidade_constante=True)
+
+    quadros = gerar_quadros(vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha,
+                            caminho, np.array([0, 0, 0]), np.array([0, 0, 1]), res,
+                            objeto_de_vertice=objeto_de_vertice, transformacoes=transformacoes)
+    with EscritorQuadros('fly_through.rgb', res, res, formato='raw') as escritor:
+        estatisticas = renderizar_sequencia(quadros, escritor)
+
+    print(f"{estatisticas['quadros']} quadros {res}x{res} em {estatisticas['segundos']:.2f} s "
+          f"({estatisticas['quadros_por_segundo']:.1f} quadros/s)")
+    print(f"Para converter: ffmpeg -f rawvideo -pix_fmt rgb24 -s {res}x{res} -r 30 -i fly_through.rgb fly_through.mp4")
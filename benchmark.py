@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+
+from mundo import compor_cena, aplicar_transformacao
+from camera import Camera, matriz_visao
+from buffer_profundidade import projetar_vertices, rasterizar_triangulos, faces_na_frente
+from cena_2d import projetar_poligonos_2d
+from rasterizacao import rasterizar_quadro
+from cenas_sinteticas import cena_sintetica
+from construtor_cena import planta_aleatoria
+import nucleos
+
+# --- Benchmark Reprodutível do Pipeline Gráfico ---
+# Mede cada etapa pública do pipeline em cenas sintéticas de vários tamanhos e em
+# várias resoluções, grava os resultados em JSON e compara com uma baseline
+# armazenada, acusando regressões acima de um limite relativo. A baseline
+# versionada fica em referencias/baseline_benchmark.json (com os metadados da
+# máquina em que foi medida) e é a usada por padrão.
+#
+# Uso:
+#   python benchmark.py                                    # compara com a baseline versionada
+#   python benchmark.py --baseline baseline.json --limite 0.15
+#   python benchmark.py --salvar-baseline referencias/baseline_benchmark.json
+#   python benchmark.py --backends   # compara os backends de nucleos.py
+#
+# rasterizar_cena_resolucoes só acrescenta a exibição no matplotlib ao laço de
+# rasterizar_quadro, então o benchmark mede rasterizar_quadro por resolução.
+
+BASELINE_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'referencias',
+                               'baseline_benchmark.json')
+
+CAMERA = (np.array([15.0, 13.0, 12.0]), np.array([0.0, 0.0, 0.0]), np.array([0.0, 0.0, 1.0]))
+
+def cronometrar(funcao, repeticoes=5, aquecimento=1):
+    """
+    Executa a função várias vezes e devolve as estatísticas dos tempos (s).
+    A mediana é a métrica usada para comparar com a baseline; o mínimo é o
+    tempo menos perturbado por ruído do sistema.
+    """
+    for _ in range(aquecimento):
+        funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tempos = np.array(tempos)
+    return {'mediana_s': float(np.median(tempos)), 'minimo_s': float(tempos.min()),
+            'desvio_s': float(tempos.std()), 'repeticoes': repeticoes}
+
+def executar_benchmarks(tamanhos=(1, 10, 50), resolucoes=(100, 250, 800), tesselacoes=(10, 30, 100),
+                        repeticoes=5, incluir_pintor=True):
+    """
+    Executa todos os benchmarks.
+
+    Args:
+        tamanhos (tuple): Números de instâncias de cada sólido nas cenas sintéticas.
+        resolucoes (tuple): Resoluções usadas na rasterização.
+        tesselacoes (tuple): Números de anéis do cano curvado no benchmark de modelagem.
+        repeticoes (int): Repetições por medição.
+        incluir_pintor (bool): Mede também o caminho do pintor (lento em cenas grandes).
+
+    Returns:
+        dict: {nome_do_caso: estatísticas}, com nomes estáveis entre execuções.
+    """
+    resultados = {}
+
+    def medir(nome, funcao, **extras):
+        resultados[nome] = cronometrar(funcao, repeticoes)
+        resultados[nome].update(extras)
+        print(f"{nome:<52}{resultados[nome]['mediana_s'] * 1000:>10.2f} ms")
+
+    medir('compor_cena', compor_cena)
+    medir('matriz_visao', lambda: matriz_visao(*CAMERA))
+
+    for segmentos in tesselacoes:
+        medir(f'cena_sintetica/instancias=1/segmentos={segmentos}',
+              lambda: cena_sintetica(1, segmentos_curva=segmentos), segmentos=segmentos)
+
+    mat_view = matriz_visao(*CAMERA)
+    for n in tamanhos:
+        cena = cena_sintetica(n)
+        vertices, faces, cores, v_linha, a_linha = cena
+        extras = {'instancias': n, 'vertices': len(vertices), 'faces': len(faces)}
+
+        medir(f'aplicar_transformacao/instancias={n}', lambda: aplicar_transformacao(vertices, mat_view), **extras)
+        medir(f'projetar_poligonos_2d/instancias={n}', lambda: projetar_poligonos_2d(vertices, faces, cores, *CAMERA),
+              **extras)
+        for res in resolucoes:
+            medir(f'rasterizar_quadro/zbuffer/instancias={n}/res={res}',
+                  lambda: rasterizar_quadro(*cena, *CAMERA, res, sombreamento='flat'), res=res, **extras)
+            if incluir_pintor:
+                medir(f'rasterizar_quadro/pintor/instancias={n}/res={res}',
+                      lambda: rasterizar_quadro(*cena, *CAMERA, res), res=res, **extras)
+    return resultados
+
+def comparar_backends(repeticoes=3):
+    """
+    Compara os backends de nucleos.py disponíveis na geração das malhas, no
+    núcleo rasterizar_triangulos e no quadro flat inteiro, e confere que os
+    buffers e os framebuffers saem idênticos. Restaura o backend 'numpy' no fim.
+    """
+    disponiveis = nucleos.backends_disponiveis()
+    print(f"backends disponíveis: {disponiveis} ({os.cpu_count()} CPUs)")
+    casos = {
+        'compor_cena': (compor_cena, Camera((15.0, 13.0, 12.0), (0.0, 0.0, 0.0))),
+        'cena_sintetica(20)': (lambda: cena_sintetica(20), Camera((40.0, 34.0, 30.0), (0.0, 0.0, 0.0))),
+        'planta_aleatoria(1000)': (lambda: planta_aleatoria(1000, extensao=12.0).cena(),
+                                   Camera((40.0, 34.0, 30.0), (0.0, 0.0, 0.0))),
+    }
+
+    def minimo(funcao):
+        return cronometrar(funcao, repeticoes)['minimo_s']
+
+    for nome, (montar, camera) in casos.items():
+        tempos_malha = {}
+        for nome_backend in disponiveis:
+            nucleos.usar_backend(nome_backend)
+            tempos_malha[nome_backend] = minimo(montar)
+        cena = montar()
+        vertices, faces = cena[0], np.asarray(cena[1])
+        print(f"\n{nome}: {len(faces)} faces; geração da malha "
+              + ', '.join(f"{b} {t * 1000:.1f} ms" for b, t in tempos_malha.items()))
+        for res in (250, 800):
+            pontos, z, w = projetar_vertices(vertices, camera.visao_projecao, res, res)
+            validos = faces_na_frente(w, faces)
+            tempos, saidas = {}, {}
+            for nome_backend in disponiveis:
+                nucleos.usar_backend(nome_backend)
+                def nucleo_raster():
+                    return rasterizar_triangulos(pontos, z, faces, res, res, validos=validos)
+                def quadro():
+                    return rasterizar_quadro(*cena, None, None, None, res, sombreamento='flat', camera=camera)
+                tempos[nome_backend] = (minimo(nucleo_raster), minimo(quadro))
+                saidas[nome_backend] = nucleo_raster() + (quadro(),)
+            nucleos.usar_backend('numpy')
+            iguais = all(np.array_equal(a, b) for saida in saidas.values() for a, b in zip(saidas['numpy'], saida))
+            print(f"  {res} px (buffers e framebuffers idênticos: {iguais})")
+            for nome_backend, (t_raster, t_quadro) in tempos.items():
+                print(f"    {nome_backend:<6} rasterizar_triangulos {t_raster * 1000:8.1f} ms "
+                      f"({tempos['numpy'][0] / t_raster:5.1f}x), quadro flat {t_quadro * 1000:8.1f} ms")
+
+def metadados():
+    return {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+def comparar_com_baseline(resultados, baseline, limite=0.10):
+    """
+    Compara as medianas com a baseline.
+
+    Returns:
+        list: Tuplas (caso, mediana_baseline_s, mediana_atual_s, variacao) dos casos
+              que ficaram mais lentos que baseline * (1 + limite).
+    """
+    regressoes = []
+    for nome, atual in resultados.items():
+        referencia = baseline.get(nome)
+        if referencia is None:
+            continue
+        variacao = atual['mediana_s'] / referencia['mediana_s'] - 1
+        if variacao > limite:
+            regressoes.append((nome, referencia['mediana_s'], atual['mediana_s'], variacao))
+    return regressoes
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline gráfico")
+    parser.add_argument('--saida', default='resultados_benchmark.json', help="Arquivo JSON de resultados")
+    parser.add_argument('--baseline', default=BASELINE_PADRAO,
+                        help="Arquivo JSON de baseline para comparação ('' desativa a comparação)")
+    parser.add_argument('--salvar-baseline', help="Grava os resultados também como nova baseline")
+    parser.add_argument('--limite', type=float, default=0.10, help="Regressão relativa tolerada (0.10 = 10%%)")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--rapido', action='store_true', help="Cenas e resoluções menores, sem o pintor")
+    parser.add_argument('--backends', action='store_true',
+                        help="Só compara os backends dos núcleos (ver nucleos.py)")
+    args = parser.parse_args()
+
+    if args.backends:
+        comparar_backends()
+        sys.exit(0)
+
+    if args.rapido:
+        resultados = executar_benchmarks(tamanhos=(1, 10), resolucoes=(100, 250), tesselacoes=(10, 30),
+                                         repeticoes=args.repeticoes, incluir_pintor=False)
+    else:
+        resultados = executar_benchmarks(repeticoes=args.repeticoes)
+
+    documento = {'metadados': metadados(), 'resultados': resultados}
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(documento, arquivo, indent=2)
+    if args.salvar_baseline:
+        with open(args.salvar_baseline, 'w', encoding='utf-8') as arquivo:
+            json.dump(documento, arquivo, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as arquivo:
+            baseline = json.load(arquivo)['resultados']
+        regressoes = comparar_com_baseline(resultados, baseline, args.limite)
+        if regressoes:
+            print(f"\n{len(regressoes)} regressão(ões) acima de {args.limite:.0%}:")
+            for nome, antes, depois, variacao in regressoes:
+                print(f"  {nome}: {antes * 1000:.2f} ms -> {depois * 1000:.2f} ms (+{variacao:.0%})")
+            sys.exit(1)
+        print(f"\nSem regressões acima de {args.limite:.0%} em relação à baseline.")
@@ -0,0 +1,290 @@
+import numpy as np
+
+import nucleos
+
+# --- Rasterizador de Triângulos com Buffer de Profundidade (Z-Buffer) ---
+# Todo o trabalho é feito em lotes NumPy: cada triângulo gera os "fragmentos"
+# (pixels candidatos) da sua caixa envolvente, as coordenadas baricêntricas
+# decidem quais estão dentro, e a resolução de profundidade escolhe, para cada
+# pixel, o fragmento mais próximo. Nenhum laço Python percorre faces ou pixels.
+
+def projetar_vertices(vertices, mat_transform, largura, altura):
+    """
+    Leva vértices do mundo até as coordenadas de tela (pixels).
+
+    Args:
+        vertices (np.array): Array (N, 3) de vértices no mundo.
+        mat_transform (np.array): Matriz 4x4 (projeção @ visão).
+        largura (int): Largura da tela em pixels.
+        altura (int): Altura da tela em pixels.
+
+    Returns:
+        tuple: (pontos_tela, profundidade, w).
+               - pontos_tela: array (N, 2) com as coordenadas (x, y) em pixels.
+               - profundidade: array (N,) com o Z em Coordenadas Normalizadas [-1, 1].
+               - w: array (N,) com a coordenada homogênea (distância à câmera).
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    v_homogeneos = np.hstack((vertices, np.ones((vertices.shape[0], 1))))
+    v_clip = v_homogeneos @ np.asarray(mat_transform, dtype=float).T
+    w = v_clip[:, 3]
+
+    # Vértices atrás da câmera (w <= 0) geram infinitos aqui; os triângulos
+    # que os usam são descartados em rasterizar_triangulos.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v_cn = v_clip[:, :3] / w[:, np.newaxis]
+
+    # Mesmo mapeamento usado em rasterizacao.py: [-1, 1] -> [0, res-1]
+    pontos_tela = np.empty((vertices.shape[0], 2))
+    pontos_tela[:, 0] = (v_cn[:, 0] + 1) / 2 * (largura - 1)
+    pontos_tela[:, 1] = (v_cn[:, 1] + 1) / 2 * (altura - 1)
+    return pontos_tela, v_cn[:, 2], w
+
+def _coeficientes_arestas(tri):
+    """
+    Calcula os coeficientes das funções de aresta E_i(x, y) = A_i*x + B_i*y + C_i
+    de cada triângulo, já normalizados pela área (E_i é a coordenada baricêntrica i).
+    Também devolve, por aresta, se ela é "topo-esquerda" (regra de preenchimento).
+    """
+    x0, y0 = tri[:, 0, 0], tri[:, 0, 1]
+    x1, y1 = tri[:, 1, 0], tri[:, 1, 1]
+    x2, y2 = tri[:, 2, 0], tri[:, 2, 1]
+    area = (x1 - x0) * (y2 - y0) - (x2 - x0) * (y1 - y0)
+
+    # A aresta i é a oposta ao vértice i: (v1->v2), (v2->v0), (v0->v1)
+    A = np.stack((y1 - y2, y2 - y0, y0 - y1), axis=1)
+    B = np.stack((x2 - x1, x0 - x2, x1 - x0), axis=1)
+    C = np.stack((x1 * y2 - x2 * y1, x2 * y0 - x0 * y2, x0 * y1 - x1 * y0), axis=1)
+
+    # Regra topo-esquerda: com o triângulo orientado com área positiva, uma aresta
+    # compartilhada é percorrida em sentidos opostos pelos dois vizinhos, então
+    # exatamente um deles fica com os pixels que caem em cima dela.
+    sinal = np.sign(area)[:, None]
+    dx = B * sinal
+    dy = -A * sinal
+    topo_esquerda = (dy < 0) | ((dy == 0) & (dx > 0))
+
+    # Triângulos degenerados (área zero) viram inf/nan aqui e são descartados depois
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_area = 1.0 / area
+        A, B, C = A * inv_area[:, None], B * inv_area[:, None], C * inv_area[:, None]
+    return A, B, C, area, topo_esquerda
+
+def preparar_triangulos(pontos_tela, profundidade, faces, largura, altura, validos=None):
+    """
+    Configuração por triângulo comum a todos os backends de rasterização: caixas
+    envolventes recortadas pela tela, funções de aresta e descarte das faces
+    inválidas (atrás da câmera, degeneradas, fora da tela ou fora de 'validos').
+
+    Returns:
+        tuple: (indices, xmin, xmax, ymin, ymax, A, B, C, topo_esquerda, z_tri), com
+               'indices' as faces que geram fragmentos, em ordem crescente, e os
+               demais arrays por face (F,) ou (F, 3); ou None se nenhuma face sobra.
+    """
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    if faces.shape[0] == 0:
+        return None
+    tri = pontos_tela[faces]
+    z_tri = profundidade[faces]
+
+    with np.errstate(invalid='ignore'):
+        xmin = np.ceil(tri[:, :, 0].min(axis=1))
+        xmax = np.floor(tri[:, :, 0].max(axis=1))
+        ymin = np.ceil(tri[:, :, 1].min(axis=1))
+        ymax = np.floor(tri[:, :, 1].max(axis=1))
+    ok = np.isfinite(tri).all(axis=(1, 2)) & np.isfinite(z_tri).all(axis=1)
+    if validos is not None:
+        ok &= validos
+    A, B, C, area, topo_esquerda = _coeficientes_arestas(tri)
+    ok &= np.abs(area) > 1e-12
+
+    xmin = np.clip(np.where(ok, xmin, 0), 0, largura - 1).astype(np.int64)
+    xmax = np.clip(np.where(ok, xmax, -1), -1, largura - 1).astype(np.int64)
+    ymin = np.clip(np.where(ok, ymin, 0), 0, altura - 1).astype(np.int64)
+    ymax = np.clip(np.where(ok, ymax, -1), -1, altura - 1).astype(np.int64)
+    ok &= (xmax >= xmin) & (ymax >= ymin)
+
+    indices = np.nonzero(ok)[0]
+    if indices.size == 0:
+        return None
+    return indices, xmin, xmax, ymin, ymax, A, B, C, topo_esquerda, z_tri
+
+def gerar_fragmentos(pontos_tela, profundidade, faces, largura, altura, validos=None,
+                     max_fragmentos=1 << 22):
+    """
+    Gera, em lotes, os fragmentos cobertos por cada triângulo.
+
+    Args:
+        pontos_tela (np.array): Array (N, 2) de coordenadas de tela.
+        profundidade (np.array): Array (N,) de profundidades por vértice.
+        faces (np.array): Array (F, 3) de índices de vértices.
+        largura, altura (int): Dimensões da tela em pixels.
+        validos (np.array, opcional): Máscara (F,) das faces a rasterizar.
+        max_fragmentos (int): Limite aproximado de fragmentos por lote (memória).
+
+    Yields:
+        tuple: (pixel, face, z, baricentricas) de um lote, onde pixel é o índice
+               linear (y * largura + x), face o índice da face de origem, z a
+               profundidade interpolada e baricentricas um array (n, 3).
+    """
+    # --- 1. Caixas envolventes recortadas pela tela ---
+    preparados = preparar_triangulos(pontos_tela, profundidade, faces, largura, altura, validos)
+    if preparados is not None:
+        yield from _fragmentos_preparados(preparados, largura, max_fragmentos)
+
+def _fragmentos_preparados(preparados, largura, max_fragmentos=1 << 22, y_inicio=0):
+    """
+    Etapas 2 a 5 de gerar_fragmentos sobre triângulos já preparados; os índices
+    de pixel são relativos à linha y_inicio (o início de uma faixa da tela).
+    """
+    indices, xmin, xmax, ymin, ymax, A, B, C, topo_esquerda, z_tri = preparados
+    nx = xmax - xmin + 1
+    ny = ymax - ymin + 1
+    contagem = nx[indices] * ny[indices]
+
+    # --- 2. Divisão em lotes com número limitado de fragmentos ---
+    acumulado = np.cumsum(contagem)
+    cortes = np.searchsorted(acumulado, np.arange(max_fragmentos, acumulado[-1], max_fragmentos))
+    for lote in np.split(np.arange(indices.size), np.unique(cortes)):
+        if lote.size == 0:
+            continue
+        idx = indices[lote]
+        n = contagem[lote]
+        total = int(n.sum())
+
+        # --- 3. Expansão das caixas em pixels candidatos ---
+        tri_rep = np.repeat(np.arange(idx.size), n)
+        inicio = np.repeat(np.cumsum(n) - n, n)
+        local = np.arange(total, dtype=np.int64) - inicio
+        nx_rep = nx[idx][tri_rep]
+        px = xmin[idx][tri_rep] + local % nx_rep
+        py = ymin[idx][tri_rep] + local // nx_rep
+
+        # --- 4. Coordenadas baricêntricas e teste de cobertura ---
+        f = idx[tri_rep]
+        bar = A[f] * px[:, None] + B[f] * py[:, None] + C[f]
+        dentro = ((bar > 0) | ((bar == 0) & topo_esquerda[f])).all(axis=1)
+
+        # --- 5. Interpolação da profundidade (afim em espaço de tela) ---
+        bar = bar[dentro]
+        f = f[dentro]
+        # Soma em ordem fixa (o einsum agrupa os termos conforme a CPU): é a ordem
+        # que os núcleos compilados de nucleos.py repetem
+        z_f = z_tri[f]
+        z = bar[:, 0] * z_f[:, 0] + bar[:, 1] * z_f[:, 1] + bar[:, 2] * z_f[:, 2]
+        pixel = (py[dentro] - y_inicio) * largura + px[dentro]
+        yield pixel, f, z, bar
+
+def resolver_profundidade(pixel, z):
+    """
+    Escolhe, para cada pixel, o fragmento mais próximo (menor z).
+
+    Empates ficam com o fragmento que veio primeiro (ordenação estável), o que
+    torna o resultado determinístico.
+
+    Returns:
+        tuple: (pixels_unicos, indice_fragmento_vencedor).
+    """
+    ordem = np.lexsort((z, pixel))
+    pixel_ord = pixel[ordem]
+    primeiro = np.ones(pixel_ord.size, dtype=bool)
+    primeiro[1:] = pixel_ord[1:] != pixel_ord[:-1]
+    return pixel_ord[primeiro], ordem[primeiro]
+
+def rasterizar_triangulos(pontos_tela, profundidade, faces, largura, altura, validos=None,
+                          buffer_z=None, buffer_face=None, id_base=0, reversa=False, dtype=np.float64,
+                          max_fragmentos=1 << 22):
+    """
+    Rasteriza triângulos em um buffer de profundidade e em um buffer de faces.
+
+    Cada pixel guarda a profundidade do triângulo visível e o índice da face
+    que o cobre (-1 para fundo). Chamadas sucessivas podem reaproveitar os mesmos
+    buffers para acumular várias malhas (use id_base para deslocar os índices).
+
+    Args:
+        pontos_tela (np.array): Array (N, 2) vindo de projetar_vertices.
+        profundidade (np.array): Array (N,) de profundidades NDC.
+        faces (np.array): Array (F, 3) de índices de vértices.
+        largura, altura (int): Dimensões da tela.
+        validos (np.array, opcional): Máscara (F,) de faces a rasterizar.
+        buffer_z (np.array, opcional): Buffer (altura, largura) existente.
+        buffer_face (np.array, opcional): Buffer (altura, largura) existente.
+        id_base (int): Valor somado aos índices de face gravados.
+        reversa (bool): Profundidade em Z reverso (1 no near, 0 no far): o buffer
+                        começa em 0 e vence o maior z.
+        dtype: Tipo do buffer de profundidade criado (np.float32 para Z reverso).
+               Os testes de profundidade usam o valor já convertido para o tipo
+               do buffer, então refletem exatamente a precisão armazenada.
+        max_fragmentos (int): Tamanho aproximado dos lotes de fragmentos (limita a
+                              memória temporária, ver gerar_fragmentos; não se
+                              aplica ao backend 'numba' de nucleos.py).
+
+    Returns:
+        tuple: (buffer_z, buffer_face).
+    """
+    if buffer_z is None:
+        buffer_z = np.full((altura, largura), 0.0 if reversa else np.inf, dtype=dtype)
+    if buffer_face is None:
+        buffer_face = np.full((altura, largura), -1, dtype=np.int64)
+    preparados = preparar_triangulos(pontos_tela, profundidade, faces, largura, altura, validos)
+    if preparados is not None:
+        rasterizar_faixa(preparados, buffer_z, buffer_face, id_base=id_base, reversa=reversa,
+                         max_fragmentos=max_fragmentos)
+    return buffer_z, buffer_face
+
+def rasterizar_faixa(preparados, buffer_z, buffer_face, y_inicio=0, id_base=0, reversa=False, paralelo=True,
+                     max_fragmentos=1 << 22):
+    """
+    Rasteriza triângulos já preparados (preparar_triangulos) nas linhas
+    y_inicio .. y_inicio + altura - 1 da tela, com buffers do tamanho da faixa.
+
+    Faixas disjuntas não compartilham pixels: threads diferentes podem rasterizar
+    cada uma a sua, sobre fatias do mesmo buffer, sem travas (ver render_paralelo.py).
+
+    Args:
+        preparados (tuple): Saída de preparar_triangulos para a tela inteira.
+        buffer_z, buffer_face (np.array): Buffers (altura da faixa, largura), contíguos.
+        y_inicio (int): Linha da tela correspondente à linha 0 dos buffers.
+        id_base, reversa, max_fragmentos: Como em rasterizar_triangulos.
+        paralelo (bool): No backend 'numba', usa o núcleo com threads próprias; com
+                         False, o núcleo sequencial que libera o GIL (para quem já
+                         distribui as faixas entre threads).
+    """
+    altura, largura = buffer_z.shape
+    z_plano = buffer_z.reshape(-1)
+    face_plano = buffer_face.reshape(-1)
+    z_minimo, z_maximo = (0, 1) if reversa else (-1, 1)
+
+    # Só as faces que cruzam a faixa, com as caixas recortadas nas suas linhas
+    indices, xmin, xmax, ymin, ymax, A, B, C, topo_esquerda, z_tri = preparados
+    y_fim = y_inicio + altura - 1
+    indices = indices[(ymin[indices] <= y_fim) & (ymax[indices] >= y_inicio)]
+    if indices.size == 0:
+        return
+    preparados = (indices, xmin, xmax, np.maximum(ymin, y_inicio), np.minimum(ymax, y_fim), A, B, C,
+                  topo_esquerda, z_tri)
+
+    nucleo = nucleos.nucleo('rasterizar_triangulos' if paralelo else 'rasterizar_triangulos_sequencial')
+    if nucleo is not None:
+        # Backend compilado (ver nucleos.py): percorre os triângulos por faixas da tela
+        nucleo(*preparados, z_plano, face_plano, largura, y_inicio, altura, id_base, reversa, z_minimo, z_maximo)
+        return
+
+    for pixel, f, z, _ in _fragmentos_preparados(preparados, largura, max_fragmentos, y_inicio):
+        # Recorte de profundidade por fragmento (planos near e far)
+        dentro = (z >= z_minimo) & (z <= z_maximo)
+        pixel, f, z = pixel[dentro], f[dentro], z[dentro].astype(z_plano.dtype, copy=False)
+        if pixel.size == 0:
+            continue
+        if reversa:
+            pixels, vencedor = resolver_profundidade(pixel, -z)
+            melhor = z[vencedor] > z_plano[pixels]
+        else:
+            pixels, vencedor = resolver_profundidade(pixel, z)
+            melhor = z[vencedor] < z_plano[pixels]
+        z_plano[pixels[melhor]] = z[vencedor[melhor]]
+        face_plano[pixels[melhor]] = f[vencedor[melhor]] + id_base
+
+def faces_na_frente(w, faces):
+    """Máscara das faces com todos os vértices à frente da câmera (w > 0)."""
+    return (w[np.asarray(faces, dtype=np.int64).reshape(-1, 3)] > 0).all(axis=1)
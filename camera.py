@@ -1,18 +1,21 @@
-import matplotlib
-matplotlib.use('TkAgg')
 import numpy as np
-import solidos
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from mpl_toolkits.mplot3d import Axes3D
 
 from mundo import matriz_translacao, aplicar_transformacao, compor_cena
 
+# Parâmetros de projeção usados por todo o pipeline (antes repetidos em cada módulo)
+FOV_PADRAO = 60.0
+NEAR_PADRAO = 1.0
+FAR_PADRAO = 50.0
+
 def matriz_visao(posicao_camera, ponto_alvo, vetor_up_mundo):
     """
     Calcula a Matriz de Visualização (View Matrix) 4x4 para transformar
     coordenadas do mundo para as coordenadas da câmera.
 
+    Se o vetor 'up' for paralelo à direção de visão (câmera olhando reto para
+    cima ou para baixo), o eixo do mundo menos alinhado com a visão é usado no
+    lugar dele, evitando a divisão por zero (NaN) no produto vetorial.
+
     Args:
         posicao_camera (np.array): Posição da câmera no mundo.
         ponto_alvo (np.array): Ponto para o qual a câmera está olhando.
@@ -28,7 +31,11 @@ def matriz_visao(posicao_camera, ponto_alvo, vetor_up_mundo):
 
     # O eixo u (eixo X da câmera) é perpendicular a 'n' e ao vetor 'up' do mundo.
     u = np.cross(vetor_up_mundo, n)
-    u = u / np.linalg.norm(u)
+    norma_u = np.linalg.norm(u)
+    if norma_u <= 1e-9 * np.linalg.norm(vetor_up_mundo):
+        u = np.cross(np.eye(3)[np.argmin(np.abs(n))], n)
+        norma_u = np.linalg.norm(u)
+    u = u / norma_u
 
     # O eixo v (eixo Y da câmera) é o verdadeiro "up" da câmera, perpendicular a 'n' e 'u'.
     v = np.cross(n, u)
@@ -48,7 +55,315 @@ def matriz_visao(posicao_camera, ponto_alvo, vetor_up_mundo):
     # A Matriz de Visão final é a combinação da translação e da rotação
     return mat_rot @ mat_trans
 
+def matriz_projecao_perspectiva(fov_graus, aspect_ratio, near, far, reversa=False):
+    """
+    Cria a matriz de projeção em perspectiva.
+
+    Na forma padrão (OpenGL) a profundidade NDC vai de -1 (near) a 1 (far). Com
+    reversa=True ela vai de 1 (near) a 0 (far), como z = near / distância quando o
+    far é infinito: os valores pequenos (objetos distantes) ficam onde o float32
+    tem mais resolução, e a precisão relativa fica quase constante com a distância.
+    far=np.inf (plano far no infinito) é aceito nas duas formas.
+    """
+    fov_rad = np.radians(fov_graus)
+    f = 1.0 / np.tan(fov_rad / 2.0)
+    if reversa:
+        if np.isinf(far):
+            linha_z = [0, 0, 0, near]
+        else:
+            linha_z = [0, 0, near / (far - near), (far * near) / (far - near)]
+    elif np.isinf(far):
+        linha_z = [0, 0, -1, -2 * near]
+    else:
+        linha_z = [0, 0, (far + near) / (near - far), (2 * far * near) / (near - far)]
+    return np.array([
+        [f / aspect_ratio, 0, 0, 0],
+        [0, f, 0, 0],
+        linha_z,
+        [0, 0, -1, 0]
+    ])
+
+def _linha_z_linear(near, far, reversa):
+    """Linha z da projeção paralela: profundidade NDC afim na distância à câmera."""
+    if np.isinf(far):
+        raise ValueError("Projeções paralelas precisam de um far finito")
+    if reversa:
+        return [0, 0, 1 / (far - near), far / (far - near)]
+    return [0, 0, -2 / (far - near), -(far + near) / (far - near)]
+
+def matriz_projecao_ortografica(meia_altura, aspect_ratio, near, far, reversa=False):
+    """
+    Cria a matriz de projeção ortográfica (paralela): o volume de visão é a caixa
+    [-meia_altura*aspect, meia_altura*aspect] x [-meia_altura, meia_altura] entre
+    os planos near e far, e w = 1 para todos os vértices (sem perspectiva).
+
+    A profundidade NDC segue a mesma convenção da perspectiva: -1 (near) a 1 (far),
+    ou 1 (near) a 0 (far) com reversa=True. Como ela é linear na distância, o Z
+    reverso não muda a precisão aqui; a opção existe para que a mesma Camera e o
+    mesmo buffer sirvam às duas projeções.
+    """
+    return np.array([
+        [1 / (meia_altura * aspect_ratio), 0, 0, 0],
+        [0, 1 / meia_altura, 0, 0],
+        _linha_z_linear(near, far, reversa),
+        [0, 0, 0, 1]
+    ])
+
+def matriz_projecao_obliqua(meia_altura, aspect_ratio, near, far, angulo_graus=45.0, fator=0.5,
+                            distancia_referencia=0.0, reversa=False):
+    """
+    Cria a matriz de projeção oblíqua: um cisalhamento seguido da projeção
+    ortográfica. Cada ponto desliza na tela, na direção angulo_graus, uma fração
+    'fator' da sua profundidade em relação ao plano a distancia_referencia da
+    câmera (normalmente o alvo), que fica sem deslocamento. fator=1 é a projeção
+    cavaleira e fator=0.5 a gabinete.
+    """
+    angulo = np.radians(angulo_graus)
+    kx, ky = fator * np.cos(angulo), fator * np.sin(angulo)
+    # Profundidade d = -z_camera; x' = x + kx * (d - distancia_referencia)
+    cisalhamento = np.array([
+        [1, 0, -kx, -kx * distancia_referencia],
+        [0, 1, -ky, -ky * distancia_referencia],
+        [0, 0, 1, 0],
+        [0, 0, 0, 1]
+    ])
+    return matriz_projecao_ortografica(meia_altura, aspect_ratio, near, far, reversa) @ cisalhamento
+
+def intervalo_profundidade(reversa=False):
+    """Intervalo (z_near, z_far) da profundidade NDC produzida pela projeção."""
+    return (1.0, 0.0) if reversa else (-1.0, 1.0)
+
+def matriz_rotacao_eixo(eixo, angulo_rad):
+    """Matriz 3x3 de rotação em torno de um eixo unitário (fórmula de Rodrigues)."""
+    x, y, z = eixo
+    K = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+    return np.eye(3) + np.sin(angulo_rad) * K + (1 - np.cos(angulo_rad)) * (K @ K)
+
+def _parametro(nome, invalidar, tipo=float, validos=None):
+    """
+    Propriedade que, ao ser alterada, descarta as matrizes que dependem dela.
+    Com validos, só aceita um dos valores da tupla (ValueError nos demais).
+    """
+    atributo = '_' + nome
+
+    def ler(self):
+        return getattr(self, atributo)
+
+    def escrever(self, valor):
+        if validos is not None and valor not in validos:
+            raise ValueError(f"Valor desconhecido para {nome}: {valor!r} (use um de {validos})")
+        if valor is None:
+            pass
+        elif np.ndim(valor):
+            valor = np.array(valor, dtype=float)
+            valor.setflags(write=False)
+        else:
+            valor = tipo(valor)
+        setattr(self, atributo, valor)
+        getattr(self, invalidar)()
+
+    return property(ler, escrever)
+
+class Camera:
+    """
+    Câmera com as matrizes de visão, projeção e visão-projeção e os planos do
+    frustum guardados em cache.
+
+    Alterar posicao, alvo ou up descarta só a visão; alterar fov, aspecto, near,
+    far ou reversa descarta só a projeção; a visão-projeção e os planos dependem
+    das duas. Com reversa=True (e, tipicamente, far=np.inf) a projeção usa Z
+    reverso e o rasterizador guarda a profundidade em float32.
+    orbitar, pan e dolly atualizam a matriz de visão em cache multiplicando-a
+    por uma transformação rígida, sem refazer a base com produtos vetoriais.
+
+    A projeção é escolhida por 'projecao': 'perspectiva', 'ortografica' ou
+    'obliqua'. As duas paralelas usam meia_altura (metade da altura do volume de
+    visão em unidades do mundo; se None, a altura que a perspectiva teria no alvo,
+    para o enquadramento não mudar ao trocar de projeção) e a oblíqua usa ainda
+    angulo_obliquo e fator_obliquo. Como elas dependem da distância ao alvo,
+    mover a câmera também descarta a projeção paralela.
+
+    Os vetores devolvidos (posicao, alvo, up) e as matrizes são somente leitura.
+    """
+    PROJECOES = ('perspectiva', 'ortografica', 'obliqua')
+
+    posicao = _parametro('posicao', '_invalidar_visao')
+    alvo = _parametro('alvo', '_invalidar_visao')
+    up = _parametro('up', '_invalidar_visao')
+    fov = _parametro('fov', '_invalidar_projecao')
+    aspecto = _parametro('aspecto', '_invalidar_projecao')
+    near = _parametro('near', '_invalidar_projecao')
+    far = _parametro('far', '_invalidar_projecao')
+    reversa = _parametro('reversa', '_invalidar_projecao', tipo=bool)
+    projecao_tipo = _parametro('projecao_tipo', '_invalidar_projecao', tipo=str, validos=PROJECOES)
+    meia_altura = _parametro('meia_altura', '_invalidar_projecao')
+    angulo_obliquo = _parametro('angulo_obliquo', '_invalidar_projecao')
+    fator_obliquo = _parametro('fator_obliquo', '_invalidar_projecao')
+
+    # Ângulo mínimo (rad) entre a direção de visão e o 'up' ao orbitar
+    ELEVACAO_MINIMA = 1e-3
+
+    def __init__(self, posicao, alvo, up=(0.0, 0.0, 1.0), fov=FOV_PADRAO, aspecto=1.0,
+                 near=NEAR_PADRAO, far=FAR_PADRAO, reversa=False, projecao='perspectiva', meia_altura=None,
+                 angulo_obliquo=45.0, fator_obliquo=0.5):
+        self._visao = self._projecao = self._visao_projecao = self._planos = None
+        self.projecao_tipo = projecao
+        self.posicao, self.alvo, self.up = posicao, alvo, up
+        self.fov, self.aspecto, self.near, self.far = fov, aspecto, near, far
+        self.reversa = reversa
+        self.meia_altura, self.angulo_obliquo, self.fator_obliquo = meia_altura, angulo_obliquo, fator_obliquo
+
+    @property
+    def paralela(self):
+        """True para as projeções ortográfica e oblíqua (w = 1, sem perspectiva)."""
+        return self._projecao_tipo != 'perspectiva'
+
+    def _invalidar_visao(self):
+        self._visao = self._visao_projecao = self._planos = None
+        if self.paralela:
+            self._projecao = None
+
+    def _invalidar_projecao(self):
+        self._projecao = self._visao_projecao = self._planos = None
+
+    @staticmethod
+    def _congelar(matriz):
+        matriz.setflags(write=False)
+        return matriz
+
+    # --- Matrizes em cache ---
+    @property
+    def visao(self):
+        if self._visao is None:
+            self._visao = self._congelar(matriz_visao(self._posicao, self._alvo, self._up))
+        return self._visao
+
+    @property
+    def projecao(self):
+        if self._projecao is None:
+            if not self.paralela:
+                matriz = matriz_projecao_perspectiva(self._fov, self._aspecto, self._near, self._far,
+                                                     self._reversa)
+            else:
+                distancia = np.linalg.norm(self._posicao - self._alvo)
+                meia_altura = self._meia_altura
+                if meia_altura is None:
+                    meia_altura = distancia * np.tan(np.radians(self._fov) / 2)
+                if self._projecao_tipo == 'ortografica':
+                    matriz = matriz_projecao_ortografica(meia_altura, self._aspecto, self._near, self._far,
+                                                         self._reversa)
+                else:
+                    matriz = matriz_projecao_obliqua(meia_altura, self._aspecto, self._near, self._far,
+                                                     self._angulo_obliquo, self._fator_obliquo, distancia,
+                                                     self._reversa)
+            self._projecao = self._congelar(matriz)
+        return self._projecao
+
+    @property
+    def visao_projecao(self):
+        if self._visao_projecao is None:
+            self._visao_projecao = self._congelar(self.projecao @ self.visao)
+        return self._visao_projecao
+
+    @property
+    def planos_frustum(self):
+        """
+        Planos (6, 4) do frustum em coordenadas do mundo, na ordem esquerda,
+        direita, baixo, cima, near e far (método de Gribb-Hartmann). Cada linha
+        (a, b, c, d) tem normal unitária apontando para dentro: um ponto p está
+        dentro se a*x + b*y + c*z + d >= 0 para os seis planos. Com far infinito
+        o plano far vira (0, 0, 0, 1), que contém todo o espaço.
+        """
+        if self._planos is None:
+            m = self.visao_projecao
+            if self._reversa:
+                # 0 <= z_clip <= w: near em z = w, far em z = 0
+                near, far = m[3] - m[2], m[2]
+            else:
+                near, far = m[3] + m[2], m[3] - m[2]
+            planos = np.array([m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], near, far])
+            normas = np.linalg.norm(planos[:, :3], axis=1)
+            degenerados = normas < 1e-12 * np.abs(planos[:, 3])
+            planos[degenerados] = (0.0, 0.0, 0.0, 1.0)
+            planos[~degenerados] /= normas[~degenerados, None]
+            self._planos = self._congelar(planos)
+        return self._planos
+
+    def esferas_no_frustum(self, centros, raios):
+        """
+        Teste conservador de esferas envolventes contra o frustum.
+
+        Args:
+            centros (np.array): Centros (K, 3) no mundo.
+            raios (np.array): Raios (K,).
+
+        Returns:
+            np.array: Máscara (K,) das esferas que tocam o frustum.
+        """
+        planos = self.planos_frustum
+        distancias = np.asarray(centros, dtype=float) @ planos[:, :3].T + planos[:, 3]
+        return (distancias >= -np.asarray(raios, dtype=float).reshape(-1, 1)).all(axis=1)
+
+    # --- Operações de navegação ---
+    def _aplicar_movimento(self, nova_posicao, novo_alvo, transformacao):
+        """Atualiza posição/alvo e, se a visão estiver em cache, compõe V' = V @ transformacao."""
+        visao = self._visao
+        self.posicao, self.alvo = nova_posicao, novo_alvo
+        if visao is not None and transformacao is not None:
+            self._visao = self._congelar(visao @ transformacao)
+
+    def orbitar(self, azimute_graus=0.0, elevacao_graus=0.0):
+        """
+        Gira a câmera em torno do alvo: o azimute em torno do 'up' e a elevação em
+        torno do eixo lateral da câmera (positiva sobe). A elevação é limitada para
+        que a direção de visão nunca fique paralela ao 'up'.
+        """
+        deslocamento = self._posicao - self._alvo
+        raio = np.linalg.norm(deslocamento)
+        k = self._up / np.linalg.norm(self._up)
+        polar = np.arccos(np.clip(np.dot(deslocamento / raio, k), -1.0, 1.0))
+        novo_polar = np.clip(polar - np.radians(elevacao_graus), self.ELEVACAO_MINIMA,
+                             np.pi - self.ELEVACAO_MINIMA)
+
+        # O eixo lateral é a primeira linha da visão (também definida no caso degenerado)
+        lateral = self.visao[0, :3]
+        rotacao = matriz_rotacao_eixo(k, np.radians(azimute_graus)) @ matriz_rotacao_eixo(lateral,
+                                                                                          novo_polar - polar)
+        # Partindo de uma visão degenerada a base reconstruída não é a base girada
+        degenerada = min(polar, np.pi - polar) < self.ELEVACAO_MINIMA / 2
+        transformacao = None
+        if not degenerada:
+            # V' = V @ T(alvo) @ R^T @ T(-alvo)
+            transformacao = np.eye(4)
+            transformacao[:3, :3] = rotacao.T
+            transformacao[:3, 3] = self._alvo - rotacao.T @ self._alvo
+        self._aplicar_movimento(self._alvo + rotacao @ deslocamento, self._alvo, transformacao)
+
+    def pan(self, dx, dy):
+        """Desloca câmera e alvo juntos no plano da imagem (unidades do mundo)."""
+        visao = self.visao
+        deslocamento = dx * visao[0, :3] + dy * visao[1, :3]
+        transformacao = matriz_translacao(*-deslocamento).astype(float)
+        self._aplicar_movimento(self._posicao + deslocamento, self._alvo + deslocamento, transformacao)
+
+    def dolly(self, distancia):
+        """
+        Aproxima (distancia > 0) ou afasta a câmera do alvo ao longo da direção de
+        visão, sem deixar a câmera alcançar o alvo.
+        """
+        visao = self.visao
+        raio = np.linalg.norm(self._posicao - self._alvo)
+        distancia = min(distancia, raio * (1 - 1e-6))
+        deslocamento = -distancia * visao[2, :3]
+        transformacao = matriz_translacao(*-deslocamento).astype(float)
+        self._aplicar_movimento(self._posicao + deslocamento, self._alvo, transformacao)
+
 if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('TkAgg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    from mpl_toolkits.mplot3d import Axes3D
 
     vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha = compor_cena()
     fig = plt.figure(figsize=(15, 12))
@@ -1,61 +1,100 @@
-import matplotlib
-matplotlib.use('TkAgg')
 import numpy as np
-import solidos
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from mpl_toolkits.mplot3d import Axes3D
 
-from camera import matriz_visao, aplicar_transformacao
+# matriz_visao e matriz_projecao_perspectiva continuam importáveis daqui
+from camera import Camera, matriz_visao, matriz_projecao_perspectiva, aplicar_transformacao
 from mundo import compor_cena
+from iluminacao import cores_sombreadas
+from ordenacao import ordem_pintor
+from perfil import etapa
 
-def matriz_projecao_perspectiva(fov_graus, aspect_ratio, near, far):
-    """Cria a matriz de projeção em perspectiva."""
-    fov_rad = np.radians(fov_graus)
-    f = 1.0 / np.tan(fov_rad / 2.0)
-    return np.array([
-        [f / aspect_ratio, 0, 0, 0],
-        [0, f, 0, 0],
-        [0, 0, (far + near) / (near - far), (2 * far * near) / (near - far)],
-        [0, 0, -1, 0]
-    ])
+def projetar_poligonos_2d(vertices_cena, faces_cena, cores_faces, camera_pos, ponto_alvo, up_mundo,
+                          sombreamento=None, direcao_luz=(-0.3, -0.5, -1.0), metodo_ordenacao='radix',
+                          camera=None, retornar_ordem=False):
+    """
+    Caminho geométrico do plotar_cena_2d: recorte, ordenação (algoritmo do pintor)
+    e projeção das faces para Coordenadas Normalizadas, sem nenhum desenho.
 
-from matplotlib.patches import Polygon
+    A profundidade de todas as faces é calculada de uma vez; a ordem de desenho é
+    uma permutação (ver ordenacao.py) aplicada por indexação.
 
-def plotar_cena_2d(vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha, 
-                   camera_pos, ponto_alvo, up_mundo):
-    """
-    Executa o pipeline de projeção e renderiza a cena em um gráfico 2D.
+    Args:
+        metodo_ordenacao (str): 'radix' ou 'argsort' (ver ordenacao.ordem_pintor).
+        camera (Camera, opcional): Câmera com as matrizes em cache; se ausente, é
+                                   criada a partir de camera_pos, ponto_alvo e up_mundo.
+        retornar_ordem (bool): Se True, devolve também os índices (K,) das faces
+                               desenhadas, na ordem de desenho.
+
+    Returns:
+        tuple: (poligonos_cn, cores, mat_transform), com os polígonos 2D (K, 3, 2)
+               ordenados do mais distante para o mais próximo e a cor de cada um,
+               seguida da ordem quando retornar_ordem é True.
     """
     # --- 1. Definir Parâmetros e Matrizes de Transformação ---
-    near_plane = 1.0
-    far_plane = 50.0
-    fov = 60.0
-    
-    mat_view = matriz_visao(camera_pos, ponto_alvo, up_mundo)
-    mat_persp = matriz_projecao_perspectiva(fov, 1.0, near_plane, far_plane)
-    mat_transform = mat_persp @ mat_view
+    with etapa('transformacao_visao', entrada=len(vertices_cena)):
+        if camera is None:
+            camera = Camera(camera_pos, ponto_alvo, up_mundo)
+        mat_view = camera.visao
+        mat_transform = camera.visao_projecao
+        # Vértices no espaço da câmera, para obter a profundidade
+        vertices_cena_scc = aplicar_transformacao(vertices_cena, mat_view)
+    near_plane, far_plane = camera.near, camera.far
 
     # --- 2. Preparar Polígonos para o Algoritmo do Pintor ---
-    render_list = []
-    
-    # Transforma os vértices para o espaço da câmera para obter a profundidade
-    vertices_cena_scc = aplicar_transformacao(vertices_cena, mat_view)
-    
-    for i, face in enumerate(faces_cena):
-        profundidade = np.mean(vertices_cena_scc[list(face), 2])
+    faces_array = np.asarray(faces_cena, dtype=np.int64).reshape(-1, 3)
+    if sombreamento is not None:
+        from matplotlib.colors import to_rgba_array
+        with etapa('sombreamento', entrada=len(faces_array)):
+            cores_base = to_rgba_array(cores_faces)[:, :3]
+            cores_faces = cores_sombreadas(vertices_cena, faces_array, cores_base, camera.posicao, direcao_luz,
+                                           sombreamento=sombreamento)
+            if sombreamento == 'gouraud':
+                cores_faces = cores_faces.mean(axis=1)
+
+    with etapa('recorte', entrada=len(faces_array)) as e:
+        profundidade = vertices_cena_scc[faces_array, 2].mean(axis=1)
         # Clipping simples de profundidade
-        if profundidade < -near_plane and profundidade > -far_plane:
-            render_list.append({
-                'vertices_mundo': vertices_cena[list(face)],
-                'cor': cores_faces[i],
-                'profundidade': profundidade
-            })
+        visiveis = np.flatnonzero((profundidade < -near_plane) & (profundidade > -far_plane))
+        e.saida = len(visiveis)
             
     # Ordenar polígonos do mais distante para o mais próximo
-    render_list.sort(key=lambda item: item['profundidade'])
+    with etapa('ordenacao', entrada=len(visiveis)):
+        ordem = visiveis[ordem_pintor(profundidade[visiveis], metodo_ordenacao)]
+
+    # --- 3. Projetar os Polígonos Ordenados ---
+    with etapa('projecao', entrada=len(ordem)) as e:
+        # Transformar os vértices do mundo para Coordenadas Normalizadas
+        v_homogeneos = np.hstack((vertices_cena, np.ones((len(vertices_cena), 1))))
+        v_clip = v_homogeneos @ mat_transform.T
+
+        # Divisão por Perspectiva
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v_cn = v_clip[:, :2] / v_clip[:, 3, np.newaxis]
+        poligonos_cn = v_cn[faces_array[ordem]]
+        e.saida = len(poligonos_cn)
+
+    if retornar_ordem:
+        return poligonos_cn, np.asarray(cores_faces)[ordem], mat_transform, ordem
+    return poligonos_cn, np.asarray(cores_faces)[ordem], mat_transform
+
+def plotar_cena_2d(vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha, 
+                   camera_pos, ponto_alvo, up_mundo, sombreamento=None, direcao_luz=(-0.3, -0.5, -1.0),
+                   camera=None):
+    """
+    Executa o pipeline de projeção e renderiza a cena em um gráfico 2D.
+
+    Com sombreamento='flat' ou 'gouraud' as cores das faces são iluminadas por uma
+    luz direcional (ver iluminacao.py). O matplotlib só aceita uma cor por polígono,
+    então no modo 'gouraud' cada face recebe a média das cores dos seus cantos.
+    """
+    # --- 1. Recorte, Ordenação e Projeção (caminho geométrico) ---
+    poligonos_cn, cores_poligonos, mat_transform = projetar_poligonos_2d(
+        vertices_cena, faces_cena, cores_faces, camera_pos, ponto_alvo, up_mundo,
+        sombreamento=sombreamento, direcao_luz=direcao_luz, camera=camera)
+
+    # --- 2. Configurar o Gráfico 2D ---
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import PolyCollection
 
-    # --- 3. Configurar o Gráfico 2D ---
     fig, ax = plt.subplots(figsize=(10, 10))
     ax.set_title("Cena Projetada em 2D")
     ax.set_xlabel("Eixo X (CN)")
@@ -65,35 +104,34 @@ def plotar_cena_2d(vertices_cena, faces_cena, cores_faces, vertices_linha, arest
     ax.set_aspect('equal', adjustable='box')
     ax.grid(True)
 
-    # --- 4. Renderizar os Polígonos Ordenados ---
-    for item in render_list:
-        # Transformar os vértices do mundo para Coordenadas Normalizadas
-        v_mundo = item['vertices_mundo']
-        v_homogeneos = np.hstack((v_mundo, np.ones((v_mundo.shape[0], 1))))
-        v_clip = (mat_transform @ v_homogeneos.T).T
+    # --- 3. Renderizar os Polígonos Ordenados ---
+    # Uma única coleção: o matplotlib desenha os polígonos na ordem do array
+    with etapa('rasterizacao', entrada=len(poligonos_cn)):
+        colecao = PolyCollection(poligonos_cn, closed=True, facecolors=cores_poligonos, edgecolors='black')
+        ax.add_collection(colecao)
         
-        # Divisão por Perspectiva
-        v_cn = v_clip[:, :2] / v_clip[:, 3, np.newaxis]
-        
-        # Desenhar o polígono 2D
-        polygon = Polygon(v_cn, closed=True, facecolor=item['cor'], edgecolor='black')
-        ax.add_patch(polygon)
-        
-    # --- 5. Renderizar a Linha (sobre os polígonos) ---
-    v_homogeneos_linha = np.hstack((vertices_linha, np.ones((vertices_linha.shape[0], 1))))
-    v_clip_linha = (mat_transform @ v_homogeneos_linha.T).T
-    
-    # Checar se a linha está dentro do frustum antes de dividir
-    if np.all(v_clip_linha[:, 3] > 0):
-        v_cn_linha = v_clip_linha[:, :2] / v_clip_linha[:, 3, np.newaxis]
-        for aresta in arestas_linha:
-            p_inicio, p_fim = v_cn_linha[aresta[0]], v_cn_linha[aresta[1]]
-            ax.plot([p_inicio[0], p_fim[0]], [p_inicio[1], p_fim[1]], color='red', linewidth=3)
-            
+    # --- 4. Renderizar a Linha (sobre os polígonos) ---
+    with etapa('rasterizacao', entrada=len(arestas_linha)):
+        v_homogeneos_linha = np.hstack((vertices_linha, np.ones((vertices_linha.shape[0], 1))))
+        v_clip_linha = (mat_transform @ v_homogeneos_linha.T).T
+
+        # Checar se a linha está dentro do frustum antes de dividir
+        if np.all(v_clip_linha[:, 3] > 0):
+            v_cn_linha = v_clip_linha[:, :2] / v_clip_linha[:, 3, np.newaxis]
+            for aresta in arestas_linha:
+                p_inicio, p_fim = v_cn_linha[aresta[0]], v_cn_linha[aresta[1]]
+                ax.plot([p_inicio[0], p_fim[0]], [p_inicio[1], p_fim[1]], color='red', linewidth=3)
+
+    # O matplotlib só desenha de fato os patches ao renderizar a figura; a espera
+    # bloqueante da janela em plt.show() fica fora da medição
+    with etapa('saida', entrada=len(poligonos_cn)):
+        fig.canvas.draw()
     plt.show()
 
 
 if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('TkAgg')
 
     vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha = compor_cena()
 
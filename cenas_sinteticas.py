@@ -0,0 +1,137 @@
+import numpy as np
+
+from mundo import matriz_rotacao_y, matriz_rotacao_z, matriz_translacao, aplicar_transformacao
+from solidos.paralelepipedo import paralelepipedo
+from solidos.cilindro import cilindro
+from solidos.cano_reto import cano_reto
+from solidos.cano_curvo import cano_curvado
+from solidos.reta import linha_reta
+
+# --- Cenas Sintéticas Parametrizadas ---
+# Geram cenas no mesmo formato de compor_cena(), com N instâncias de cada
+# primitiva de 'solidos' em posições e rotações sorteadas com semente fixa, para
+# que medições e imagens de referência sejam reprodutíveis.
+
+def cena_sintetica(num_instancias, segmentos_curva=30, divisoes_circulo=12, extensao=8.0, semente=0,
+                   retornar_arestas=False):
+    """
+    Monta uma cena com num_instancias de cada sólido (caixa, cilindro, cano reto e
+    cano curvado) espalhados em um cubo de lado 2*extensao centrado na origem.
+
+    Args:
+        num_instancias (int): Número de instâncias de cada tipo de sólido.
+        segmentos_curva (int): Anéis ao longo de cada cano curvado (tesselação).
+        divisoes_circulo (int): Divisões dos círculos dos sólidos de revolução.
+        extensao (float): Meio-lado do cubo onde os objetos são posicionados.
+        semente (int): Semente do gerador de números aleatórios.
+        retornar_arestas (bool): Se True, devolve também as arestas (como compor_cena).
+
+    Returns:
+        tuple: (vertices, faces, cores, vertices_linha, arestas_linha), no formato
+               de compor_cena(), com as faces já como array (F, 3).
+    """
+    gerador = np.random.default_rng(semente)
+    todos_vertices, todas_faces, todas_cores, todas_arestas = [], [], [], []
+    offset = 0
+
+    def adicionar(vertices, arestas, faces, cor):
+        nonlocal offset
+        angulo = gerador.uniform(0, 360)
+        posicao = gerador.uniform(-extensao, extensao, 3)
+        vertices = aplicar_transformacao(vertices, matriz_translacao(*posicao) @ matriz_rotacao_y(angulo))
+        todos_vertices.append(vertices)
+        todas_faces.append(np.asarray(faces, dtype=np.int64) + offset)
+        todas_arestas.append(np.asarray(arestas, dtype=np.int64).reshape(-1, 2) + offset)
+        todas_cores.extend([cor] * len(faces))
+        offset += len(vertices)
+
+    for _ in range(num_instancias):
+        largura, altura, profundidade = gerador.uniform(0.5, 3.0, 3)
+        adicionar(*paralelepipedo(largura, altura, profundidade), 'gray')
+
+        raio, altura = gerador.uniform(0.3, 1.5), gerador.uniform(1.0, 4.0)
+        adicionar(*cilindro(raio, altura, num_divisoes=divisoes_circulo), 'cornflowerblue')
+
+        raio, altura = gerador.uniform(0.4, 1.2), gerador.uniform(2.0, 6.0)
+        adicionar(*cano_reto(raio, altura, 0.2 * raio, num_divisoes=divisoes_circulo), 'lightgreen')
+
+        P0 = np.zeros(3)
+        P1 = gerador.uniform(-4, 4, 3)
+        T0, T1 = gerador.uniform(-8, 8, 3), gerador.uniform(-8, 8, 3)
+        raio = gerador.uniform(0.3, 0.8)
+        adicionar(*cano_curvado(raio, 0.2 * raio, P0, P1, T0, T1, segmentos_curva, divisoes_circulo),
+                  'deepskyblue')
+
+    v_linha, a_linha, _ = linha_reta(extensao)
+    vertices = np.concatenate(todos_vertices) if todos_vertices else np.zeros((0, 3))
+    faces = np.concatenate(todas_faces) if todas_faces else np.zeros((0, 3), dtype=np.int64)
+    if retornar_arestas:
+        arestas = np.concatenate(todas_arestas) if todas_arestas else np.zeros((0, 2), dtype=np.int64)
+        return vertices, faces, todas_cores, v_linha.astype(float), a_linha, arestas
+    return vertices, faces, todas_cores, v_linha.astype(float), a_linha
+
+def cena_canos_atras_de_paredes(num_canos=200, fracao_visivel=0.1, num_paredes=4, segmentos_curva=30,
+                                divisoes_circulo=16, semente=0):
+    """
+    Cena de oclusão: uma fileira de paredes (paralelepípedos finos) entre a câmera
+    de CAMERA_PAREDES e muitos canos retos e curvados atrás delas. Uma fração dos
+    canos fica acima das paredes ou à frente delas, visível. O eixo Y é o "para cima".
+
+    Além da cena no formato de compor_cena(), devolve a divisão em objetos: cada
+    sólido ocupa um intervalo contíguo de vértices e de faces.
+
+    Returns:
+        tuple: (cena, objetos), onde objetos é um dicionário com 'limites_vertices'
+               e 'limites_faces' (arrays (K+1,) com o início de cada objeto e o
+               total no fim) e 'oclusor' (máscara (K,) das paredes).
+    """
+    gerador = np.random.default_rng(semente)
+    todos_vertices, todas_faces, todas_cores = [], [], []
+    limites_vertices, limites_faces, oclusor = [0], [0], []
+
+    def adicionar(vertices, faces, cor, matriz, e_oclusor=False):
+        vertices = aplicar_transformacao(np.asarray(vertices, dtype=float), matriz)
+        todos_vertices.append(vertices)
+        todas_faces.append(np.asarray(faces, dtype=np.int64) + limites_vertices[-1])
+        todas_cores.extend([cor] * len(faces))
+        limites_vertices.append(limites_vertices[-1] + len(vertices))
+        limites_faces.append(limites_faces[-1] + len(faces))
+        oclusor.append(e_oclusor)
+
+    # --- Paredes lado a lado no plano z = 0 (x de -20 a 20, y de 0 a 8) ---
+    largura_parede = 40.0 / num_paredes
+    for i in range(num_paredes):
+        v, _, f = paralelepipedo(largura_parede, 8.0, 0.5)
+        adicionar(v, f, 'gray', matriz_translacao(-20 + i * largura_parede, 0, 0), e_oclusor=True)
+
+    # --- Canos: deitados ao longo de X atrás das paredes (ou visíveis) ---
+    for i in range(num_canos):
+        visivel = gerador.random() < fracao_visivel
+        x = gerador.uniform(-14, 14)
+        if visivel and gerador.random() < 0.5:
+            y, z = gerador.uniform(9, 12), gerador.uniform(-15, -3)   # acima das paredes
+        elif visivel:
+            y, z = gerador.uniform(1, 7), gerador.uniform(3, 8)       # à frente das paredes
+        else:
+            y, z = gerador.uniform(1.5, 6.5), gerador.uniform(-15, -3)
+        raio = gerador.uniform(0.2, 0.5)
+        comprimento = gerador.uniform(2.0, 6.0)
+        posicao = matriz_translacao(x - comprimento / 2, y, z)
+        if i % 2 == 0:
+            v, _, f = cano_reto(raio, comprimento, 0.2 * raio, num_divisoes=divisoes_circulo)
+            adicionar(v, f, 'lightgreen', posicao @ matriz_rotacao_z(-90))
+        else:
+            P1 = np.array([comprimento, gerador.uniform(-1, 1), gerador.uniform(-1, 1)])
+            T0, T1 = gerador.uniform(-3, 3, 3) + [comprimento, 0, 0], gerador.uniform(-3, 3, 3) + [comprimento, 0, 0]
+            v, _, f = cano_curvado(raio, 0.2 * raio, np.zeros(3), P1, T0, T1, segmentos_curva, divisoes_circulo)
+            adicionar(v, f, 'deepskyblue', posicao)
+
+    v_linha, a_linha, _ = linha_reta(5)
+    cena = (np.concatenate(todos_vertices), np.concatenate(todas_faces), todas_cores,
+            v_linha.astype(float) + [0, 10, 5], a_linha)
+    objetos = {'limites_vertices': np.array(limites_vertices), 'limites_faces': np.array(limites_faces),
+               'oclusor': np.array(oclusor)}
+    return cena, objetos
+
+# Pose da câmera de cena_canos_atras_de_paredes: de frente para as paredes, Y para cima
+CAMERA_PAREDES = ((0.0, 4.0, 30.0), (0.0, 4.0, 0.0), (0.0, 1.0, 0.0))
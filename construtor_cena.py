@@ -0,0 +1,258 @@
+import time
+import numpy as np
+
+from solidos.paralelepipedo import paralelepipedo
+from solidos.cilindro import cilindro
+from solidos.varredura import perfil_anel, varrer_perfil
+from solidos.spline_hermite import SplineHermite
+
+# --- Construtor de Cenas em Lote (Redes de Tubulação) ---
+# compor_cena() e cena_sintetica() montam a cena objeto a objeto: uma chamada do
+# gerador, uma transformação e um extend com o deslocamento dos índices por
+# objeto. Para plantas com milhares de canos, o ConstrutorCena recebe as
+# especificações como arrays (um lote por chamada de adicionar_*) e, em
+# construir(), gera cada tipo de primitiva de uma vez:
+# - caixas e cilindros instanciam a topologia de paralelepipedo() e cilindro()
+#   (gerada uma vez, com tamanho unitário) com escala, orientação e posição por
+#   instância em uma única operação de broadcast;
+# - canos retos e curvos são uma única varredura (solidos/varredura.py) de
+#   perfis de anel com o raio e a espessura de cada cano.
+# Como todas as instâncias de um tipo têm a mesma topologia, as faces de N
+# instâncias são o molde mais N deslocamentos; os buffers finais são agrupados
+# por material, com os índices já corrigidos.
+
+_VETORIAIS = {'centros', 'dimensoes', 'bases', 'eixos', 'inicios', 'fins', 'P0', 'P1', 'T0', 'T1'}
+
+def _como_lote(valor, quantidade, dimensao=None):
+    """Repete um valor escalar (ou vetor) para 'quantidade' instâncias."""
+    forma = (quantidade,) if dimensao is None else (quantidade, dimensao)
+    return np.broadcast_to(np.asarray(valor, dtype=float), forma)
+
+def _referencial_eixo(eixos):
+    """Bases (u, eixo, w) ortonormais e com a orientação de (x, y, z) para cada eixo (N, 3)."""
+    normas = np.linalg.norm(eixos, axis=1, keepdims=True)
+    if np.any(normas == 0):
+        raise ValueError("Os eixos dos cilindros não podem ser nulos.")
+    eixos = eixos / normas
+    auxiliar = np.eye(3)[np.argmin(np.abs(eixos), axis=1)]
+    u = np.cross(eixos, auxiliar)
+    u /= np.linalg.norm(u, axis=1, keepdims=True)
+    return u, eixos, np.cross(u, eixos)
+
+class ConstrutorCena:
+    """
+    Acumula especificações de primitivas em lotes e gera a cena de uma vez.
+
+    Cada adicionar_* aceita arrays com uma linha por objeto (ou escalares, que
+    valem para todos) e um material, único ou um por objeto. Os materiais são
+    nomes de cor de MAPA_CORES, como nas outras cenas.
+    """
+
+    def __init__(self, divisoes_circulo=12, segmentos_curva=30):
+        self.divisoes_circulo = divisoes_circulo
+        self.segmentos_curva = segmentos_curva
+        self._lotes = {'caixa': [], 'cilindro': [], 'cano_reto': [], 'cano_curvo': []}
+        self.num_objetos = 0
+
+    def _adicionar(self, tipo, materiais, **especificacao):
+        # Um valor com uma dimensão a mais que a de um único objeto traz um por
+        # objeto; uma lista de materiais também conta
+        quantidade = max([len(valor) for chave, valor in especificacao.items()
+                          if np.ndim(valor) > (chave in _VETORIAIS)] +
+                         [len(materiais) if np.ndim(materiais) > 0 else 1])
+        especificacao = {chave: (_como_lote(valor, quantidade, 3) if chave in _VETORIAIS
+                                 else _como_lote(valor, quantidade))
+                         for chave, valor in especificacao.items()}
+        especificacao['material'] = np.broadcast_to(np.asarray(materiais), (quantidade,))
+        # ID de cada objeto: a ordem em que foi adicionado, entre todos os tipos
+        especificacao['id'] = np.arange(self.num_objetos, self.num_objetos + quantidade)
+        self.num_objetos += quantidade
+        self._lotes[tipo].append(especificacao)
+        return self
+
+    def adicionar_caixas(self, centros, dimensoes, angulos=0.0, materiais='gray'):
+        """Caixas centradas em 'centros', dimensões (largura, altura, profundidade), giradas em Y (graus)."""
+        return self._adicionar('caixa', materiais, centros=centros, dimensoes=dimensoes, angulos=angulos)
+
+    def adicionar_cilindros(self, bases, eixos, raios, alturas, materiais='cornflowerblue'):
+        """Cilindros com o centro da base em 'bases' e altura ao longo de 'eixos'."""
+        return self._adicionar('cilindro', materiais, bases=bases, eixos=eixos, raios=raios, alturas=alturas)
+
+    def adicionar_canos_retos(self, inicios, fins, raios, espessuras, materiais='lightgreen'):
+        """Canos retos do centro de 'inicios' ao centro de 'fins'."""
+        return self._adicionar('cano_reto', materiais, inicios=inicios, fins=fins, raios=raios,
+                               espessuras=espessuras)
+
+    def adicionar_canos_curvos(self, P0, P1, T0, T1, raios, espessuras, materiais='deepskyblue'):
+        """Canos ao longo de curvas de Hermite (pontos P0, P1 e tangentes T0, T1), como cano_curvado."""
+        return self._adicionar('cano_curvo', materiais, P0=P0, P1=P1, T0=T0, T1=T1, raios=raios,
+                               espessuras=espessuras)
+
+    def _especificacoes(self, tipo):
+        lotes = self._lotes[tipo]
+        if not lotes:
+            return None
+        return {chave: np.concatenate([lote[chave] for lote in lotes]) for chave in lotes[0]}
+
+    # --- Geração por Tipo: (vertices (N, V, 3), faces (F, 3) do molde) ---
+
+    def _gerar_caixas(self, e):
+        molde, _, faces = paralelepipedo(1.0, 1.0, 1.0)
+        molde = np.asarray(molde, dtype=float) - 0.5
+        angulos = np.radians(e['angulos'])
+        c, s = np.cos(angulos)[:, None], np.sin(angulos)[:, None]
+        locais = molde * e['dimensoes'][:, None]
+        # Rotação em torno de Y (a mesma de matriz_rotacao_y)
+        x = c * locais[..., 0] + s * locais[..., 2]
+        z = -s * locais[..., 0] + c * locais[..., 2]
+        vertices = np.stack((x, locais[..., 1], z), axis=-1) + e['centros'][:, None]
+        return vertices, np.asarray(faces, dtype=np.int64)
+
+    def _gerar_cilindros(self, e):
+        molde, _, faces = cilindro(1.0, 1.0, self.divisoes_circulo)
+        u, eixo, w = _referencial_eixo(e['eixos'])
+        r, h = e['raios'][:, None, None], e['alturas'][:, None, None]
+        vertices = (e['bases'][:, None] + r * molde[None, :, 0, None] * u[:, None] +
+                    h * molde[None, :, 1, None] * eixo[:, None] + r * molde[None, :, 2, None] * w[:, None])
+        return vertices, np.asarray(faces, dtype=np.int64)
+
+    def _perfis_aneis(self, e):
+        """Perfis de anel (N, 2M, 2) com o raio e a espessura de cada cano."""
+        pontos, contornos, tampa = perfil_anel(1.0, 0.5, self.divisoes_circulo)
+        raios = np.column_stack((e['raios'], e['raios'] - e['espessuras']))
+        if np.any(raios[:, 1] <= 0):
+            raise ValueError("A espessura deve ser menor que o raio.")
+        circulo = pontos[0::2]
+        pontos = (circulo[None, :, None] * raios[:, None, :, None]).reshape(len(raios), -1, 2)
+        return pontos, contornos, tampa
+
+    def _gerar_canos_retos(self, e):
+        caminhos = np.stack((e['inicios'], e['fins']), axis=1)
+        vertices, _, faces = varrer_perfil(self._perfis_aneis(e), caminhos)
+        num = len(caminhos)
+        return vertices.reshape(num, -1, 3), faces[:len(faces) // num]
+
+    def _gerar_canos_curvos(self, e):
+        # Como em cano_curvado: anéis igualmente espaçados no arco, na direção de avanço
+        splines = SplineHermite(np.stack((e['P0'], e['P1']), axis=1), np.stack((e['T0'], e['T1']), axis=1))
+        caminhos, tangentes = splines.amostrar_direcoes(self.segmentos_curva)
+        vertices, _, faces = varrer_perfil(self._perfis_aneis(e), caminhos, tangentes, up=(0.0, 1.0, 0.0))
+        num = len(caminhos)
+        return vertices.reshape(num, -1, 3), faces[:len(faces) // num]
+
+    def construir(self, retornar_instancias=False):
+        """
+        Gera todas as primitivas e agrupa a geometria por material.
+
+        Args:
+            retornar_instancias (bool): Se True, cada buffer traz também o ID (a ordem
+                                        de adição) do objeto de cada face.
+
+        Returns:
+            dict: material -> (vertices (V, 3), faces (F, 3)), com os índices de cada
+                  buffer relativos aos seus próprios vértices, mais instancias (F,)
+                  quando retornar_instancias é True.
+        """
+        geradores = {'caixa': self._gerar_caixas, 'cilindro': self._gerar_cilindros,
+                     'cano_reto': self._gerar_canos_retos, 'cano_curvo': self._gerar_canos_curvos}
+        partes = {}
+        for tipo, gerar in geradores.items():
+            e = self._especificacoes(tipo)
+            if e is None:
+                continue
+            vertices, molde_faces = gerar(e)
+            # Instâncias agrupadas por material: cada grupo é um bloco contíguo
+            materiais, grupo = np.unique(e['material'], return_inverse=True)
+            ordem = np.argsort(grupo, kind='stable')
+            limites = np.searchsorted(grupo[ordem], np.arange(len(materiais) + 1))
+            for m, material in enumerate(materiais.tolist()):
+                instancias = ordem[limites[m]:limites[m + 1]]
+                partes.setdefault(material, []).append((vertices[instancias].reshape(-1, 3), molde_faces,
+                                                         e['id'][instancias], vertices.shape[1]))
+
+        buffers = {}
+        for material, lista in partes.items():
+            deslocamento, todos_vertices, todas_faces, todas_instancias = 0, [], [], []
+            for vertices, molde_faces, ids, por_instancia in lista:
+                todos_vertices.append(vertices)
+                todas_faces.append((molde_faces[None] + deslocamento +
+                                    (np.arange(len(ids)) * por_instancia)[:, None, None]).reshape(-1, 3))
+                if retornar_instancias:
+                    todas_instancias.append(np.repeat(ids, len(molde_faces)))
+                deslocamento += len(vertices)
+            buffers[material] = (np.concatenate(todos_vertices), np.concatenate(todas_faces))
+            if retornar_instancias:
+                buffers[material] += (np.concatenate(todas_instancias),)
+        return buffers
+
+    def cena(self, retornar_instancias=False):
+        """
+        A cena no formato de compor_cena(): (vertices, faces, cores, vertices_linha,
+        arestas_linha), com as faces em blocos por material e sem linhas. Com
+        retornar_instancias=True, devolve também o ID do objeto de cada face (F,),
+        pronto para o buffer de IDs (ver selecao.py).
+        """
+        buffers = self.construir(retornar_instancias)
+        todos_vertices, todas_faces, todas_instancias, cores, deslocamento = [], [], [], [], 0
+        for material, (vertices, faces, *instancias) in buffers.items():
+            todos_vertices.append(vertices)
+            todas_faces.append(faces + deslocamento)
+            todas_instancias.extend(instancias)
+            cores.extend([material] * len(faces))
+            deslocamento += len(vertices)
+        vertices = np.concatenate(todos_vertices) if todos_vertices else np.zeros((0, 3))
+        faces = np.concatenate(todas_faces) if todas_faces else np.zeros((0, 3), dtype=np.int64)
+        cena = (vertices, faces, cores, np.zeros((0, 3)), np.zeros((0, 2), dtype=np.int64))
+        if retornar_instancias:
+            instancias = np.concatenate(todas_instancias) if todas_instancias else np.zeros(0, dtype=np.int64)
+            return cena + (instancias,)
+        return cena
+
+def planta_aleatoria(num_objetos, extensao=50.0, semente=0):
+    """
+    Uma planta sintética com num_objetos divididos entre os quatro tipos, com
+    materiais variados, no mesmo espírito de cena_sintetica().
+    """
+    gerador = np.random.default_rng(semente)
+    n = num_objetos // 4
+    construtor = ConstrutorCena()
+    materiais = np.array(['gray', 'lightgreen', 'deepskyblue', 'cornflowerblue'])
+    construtor.adicionar_caixas(gerador.uniform(-extensao, extensao, (n, 3)), gerador.uniform(0.5, 3.0, (n, 3)),
+                                gerador.uniform(0, 360, n), 'gray')
+    construtor.adicionar_cilindros(gerador.uniform(-extensao, extensao, (n, 3)), gerador.normal(size=(n, 3)),
+                                   gerador.uniform(0.3, 1.5, n), gerador.uniform(1.0, 4.0, n), 'cornflowerblue')
+    inicios = gerador.uniform(-extensao, extensao, (n, 3))
+    raios = gerador.uniform(0.4, 1.2, n)
+    construtor.adicionar_canos_retos(inicios, inicios + gerador.uniform(-6, 6, (n, 3)), raios, 0.2 * raios,
+                                     materiais[gerador.integers(1, 3, n)])
+    n_curvos = num_objetos - 3 * n
+    P0 = gerador.uniform(-extensao, extensao, (n_curvos, 3))
+    raios = gerador.uniform(0.3, 0.8, n_curvos)
+    construtor.adicionar_canos_curvos(P0, P0 + gerador.uniform(-4, 4, (n_curvos, 3)),
+                                      gerador.uniform(-8, 8, (n_curvos, 3)), gerador.uniform(-8, 8, (n_curvos, 3)),
+                                      raios, 0.2 * raios, materiais[gerador.integers(1, 3, n_curvos)])
+    return construtor
+
+if __name__ == '__main__':
+    from cenas_sinteticas import cena_sintetica
+
+    print(f"{'objetos':>8}{'vértices':>11}{'faces':>11}{'construir (ms)':>16}{'µs/objeto':>11}"
+          f"{'um a um (ms)':>14}{'ganho':>8}")
+    for num_objetos in (1000, 2500, 10000, 20000, 40000):
+        construtor = planta_aleatoria(num_objetos)
+        inicio = time.perf_counter()
+        vertices, faces, cores, _, _ = construtor.cena()
+        tempo = time.perf_counter() - inicio
+        linha = (f"{num_objetos:>8}{len(vertices):>11}{len(faces):>11}{tempo * 1000:>16.1f}"
+                 f"{tempo / num_objetos * 1e6:>11.1f}")
+        if num_objetos <= 10000:
+            # O mesmo número de objetos montado um a um (padrão de compor_cena)
+            inicio = time.perf_counter()
+            cena_sintetica(num_objetos // 4)
+            tempo_um_a_um = time.perf_counter() - inicio
+            linha += f"{tempo_um_a_um * 1000:>14.1f}{tempo_um_a_um / tempo:>7.1f}x"
+        print(linha)
+    buffers = planta_aleatoria(10000).construir()
+    print("\nbuffers por material (10000 objetos):")
+    for material, (vertices, faces) in buffers.items():
+        print(f"  {material:<15}{len(vertices):>9} vértices {len(faces):>9} faces")
@@ -0,0 +1,57 @@
+import numpy as np
+
+from camera import Camera
+from mundo import compor_cena
+from rasterizacao import rasterizar_quadro
+from construtor_cena import planta_aleatoria
+from sombras import MapaSombra
+from benchmark import cronometrar
+import perfil
+
+# --- Demonstração dos Mapas de Sombra ---
+# Custo do quadro com e sem sombras (e a divisão do tempo entre a rasterização
+# principal, o mapa e o teste de sombra) em duas cenas, e as imagens lado a lado.
+#
+# Uso:
+#   python demo_sombras.py
+
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    res = 800
+    direcao_luz = (-0.3, -0.5, -1.0)
+    vertices, faces, cores, v_linha, a_linha = compor_cena()
+    faces = np.asarray(faces)
+    camera = Camera((15.0, 13.0, 12.0), (0.0, 0.0, 0.0))
+    construtor = planta_aleatoria(400, extensao=10.0)
+    planta = construtor.cena()
+    casos = {'compor_cena': ((vertices, faces, cores, v_linha, a_linha), camera),
+             'planta_aleatoria(400)': (planta, Camera((30.0, 26.0, 24.0), (0.0, 0.0, 0.0)))}
+
+    figura, eixos = plt.subplots(2, 2, figsize=(12, 12))
+    for linha, (nome, ((v, f, c, vl, al), cam)) in enumerate(casos.items()):
+        def quadro(sombras=None):
+            return rasterizar_quadro(v, f, c, vl, al, None, None, None, res, sombreamento='flat',
+                                     direcao_luz=direcao_luz, camera=cam, sombras=sombras)
+        mapa = MapaSombra(v, f, direcao_luz)
+        t_sem = cronometrar(quadro)['minimo_s']
+        t_com = cronometrar(lambda: quadro(True))['minimo_s']
+        # Etapas do quadro com sombras (o tempo total oscila bem mais que a divisão entre elas)
+        perfil.limpar()
+        perfil.ativar()
+        for _ in range(3):
+            quadro(True)
+        perfil.desativar()
+        etapas = perfil.resumo()
+        print(f"\n{nome}: {len(f)} faces, mapa {mapa.res}x{mapa.res} float32")
+        print(f"  quadro sem sombras {t_sem * 1000:.1f} ms, com sombras=True {t_com * 1000:.1f} ms")
+        for nome_etapa in ('rasterizacao', 'mapa_sombra', 'sombras'):
+            print(f"  {nome_etapa:<13}{etapas[nome_etapa]['total_ms'] / 3:>9.1f} ms por quadro "
+                  f"({etapas[nome_etapa]['total_ms'] / etapas['rasterizacao']['total_ms']:.2f} da rasterização "
+                  f"principal)")
+        for coluna, sombras in enumerate((None, mapa)):
+            eixos[linha, coluna].imshow(quadro(sombras), origin='lower')
+            eixos[linha, coluna].set_title(f"{nome} {'com' if sombras is not None else 'sem'} sombras")
+            eixos[linha, coluna].axis('off')
+    plt.tight_layout()
+    plt.show()
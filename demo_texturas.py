@@ -0,0 +1,60 @@
+import time
+import numpy as np
+
+from camera import Camera
+from mundo import compor_cena
+from rasterizacao import rasterizar_quadro, MAPA_CORES
+from texturas import FILTROS, Textura, textura_listras, textura_rotulo, textura_xadrez
+from benchmark import cronometrar
+
+# --- Demonstração das Texturas com Mipmaps ---
+# Custo das texturas em um quadro 800x800 e o serrilhado de cada filtro a 100x100,
+# medido contra o quadro de 800 px reduzido por média 8x8.
+#
+# Uso:
+#   python demo_texturas.py
+
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    vertices, faces, cores, v_linha, a_linha, uvs = compor_cena(retornar_uvs=True)
+    faces = np.asarray(faces)
+    camera = Camera((15.0, 13.0, 12.0), (0.0, 0.0, 0.0))
+    inicio = time.perf_counter()
+    texturas = {
+        'gray': Textura(textura_xadrez(MAPA_CORES['gray'])),
+        'cornflowerblue': Textura(textura_rotulo(MAPA_CORES['cornflowerblue'])),
+        'lightgreen': Textura(textura_listras(MAPA_CORES['lightgreen'], periodo=8)),
+        'deepskyblue': Textura(textura_listras((0.9, 0.9, 0.85), periodo=32, cor_listra=MAPA_CORES['deepskyblue'])),
+    }
+    print(f"4 pirâmides de mipmaps 256x256 em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    def quadro(res, filtro='trilinear', com_texturas=True):
+        return rasterizar_quadro(vertices, faces, cores, v_linha, a_linha, None, None, None, res,
+                                 sombreamento='flat', camera=camera, uvs=uvs,
+                                 texturas=texturas if com_texturas else None, filtro_textura=filtro)
+
+    t_sem = cronometrar(lambda: quadro(800, com_texturas=False))['minimo_s']
+    t_com = cronometrar(lambda: quadro(800))['minimo_s']
+    print(f"quadro 800x800: sem texturas {t_sem * 1000:.1f} ms, trilinear {t_com * 1000:.1f} ms "
+          f"(+{(t_com / t_sem - 1) * 100:.0f}%)")
+
+    # Serrilhado a 100 px: a referência é o quadro de 800 px reduzido por média 8x8
+    referencia = quadro(800).reshape(100, 8, 100, 8, 3).mean(axis=(1, 3))
+    imagens = {'referência (800 px, média 8x8)': referencia}
+    for filtro in FILTROS:
+        imagem = quadro(100, filtro)
+        erro = np.sqrt(np.mean((imagem - referencia) ** 2))
+        print(f"100x100 {filtro:<10} erro RMS contra a referência: {erro:.4f}")
+        imagens[f"100 px, {filtro} (RMS {erro:.3f})"] = imagem
+
+    figura, eixos = plt.subplots(1, 5, figsize=(25, 5))
+    eixos[0].imshow(quadro(800), origin='lower')
+    eixos[0].set_title('800 px, trilinear')
+    for eixo, (titulo, imagem) in zip(eixos[1:], imagens.items()):
+        eixo.imshow(imagem, origin='lower', interpolation='nearest')
+        eixo.set_title(titulo)
+    for eixo in eixos:
+        eixo.axis('off')
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,201 @@
+import weakref
+from collections import OrderedDict
+import numpy as np
+
+# --- Iluminação: Normais e Modelos de Lambert / Blinn-Phong ---
+# As normais são calculadas uma única vez por malha, de forma vetorizada sobre o
+# array de faces (F, 3), e ficam em cache junto com a malha. A iluminação é
+# avaliada em lote (por face no sombreamento flat, por vértice no Gouraud), então
+# o custo cresce linearmente com o número de vértices, sem laços Python por face.
+
+# Cache de normais (LRU): a chave é a identidade dos arrays da malha, isto é, o
+# array dono da memória (seguindo .base) e a posição da visão dentro dele, então
+# visões e reshapes do mesmo array (np.asarray(faces).reshape(-1, 3)) acertam o
+# cache. As referências fracas garantem que uma entrada nunca é reaproveitada por
+# outra malha que ganhou o mesmo id() depois que a original foi coletada; a
+# entrada sai quando os vértices ou as faces são coletados, ou quando o cache
+# passa de TAMANHO_CACHE_NORMAIS malhas. Listas Python não têm identidade estável
+# (viram um array novo a cada chamada): quem as usa pode passar as normais
+# prontas para cores_sombreadas.
+TAMANHO_CACHE_NORMAIS = 16
+_cache_normais = OrderedDict()
+
+def _dono(array):
+    """Array que é dono da memória de uma visão."""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+def _chave_array(array):
+    return (id(_dono(array)), array.__array_interface__['data'][0], array.shape, array.strides,
+            array.dtype.str)
+
+def calcular_normais(vertices, faces):
+    """
+    Calcula as normais das faces e as normais dos vértices ponderadas por área.
+
+    Args:
+        vertices (np.array): Array (N, 3) de vértices.
+        faces (np.array): Array (F, 3) de índices, com enrolamento anti-horário
+                          visto de fora (normal apontando para fora do sólido).
+
+    Returns:
+        tuple: (normais_faces, normais_vertices), arrays unitários (F, 3) e (N, 3).
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+
+    # O produto vetorial tem módulo igual a 2x a área do triângulo, então somar
+    # os vetores não normalizados já pondera cada face pela sua área.
+    v0, v1, v2 = vertices[faces[:, 0]], vertices[faces[:, 1]], vertices[faces[:, 2]]
+    normais_area = np.cross(v1 - v0, v2 - v0)
+
+    normais_vertices = np.zeros_like(vertices)
+    for eixo in range(3):
+        pesos = np.repeat(normais_area[:, eixo], 3)
+        normais_vertices[:, eixo] = np.bincount(faces.ravel(), weights=pesos, minlength=len(vertices))
+
+    normais_faces = normais_area / np.maximum(np.linalg.norm(normais_area, axis=1, keepdims=True), 1e-12)
+    normais_vertices /= np.maximum(np.linalg.norm(normais_vertices, axis=1, keepdims=True), 1e-12)
+    return normais_faces, normais_vertices
+
+def normais_malha(vertices, faces):
+    """
+    Versão em cache de calcular_normais.
+
+    A malha é identificada pelos próprios arrays de vértices e faces (ver o
+    cache acima), que não devem ser alterados no lugar depois da primeira
+    chamada (o pipeline sempre cria arrays novos ao transformar vértices).
+    Com listas, as normais são calculadas sem cache.
+    """
+    if not (isinstance(vertices, np.ndarray) and isinstance(faces, np.ndarray)):
+        return calcular_normais(vertices, faces)
+    dono_v, dono_f = _dono(vertices), _dono(faces)
+    chave = (_chave_array(vertices), _chave_array(faces))
+    entrada = _cache_normais.get(chave)
+    if entrada is not None and entrada[0]() is dono_v and entrada[1]() is dono_f:
+        _cache_normais.move_to_end(chave)
+        return entrada[2]
+
+    normais = calcular_normais(vertices, faces)
+    _cache_normais[chave] = (weakref.ref(dono_v), weakref.ref(dono_f), normais)
+    for dono in (dono_v, dono_f):
+        weakref.finalize(dono, _cache_normais.pop, chave, None)
+    while len(_cache_normais) > TAMANHO_CACHE_NORMAIS:
+        _cache_normais.popitem(last=False)
+    return normais
+
+def iluminar(posicoes, normais, cores_base, posicao_camera, direcao_luz, modelo='blinn_phong',
+             ambiente=0.2, difusa=0.8, especular=0.3, brilho=32.0, cor_luz=(1.0, 1.0, 1.0)):
+    """
+    Avalia o modelo de iluminação em lote para um conjunto de pontos.
+
+    Args:
+        posicoes (np.array): Array (K, 3) dos pontos iluminados (centros de face ou vértices).
+        normais (np.array): Array (K, 3) de normais unitárias.
+        cores_base (np.array): Array (K, 3) ou (3,) com a cor RGB do material.
+        posicao_camera (np.array): Posição do observador (para o termo especular).
+        direcao_luz (np.array): Direção *para onde* a luz aponta (luz direcional).
+        modelo (str): 'lambert' (só difusa) ou 'blinn_phong' (difusa + especular).
+        ambiente, difusa, especular (float): Coeficientes de cada termo.
+        brilho (float): Expoente especular de Blinn-Phong.
+        cor_luz (tuple): Cor RGB da luz.
+
+    Returns:
+        np.array: Array (K, 3) de cores RGB no intervalo [0, 1].
+    """
+    normais = np.asarray(normais, dtype=float)
+    cores_base = np.broadcast_to(np.asarray(cores_base, dtype=float), normais.shape)
+    cor_luz = np.asarray(cor_luz, dtype=float)
+
+    L = -np.asarray(direcao_luz, dtype=float)
+    L = L / np.linalg.norm(L)
+    n_dot_l = np.clip(normais @ L, 0.0, None)
+
+    cor = cores_base * (ambiente + difusa * n_dot_l[:, None]) * cor_luz
+    if modelo == 'blinn_phong':
+        V = np.asarray(posicao_camera, dtype=float) - np.asarray(posicoes, dtype=float)
+        V /= np.maximum(np.linalg.norm(V, axis=1, keepdims=True), 1e-12)
+        H = V + L
+        H /= np.maximum(np.linalg.norm(H, axis=1, keepdims=True), 1e-12)
+        n_dot_h = np.clip(np.einsum('ij,ij->i', normais, H), 0.0, None)
+        termo_especular = especular * n_dot_h ** brilho * (n_dot_l > 0)
+        cor = cor + termo_especular[:, None] * cor_luz
+    elif modelo != 'lambert':
+        raise ValueError(f"Modelo de iluminação desconhecido: {modelo}")
+    return np.clip(cor, 0.0, 1.0)
+
+def cores_sombreadas(vertices, faces, cores_faces_rgb, posicao_camera, direcao_luz,
+                     sombreamento='flat', normais=None, **parametros_luz):
+    """
+    Calcula as cores iluminadas de uma malha.
+
+    Args:
+        vertices, faces: Malha (faces como array (F, 3)).
+        cores_faces_rgb (np.array): Array (F, 3) com a cor de material de cada face.
+        posicao_camera, direcao_luz: Observador e luz direcional.
+        sombreamento (str): 'flat' (uma cor por face, avaliada no centro da face)
+                            ou 'gouraud' (uma cor por canto de face, avaliada nos
+                            vértices com as normais suavizadas).
+        normais (tuple, opcional): (normais_faces, normais_vertices) já calculadas
+                                   com calcular_normais; sem elas, vêm de normais_malha.
+        **parametros_luz: Repassados para iluminar().
+
+    Returns:
+        np.array: (F, 3) para 'flat' ou (F, 3, 3) (cor por canto) para 'gouraud'.
+    """
+    # O cache usa os arrays recebidos, antes de qualquer conversão
+    normais_faces, normais_vertices = normais if normais is not None else normais_malha(vertices, faces)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    cores_faces_rgb = np.asarray(cores_faces_rgb, dtype=float)
+
+    if sombreamento == 'flat':
+        centros = np.asarray(vertices, dtype=float)[faces].mean(axis=1)
+        return iluminar(centros, normais_faces, cores_faces_rgb, posicao_camera, direcao_luz, **parametros_luz)
+    if sombreamento == 'gouraud':
+        # A cor de material é por face, então a iluminação é avaliada por canto:
+        # (F*3) pontos com a posição e a normal suavizada do vértice correspondente.
+        cantos = faces.ravel()
+        cores = iluminar(np.asarray(vertices, dtype=float)[cantos], normais_vertices[cantos],
+                         np.repeat(cores_faces_rgb, 3, axis=0), posicao_camera, direcao_luz, **parametros_luz)
+        return cores.reshape(-1, 3, 3)
+    raise ValueError(f"Sombreamento desconhecido: {sombreamento}")
+
+def sombrear_framebuffer(framebuffer, buffer_face, pontos_tela, faces, cores, y_inicio=0):
+    """
+    Pinta no framebuffer as cores das faces visíveis (saída do z-buffer).
+
+    Args:
+        framebuffer (np.array): Imagem (altura, largura, 3) a ser preenchida.
+        buffer_face (np.array): Buffer (altura, largura) de índices de face (-1 = fundo).
+        pontos_tela (np.array): Array (N, 2) de coordenadas de tela dos vértices.
+        faces (np.array): Array (F, 3) de índices.
+        cores (np.array): (F, 3) para sombreamento flat ou (F, 3, 3) para Gouraud,
+                          caso em que a cor é interpolada com as coordenadas
+                          baricêntricas de tela de cada pixel.
+        y_inicio (int): Linha da tela correspondente à linha 0 dos buffers, quando
+                        eles são uma faixa da tela (ver render_paralelo.py).
+
+    Returns:
+        np.array: O próprio framebuffer.
+    """
+    altura, largura = buffer_face.shape
+    pixels = np.nonzero(buffer_face.reshape(-1) >= 0)[0]
+    f = buffer_face.reshape(-1)[pixels]
+    destino = framebuffer.reshape(-1, 3)
+    if cores.ndim == 2:
+        destino[pixels] = cores[f]
+        return framebuffer
+
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    tri = pontos_tela[faces[f]]
+    px = (pixels % largura).astype(float)
+    py = (pixels // largura + y_inicio).astype(float)
+    d1, d2 = tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]
+    area = d1[:, 0] * d2[:, 1] - d2[:, 0] * d1[:, 1]
+    rx, ry = px - tri[:, 0, 0], py - tri[:, 0, 1]
+    b1 = (rx * d2[:, 1] - d2[:, 0] * ry) / area
+    b2 = (d1[:, 0] * ry - rx * d1[:, 1]) / area
+    bar = np.stack((1 - b1 - b2, b1, b2), axis=1)
+    destino[pixels] = np.einsum('ij,ijk->ik', bar, cores[f])
+    return framebuffer
@@ -0,0 +1,227 @@
+import numpy as np
+
+from camera import Camera
+from mundo import compor_cena
+from buffer_profundidade import projetar_vertices, rasterizar_triangulos, faces_na_frente
+
+# --- Modo Arame / Linhas Ocultas ---
+# Desenho técnico da cena: em vez de pintar as faces, desenhamos apenas as
+# arestas. As faces são usadas só para preencher um buffer de profundidade, que
+# decide quais trechos de cada aresta estão visíveis.
+
+MODOS = ('arame', 'linhas_ocultas', 'silhuetas')
+
+def tabela_adjacencia_arestas(faces):
+    """
+    Monta a tabela aresta -> faces de uma malha triangular, de forma vetorizada.
+
+    Args:
+        faces (np.array): Array (F, 3) de índices de vértices.
+
+    Returns:
+        tuple: (arestas, faces_adjacentes, vertices_opostos).
+               - arestas: array (E, 2) com as arestas únicas (menor índice primeiro).
+               - faces_adjacentes: array (E, 2) com as duas faces que usam a aresta
+                 (-1 na segunda coluna para arestas de borda).
+               - vertices_opostos: array (E, 2) com o vértice de cada face adjacente
+                 que não pertence à aresta (-1 quando não há face).
+    """
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    num_faces = faces.shape[0]
+
+    # Cada face contribui com 3 meias-arestas: (v0,v1), (v1,v2), (v2,v0)
+    meias = np.concatenate((faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]))
+    opostos = np.concatenate((faces[:, 2], faces[:, 0], faces[:, 1]))
+    face_de = np.tile(np.arange(num_faces), 3)
+    meias = np.sort(meias, axis=1)
+
+    # Ordena as meias-arestas pela aresta para agrupar as que se repetem
+    num_vertices = int(faces.max()) + 1 if num_faces else 0
+    chave = meias[:, 0] * num_vertices + meias[:, 1]
+    ordem = np.argsort(chave, kind='stable')
+    chave = chave[ordem]
+    primeiro = np.ones(chave.size, dtype=bool)
+    primeiro[1:] = chave[1:] != chave[:-1]
+    inicio = np.nonzero(primeiro)[0]
+
+    # A segunda face (se existir) é a meia-aresta seguinte com a mesma chave
+    segundo = np.minimum(inicio + 1, chave.size - 1)
+    tem_par = (inicio + 1 < chave.size) & (chave[segundo] == chave[inicio])
+
+    arestas = meias[ordem[inicio]]
+    faces_adjacentes = np.full((inicio.size, 2), -1, dtype=np.int64)
+    vertices_opostos = np.full((inicio.size, 2), -1, dtype=np.int64)
+    faces_adjacentes[:, 0] = face_de[ordem[inicio]]
+    vertices_opostos[:, 0] = opostos[ordem[inicio]]
+    faces_adjacentes[tem_par, 1] = face_de[ordem[segundo[tem_par]]]
+    vertices_opostos[tem_par, 1] = opostos[ordem[segundo[tem_par]]]
+    return arestas, faces_adjacentes, vertices_opostos
+
+def arestas_silhueta(vertices, arestas, vertices_opostos, posicao_camera):
+    """
+    Detecta as arestas de silhueta vistas de uma posição de câmera.
+
+    Uma aresta é de silhueta quando as duas faces vizinhas ficam do mesmo lado do
+    plano que passa pela câmera e pela aresta (uma vira a frente, a outra as costas).
+    O teste não depende do sentido de enrolamento das faces. Arestas de borda
+    (com uma só face) são sempre consideradas silhueta.
+
+    Returns:
+        np.array: Máscara booleana (E,).
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    a = vertices[arestas[:, 0]] - posicao_camera
+    b = vertices[arestas[:, 1]] - posicao_camera
+    normal_plano = np.cross(a, b)
+
+    borda = vertices_opostos[:, 1] < 0
+    c = vertices[vertices_opostos[:, 0]] - posicao_camera
+    d = vertices[np.where(borda, vertices_opostos[:, 0], vertices_opostos[:, 1])] - posicao_camera
+    lado_c = np.einsum('ij,ij->i', normal_plano, c)
+    lado_d = np.einsum('ij,ij->i', normal_plano, d)
+    return borda | (lado_c * lado_d > 0)
+
+def arestas_vinco(vertices, faces, faces_adjacentes, angulo_limite=30.0):
+    """
+    Detecta arestas de vinco (ângulo diedro acima de angulo_limite graus),
+    como as quinas de uma caixa. Usa o módulo do cosseno, então também não
+    depende do enrolamento das faces.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    normais = np.cross(vertices[faces[:, 1]] - vertices[faces[:, 0]],
+                       vertices[faces[:, 2]] - vertices[faces[:, 0]])
+    normais /= np.maximum(np.linalg.norm(normais, axis=1, keepdims=True), 1e-12)
+
+    interna = faces_adjacentes[:, 1] >= 0
+    n1 = normais[faces_adjacentes[:, 0]]
+    n2 = normais[np.where(interna, faces_adjacentes[:, 1], faces_adjacentes[:, 0])]
+    cosseno = np.abs(np.einsum('ij,ij->i', n1, n2))
+    return interna & (cosseno < np.cos(np.radians(angulo_limite)))
+
+def rasterizar_segmentos(pontos_tela, profundidade, segmentos, largura, altura):
+    """
+    Amostra segmentos 2D pixel a pixel (DDA vetorizado).
+
+    Returns:
+        tuple: (pixel, z, segmento) para cada amostra dentro da tela.
+    """
+    segmentos = np.asarray(segmentos, dtype=np.int64).reshape(-1, 2)
+    p0, p1 = pontos_tela[segmentos[:, 0]], pontos_tela[segmentos[:, 1]]
+    z0, z1 = profundidade[segmentos[:, 0]], profundidade[segmentos[:, 1]]
+    ok = np.isfinite(p0).all(axis=1) & np.isfinite(p1).all(axis=1)
+    segmentos_ok = np.nonzero(ok)[0]
+    p0, p1, z0, z1 = p0[ok], p1[ok], z0[ok], z1[ok]
+
+    # Uma amostra por pixel ao longo do eixo dominante
+    delta = p1 - p0
+    n = np.ceil(np.abs(delta).max(axis=1)).astype(np.int64) + 1
+    n = np.minimum(n, 4 * (largura + altura))
+    seg_rep = np.repeat(np.arange(n.size), n)
+    inicio = np.repeat(np.cumsum(n) - n, n)
+    t = (np.arange(seg_rep.size) - inicio) / np.maximum(n[seg_rep] - 1, 1)
+
+    x = np.rint(p0[seg_rep, 0] + t * delta[seg_rep, 0]).astype(np.int64)
+    y = np.rint(p0[seg_rep, 1] + t * delta[seg_rep, 1]).astype(np.int64)
+    z = z0[seg_rep] + t * (z1[seg_rep] - z0[seg_rep])
+    dentro = (x >= 0) & (x < largura) & (y >= 0) & (y < altura) & (z >= -1) & (z <= 1)
+    return y[dentro] * largura + x[dentro], z[dentro], segmentos_ok[seg_rep[dentro]]
+
+def _visivel(z_amostra, z_buffer, tolerancia, reversa):
+    """
+    Teste de profundidade com folga. No Z reverso o mais próximo tem z maior e,
+    como z = near / distância, a folga é relativa (uma fração da distância).
+    """
+    if reversa:
+        return z_amostra >= z_buffer * (1 - tolerancia)
+    return z_amostra <= z_buffer + tolerancia
+
+def renderizar_linhas_ocultas(vertices_cena, faces_cena, arestas_cena, vertices_linha, arestas_linha,
+                              camera_pos, ponto_alvo, up_mundo, res, modo='linhas_ocultas',
+                              tolerancia=None, camera=None):
+    """
+    Renderiza a cena como desenho técnico (arestas pretas sobre fundo branco).
+
+    Args:
+        vertices_cena, faces_cena: Malha da cena (como devolvida por compor_cena).
+        arestas_cena (np.array): Arestas (E, 2) dos sólidos, já com offsets.
+        vertices_linha, arestas_linha: Geometria da linha reta (sem faces).
+        camera_pos, ponto_alvo, up_mundo: Parâmetros da câmera.
+        res (int): Resolução (res x res) da imagem.
+        modo (str): 'arame' desenha todas as arestas, sem remoção de linhas ocultas;
+                    'linhas_ocultas' desenha as arestas dos sólidos e as silhuetas
+                    visíveis; 'silhuetas' desenha só silhuetas e vincos visíveis.
+        tolerancia (float): Folga no teste de profundidade: em coordenadas NDC (padrão
+                            2e-3) ou, com Z reverso, relativa à distância (padrão
+                            2e-2, equivalente ao 2e-3 NDC nas distâncias da cena).
+        camera (Camera, opcional): Substitui camera_pos, ponto_alvo e up_mundo.
+
+    Returns:
+        np.array: Imagem (res, res) com 1.0 no fundo e 0.0 nas linhas.
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo de linhas desconhecido: {modo!r} (use um de {MODOS})")
+    if camera is None:
+        camera = Camera(camera_pos, ponto_alvo, up_mundo)
+    mat_transform = camera.visao_projecao
+    if tolerancia is None:
+        tolerancia = 2e-2 if camera.reversa else 2e-3
+
+    faces_cena = np.asarray(faces_cena, dtype=np.int64).reshape(-1, 3)
+    arestas_cena = np.asarray(arestas_cena, dtype=np.int64).reshape(-1, 2)
+    imagem = np.ones((res, res))
+    pontos, z, w = projetar_vertices(vertices_cena, mat_transform, res, res)
+
+    # --- 1. Escolher as arestas a desenhar ---
+    arestas, faces_adj, opostos = tabela_adjacencia_arestas(faces_cena)
+    if modo == 'arame':
+        desenhar = arestas_cena
+    else:
+        silhueta = arestas_silhueta(vertices_cena, arestas, opostos, camera.posicao)
+        if modo == 'silhuetas':
+            desenhar = arestas[silhueta | arestas_vinco(vertices_cena, faces_cena, faces_adj)]
+        else:
+            desenhar = np.concatenate((np.sort(arestas_cena, axis=1), arestas[silhueta]))
+            desenhar = np.unique(desenhar, axis=0)
+
+    pixel, z_amostra, _ = rasterizar_segmentos(pontos, z, desenhar, res, res)
+
+    # --- 2. Teste contra o buffer de profundidade das faces ---
+    if modo != 'arame':
+        buffer_z, _ = rasterizar_triangulos(pontos, z, faces_cena, res, res,
+                                            validos=faces_na_frente(w, faces_cena), reversa=camera.reversa)
+        visivel = _visivel(z_amostra, buffer_z.reshape(-1)[pixel], tolerancia, camera.reversa)
+        pixel = pixel[visivel]
+    imagem.reshape(-1)[pixel] = 0.0
+
+    # --- 3. Linha reta (também respeita a profundidade) ---
+    pontos_l, z_l, w_l = projetar_vertices(vertices_linha, mat_transform, res, res)
+    if np.all(w_l > 0):
+        pixel_l, z_amostra_l, _ = rasterizar_segmentos(pontos_l, z_l, arestas_linha, res, res)
+        if modo != 'arame':
+            pixel_l = pixel_l[_visivel(z_amostra_l, buffer_z.reshape(-1)[pixel_l], tolerancia, camera.reversa)]
+        imagem.reshape(-1)[pixel_l] = 0.0
+
+    return imagem
+
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha, arestas_cena = \
+        compor_cena(retornar_arestas=True)
+
+    posicao_camera = np.array([15, 13, 12])
+    ponto_alvo = np.array([0, 0, 0])
+    vetor_up_mundo = np.array([0, 0, 1])
+
+    modos = ['arame', 'linhas_ocultas', 'silhuetas']
+    fig, axes = plt.subplots(1, len(modos), figsize=(6 * len(modos), 6))
+    fig.suptitle("Desenho Técnico da Cena", fontsize=16)
+    for ax, modo in zip(axes, modos):
+        imagem = renderizar_linhas_ocultas(vertices_cena, faces_cena, arestas_cena, vertices_linha,
+                                           arestas_linha, posicao_camera, ponto_alvo, vetor_up_mundo,
+                                           800, modo=modo)
+        ax.imshow(imagem, origin='lower', cmap='gray', vmin=0, vmax=1)
+        ax.set_title(modo)
+        ax.set_xticks([]); ax.set_yticks([])
+    plt.show()
@@ -1,10 +1,4 @@
-import matplotlib
-matplotlib.use('TkAgg')
 import numpy as np
-import solidos
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from mpl_toolkits.mplot3d import Axes3D
 
 
 # --- SESSÃO 1: Importando os Sólidos dos Módulos ---
@@ -14,6 +8,7 @@ from solidos.cilindro import cilindro # Supondo que a função esteja em cilindr
 from solidos.cano_reto import cano_reto
 from solidos.cano_curvo import cano_curvado, curva_hermite # Importar a função auxiliar também
 from solidos.reta import linha_reta
+from perfil import etapa
 
 # --- SESSÃO 2: Funções de Transformação (Podem continuar aqui ou ir para um módulo 'utils.py') ---
 
@@ -40,67 +35,116 @@ def aplicar_transformacao(vertices, matriz):
 
 # --- SESSÃO 3: Composição da Cena (Permanece igual) ---
 
-def compor_cena():
+def compor_cena(retornar_arestas=False, retornar_uvs=False):
+    """
+    Monta a cena com todos os sólidos já posicionados no mundo.
+
+    Args:
+        retornar_arestas (bool): Se True, devolve também as arestas de todos os
+                                 sólidos com faces, com os índices já deslocados
+                                 para o array de vértices da cena.
+        retornar_uvs (bool): Se True, devolve também as coordenadas de textura
+                             (F, 3, 2) de cada canto de face (ver texturas.py).
+
+    Returns:
+        tuple: (vertices, faces, cores, vertices_linha, arestas_linha), seguida de
+               um array (E, 2) de arestas quando retornar_arestas é True e das
+               coordenadas de textura quando retornar_uvs é True.
+    """
     todos_vertices = []
     todas_faces = []
     todas_cores = []
+    todas_arestas = []
+    todas_uvs = []  # só preenchida com retornar_uvs
 
     # --- Objeto 1: Paralelepípedo como base/chão ---
     # A função paralelepipedo() agora é importada do seu próprio arquivo.
-    v_caixa, _, f_caixa = paralelepipedo(largura=8, altura=3, profundidade=5)
+    with etapa('modelagem') as e:
+        v_caixa, a_caixa, f_caixa, *uv_caixa = paralelepipedo(largura=8, altura=3, profundidade=5, retornar_uvs=retornar_uvs)
+        e.saida = len(f_caixa)
     mat_caixa = matriz_translacao(2, 0, -6)
-    v_caixa = aplicar_transformacao(v_caixa, mat_caixa)
+    with etapa('transformacao_mundo', entrada=len(v_caixa)):
+        v_caixa = aplicar_transformacao(v_caixa, mat_caixa)
 
     offset = len(todos_vertices)
     todos_vertices.extend(v_caixa)
     todas_faces.extend(np.array(f_caixa) + offset)
+    todas_arestas.extend(np.array(a_caixa) + offset)
+    todas_uvs.extend(uv_caixa)
     todas_cores.extend(['gray'] * len(f_caixa))
 
     # --- Objeto 2: Cilindro em pé ---
-    v_cil, _, f_cil = cilindro(raio=2, altura=6)
+    with etapa('modelagem') as e:
+        v_cil, a_cil, f_cil, *uv_cil = cilindro(raio=2, altura=6, retornar_uvs=retornar_uvs)
+        e.saida = len(f_cil)
     mat_cil = matriz_translacao(5, 0, 5)
-    v_cil = aplicar_transformacao(v_cil, mat_cil)
+    with etapa('transformacao_mundo', entrada=len(v_cil)):
+        v_cil = aplicar_transformacao(v_cil, mat_cil)
 
     offset = len(todos_vertices)
     todos_vertices.extend(v_cil)
     todas_faces.extend(np.array(f_cil) + offset)
+    todas_arestas.extend(np.array(a_cil) + offset)
+    todas_uvs.extend(uv_cil)
     todas_cores.extend(['cornflowerblue'] * len(f_cil))
 
     # --- Objeto 3: Cano Reto deitado ---
-    v_cano_r, _, f_cano_r = cano_reto(raio=1.5, altura=8, espessura=0.3)
+    with etapa('modelagem') as e:
+        v_cano_r, a_cano_r, f_cano_r, *uv_cano_r = cano_reto(raio=1.5, altura=8, espessura=0.3, retornar_uvs=retornar_uvs)
+        e.saida = len(f_cano_r)
     mat_rot_cano_ry = matriz_rotacao_y(-45)
     mat_rot_cano_rz = matriz_rotacao_z(-30)
     mat_trans_cano_r = matriz_translacao(-8, 1.5, 0)
-    v_cano_r = aplicar_transformacao(v_cano_r, mat_rot_cano_ry @ mat_rot_cano_rz)
-    v_cano_r = aplicar_transformacao(v_cano_r, mat_trans_cano_r)
+    with etapa('transformacao_mundo', entrada=len(v_cano_r)):
+        v_cano_r = aplicar_transformacao(v_cano_r, mat_rot_cano_ry @ mat_rot_cano_rz)
+        v_cano_r = aplicar_transformacao(v_cano_r, mat_trans_cano_r)
 
     offset = len(todos_vertices)
     todos_vertices.extend(v_cano_r)
     todas_faces.extend(np.array(f_cano_r) + offset)
+    todas_arestas.extend(np.array(a_cano_r) + offset)
+    todas_uvs.extend(uv_cano_r)
     todas_cores.extend(['lightgreen'] * len(f_cano_r))
 
     # --- Objeto 4: Cano Curvado ---
     P0, P1 = np.array([-5,1, -8]), np.array([0,6,-4])
     T0, T1 = np.array([10,15,5]), np.array([5,0,10])
-    v_cano_c, _, f_cano_c = cano_curvado(1, 0.2, P0, P1, T0, T1, 30, 12)
+    with etapa('modelagem') as e:
+        v_cano_c, a_cano_c, f_cano_c, *uv_cano_c = cano_curvado(1, 0.2, P0, P1, T0, T1, 30, 12, retornar_uvs=retornar_uvs)
+        e.saida = len(f_cano_c)
 
     offset = len(todos_vertices)
     todos_vertices.extend(v_cano_c)
     todas_faces.extend(np.array(f_cano_c) + offset)
+    todas_arestas.extend(np.array(a_cano_c) + offset)
+    todas_uvs.extend(uv_cano_c)
     todas_cores.extend(['deepskyblue'] * len(f_cano_c))
 
     # --- Objeto 5: Linha Reta no ar ---
-    v_linha, a_linha, _ = linha_reta(7)
+    with etapa('modelagem') as e:
+        v_linha, a_linha, _ = linha_reta(7)
+        e.saida = len(a_linha)
     mat_rot1 = matriz_rotacao_y(45)
     mat_rot2 = matriz_rotacao_z(30)
     mat_trans = matriz_translacao(0, 7, -8)
-    v_linha = aplicar_transformacao(v_linha, mat_rot1 @ mat_rot2 @ mat_trans)
+    with etapa('transformacao_mundo', entrada=len(v_linha)):
+        v_linha = aplicar_transformacao(v_linha, mat_rot1 @ mat_rot2 @ mat_trans)
 
-    return np.array(todos_vertices), todas_faces, todas_cores, v_linha, a_linha
+    cena = (np.array(todos_vertices), todas_faces, todas_cores, v_linha, a_linha)
+    if retornar_arestas:
+        cena += (np.array(todas_arestas),)
+    if retornar_uvs:
+        cena += (np.concatenate(todas_uvs),)
+    return cena
 
 # --- SESSÃO 4: Bloco de Execução Principal e Visualização (Permanece igual) ---
 
 if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('TkAgg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    from mpl_toolkits.mplot3d import Axes3D
 
     vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha = compor_cena()
     fig = plt.figure(figsize=(15, 12))
@@ -0,0 +1,162 @@
+import os
+import warnings
+import numpy as np
+
+# --- Núcleos de Laço Interno: Backend NumPy (Referência) ou Numba ---
+# Alguns laços internos resistem à vetorização: o teste de profundidade percorre
+# os triângulos em ordem e cada um depende do buffer deixado pelos anteriores, e
+# o transporte do referencial de rotação mínima (solidos/varredura.py) depende
+# do anel anterior. Em NumPy eles viram lotes de fragmentos ordenados
+# (gerar_fragmentos + resolver_profundidade) ou um laço Python sobre os anéis.
+#
+# Este módulo escolhe, em tempo de execução, quem executa esses laços:
+# - 'numpy' (padrão): as implementações de referência, no próprio módulo de cada
+#   etapa; nucleo() devolve None e o chamador segue o caminho NumPy;
+# - 'numba': as mesmas operações compiladas com numba.njit(parallel=True). O
+#   rasterizador divide a tela em faixas horizontais (uma por thread, prange) e
+#   percorre os triângulos da faixa em ordem, com teste de profundidade por pixel
+#   e saída antecipada da linha assim que ela deixa o triângulo (convexo); o
+#   transporte dos referenciais roda um caminho por thread. Há também uma
+#   versão sequencial do rasterizador (nogil=True) para quem já distribui as
+#   faixas da tela entre as suas próprias threads.
+# Os núcleos compilados repetem as operações de ponto flutuante da referência na
+# mesma ordem (a configuração por triângulo é a mesma preparar_triangulos), e os
+# empates de profundidade ficam com a primeira face nos dois casos: os
+# framebuffers saem idênticos bit a bit (ver regressao_visual.py --backend).
+#
+# O Numba é opcional: sem ele, o backend 'numba' não aparece em
+# backends_disponiveis(). O backend inicial vem da variável de ambiente NUCLEOS
+# ('numpy', 'numba' ou 'auto' = numba se instalado); pedir 'numba' sem o pacote,
+# ou um NUCLEOS inválido, emite um aviso e mantém 'numpy'. A comparação dos
+# backends fica em benchmark.py --backends.
+
+BACKENDS = ('numpy', 'numba')
+
+# Altura (em linhas) das faixas do rasterizador compilado: cada faixa é uma
+# unidade de trabalho do prange
+ALTURA_FAIXA = 8
+
+_backend = 'numpy'
+_compilados = None
+
+def numba_disponivel():
+    """Indica se o pacote numba pode ser importado."""
+    try:
+        import numba
+    except ImportError:
+        return False
+    return True
+
+def backends_disponiveis():
+    """Backends que podem ser selecionados neste ambiente."""
+    return tuple(nome for nome in BACKENDS if nome != 'numba' or numba_disponivel())
+
+def usar_backend(nome):
+    """
+    Seleciona o backend dos núcleos.
+
+    Args:
+        nome (str): 'numpy' ou 'numba'; 'numba' sem o pacote instalado emite um
+                    aviso e seleciona 'numpy'.
+
+    Returns:
+        str: O backend que estava ativo (para restaurá-lo depois).
+    """
+    global _backend
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {nome!r} (use um de {BACKENDS}).")
+    if nome == 'numba' and not numba_disponivel():
+        warnings.warn("O backend 'numba' exige o pacote numba instalado: usando o backend 'numpy'.")
+        nome = 'numpy'
+    anterior, _backend = _backend, nome
+    return anterior
+
+def backend():
+    return _backend
+
+def nucleo(nome):
+    """
+    Versão compilada do núcleo 'nome' no backend ativo.
+
+    Returns:
+        function: O núcleo compilado, ou None no backend 'numpy' (o chamador usa a
+                  sua implementação de referência).
+    """
+    if _backend == 'numpy':
+        return None
+    return _compilar()[nome]
+
+def _compilar():
+    """Compila os núcleos Numba na primeira vez em que são pedidos."""
+    global _compilados
+    if _compilados is not None:
+        return _compilados
+    from numba import njit, prange
+
+    def rasterizar_triangulos(indices, xmin, xmax, ymin, ymax, A, B, C, topo_esquerda, z_tri,
+                              z_plano, face_plano, largura, y_inicio, altura, id_base, reversa, z_minimo, z_maximo):
+        # Mesma semântica de buffer_profundidade.rasterizar_faixa: faces em ordem
+        # crescente, vence a menor (ou, em Z reverso, a maior) profundidade já
+        # convertida para o tipo do buffer, e o empate fica com a face anterior
+        num_faixas = (altura + ALTURA_FAIXA - 1) // ALTURA_FAIXA
+        for faixa in prange(num_faixas):
+            y_faixa = y_inicio + faixa * ALTURA_FAIXA
+            y_fim = min(y_faixa + ALTURA_FAIXA, y_inicio + altura) - 1
+            convertido = z_plano[:1].copy()
+            for f in indices:
+                if ymin[f] > y_fim or ymax[f] < y_faixa:
+                    continue
+                for py in range(max(ymin[f], y_faixa), min(ymax[f], y_fim) + 1):
+                    entrou = False
+                    for px in range(xmin[f], xmax[f] + 1):
+                        b0 = A[f, 0] * px + B[f, 0] * py + C[f, 0]
+                        b1 = A[f, 1] * px + B[f, 1] * py + C[f, 1]
+                        b2 = A[f, 2] * px + B[f, 2] * py + C[f, 2]
+                        if not ((b0 > 0 or (b0 == 0 and topo_esquerda[f, 0])) and
+                                (b1 > 0 or (b1 == 0 and topo_esquerda[f, 1])) and
+                                (b2 > 0 or (b2 == 0 and topo_esquerda[f, 2]))):
+                            if entrou:
+                                break  # a linha já saiu do triângulo
+                            continue
+                        entrou = True
+                        z = b0 * z_tri[f, 0] + b1 * z_tri[f, 1] + b2 * z_tri[f, 2]
+                        if z < z_minimo or z > z_maximo:
+                            continue
+                        convertido[0] = z
+                        pixel = (py - y_inicio) * largura + px
+                        if (convertido[0] > z_plano[pixel]) if reversa else (convertido[0] < z_plano[pixel]):
+                            z_plano[pixel] = convertido[0]
+                            face_plano[pixel] = f + id_base
+
+    @njit(parallel=True, cache=True)
+    def transportar_normais(caminhos, tangentes, normais):
+        # Dupla reflexão de solidos/varredura._normais_referencial, com normais[:, 0] pronta
+        for p in prange(caminhos.shape[0]):
+            for k in range(caminhos.shape[1] - 1):
+                v1 = caminhos[p, k + 1] - caminhos[p, k]
+                c1 = max(v1[0] * v1[0] + v1[1] * v1[1] + v1[2] * v1[2], 1e-300)
+                n, t = normais[p, k], tangentes[p, k]
+                r = n - 2 / c1 * (v1[0] * n[0] + v1[1] * n[1] + v1[2] * n[2]) * v1
+                t = t - 2 / c1 * (v1[0] * t[0] + v1[1] * t[1] + v1[2] * t[2]) * v1
+                v2 = tangentes[p, k + 1] - t
+                c2 = v2[0] * v2[0] + v2[1] * v2[1] + v2[2] * v2[2]
+                fator = 2 / max(c2, 1e-300) if c2 > 1e-24 else 0.0
+                r = r - fator * (v2[0] * r[0] + v2[1] * r[1] + v2[2] * r[2]) * v2
+                normais[p, k + 1] = r / max(np.sqrt(r[0] * r[0] + r[1] * r[1] + r[2] * r[2]), 1e-300)
+
+    # O pool de threads do Numba não aceita chamadas paralelas vindas de várias
+    # threads ao mesmo tempo: quem já divide o trabalho (render_paralelo.py) usa a
+    # versão sequencial, que libera o GIL durante toda a chamada
+    _compilados = {'rasterizar_triangulos': njit(parallel=True, cache=True)(rasterizar_triangulos),
+                   'rasterizar_triangulos_sequencial': njit(nogil=True, cache=True)(rasterizar_triangulos),
+                   'transportar_normais': transportar_normais}
+    return _compilados
+
+_inicial = os.environ.get('NUCLEOS', 'numpy')
+if _inicial == 'auto':
+    _inicial = 'numba' if numba_disponivel() else 'numpy'
+if _inicial not in BACKENDS:
+    # Uma variável de ambiente inválida não pode impedir a importação dos renderizadores
+    warnings.warn(f"NUCLEOS={_inicial!r} não é um backend ({BACKENDS} ou 'auto'): usando o backend 'numpy'.")
+    _inicial = 'numpy'
+usar_backend(_inicial)
@@ -0,0 +1,251 @@
+import numpy as np
+
+from camera import Camera
+from buffer_profundidade import projetar_vertices, rasterizar_triangulos, faces_na_frente
+from iluminacao import cores_sombreadas, sombrear_framebuffer
+from rasterizacao import cores_rgb_faces, rasterizar_linhas, rasterizar_quadro
+from cenas_sinteticas import cena_canos_atras_de_paredes, CAMERA_PAREDES
+from perfil import etapa
+
+# --- Oclusão com Buffer de Profundidade Hierárquico (Hi-Z) ---
+# Em cenas de planta industrial a maior parte dos canos fica escondida atrás de
+# equipamentos e paredes, mas todas as faces passam pela projeção e pela
+# rasterização. Aqui a cena é dividida em objetos (intervalos contíguos de
+# vértices e faces) e renderizada em duas passadas:
+# 1. Os oclusores grandes (paredes, blocos de equipamento) são rasterizados.
+# 2. Da profundidade resultante monta-se uma pirâmide: cada nível guarda, em cada
+#    texel, a profundidade mais distante do bloco 2x2 do nível abaixo. A caixa
+#    envolvente de cada objeto restante é projetada na tela e comparada com uma
+#    janela fixa de texels do nível em que ela cabe (no máximo 5x5 texels): se o
+#    ponto mais próximo da caixa está atrás do mais distante desses texels, o
+#    objeto inteiro está escondido e nenhum dos seus vértices é sequer projetado.
+#    A janela 2x2 clássica usa texels 4x maiores, que nas bordas das paredes
+#    misturam o fundo e deixam passar a maioria dos objetos escondidos.
+# O teste é conservador: um objeto só é descartado se com certeza não aparece,
+# então a imagem é a mesma do z-buffer completo.
+
+def caixas_objetos(vertices, limites_vertices):
+    """
+    Caixas envolventes alinhadas aos eixos de cada objeto.
+
+    Args:
+        vertices (np.array): Vértices (N, 3) da cena.
+        limites_vertices (np.array): Início (K+1,) dos vértices de cada objeto.
+
+    Returns:
+        np.array: Caixas (K, 2, 3) com o canto mínimo e o máximo.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    inicios = np.asarray(limites_vertices)[:-1]
+    return np.stack((np.minimum.reduceat(vertices, inicios), np.maximum.reduceat(vertices, inicios)), axis=1)
+
+def piramide_profundidade(buffer_z, reversa=False):
+    """
+    Monta a pirâmide de profundidade (mip maps do buffer, reduzidos pelo mais distante).
+
+    Args:
+        buffer_z (np.array): Buffer de profundidade (altura, largura).
+        reversa (bool): Z reverso: o mais distante é o menor valor.
+
+    Returns:
+        list: Níveis, do buffer original (nível 0) até 1x1. Bordas ímpares são
+              completadas com o valor do fundo, que nunca oculta nada.
+    """
+    reduzir, fundo = (np.minimum, 0.0) if reversa else (np.maximum, np.inf)
+    niveis = [buffer_z]
+    while max(niveis[-1].shape) > 1:
+        nivel = niveis[-1]
+        altura, largura = nivel.shape
+        if altura % 2 or largura % 2:
+            nivel = np.pad(nivel, ((0, altura % 2), (0, largura % 2)), constant_values=fundo)
+        niveis.append(reduzir(reduzir(nivel[0::2, 0::2], nivel[0::2, 1::2]),
+                              reduzir(nivel[1::2, 0::2], nivel[1::2, 1::2])))
+    return niveis
+
+def caixas_ocultas(piramide, caixas, mat_transform, reversa=False, refinamento=2):
+    """
+    Testa as caixas envolventes contra a pirâmide de profundidade.
+
+    Args:
+        piramide (list): Saída de piramide_profundidade.
+        caixas (np.array): Caixas (K, 2, 3) no mundo.
+        mat_transform (np.array): Matriz 4x4 (projeção @ visão) da câmera.
+        reversa (bool): Z reverso.
+        refinamento (int): Quantos níveis abaixo do nível em que a caixa cobre 2x2
+                           texels o teste é feito. Cada nível a mais lê uma janela
+                           maior ((2^refinamento + 1)^2 texels), mas com texels
+                           menores, que erram menos nas bordas dos oclusores.
+
+    Returns:
+        np.array: Máscara (K,) das caixas certamente escondidas (ou fora da tela).
+    """
+    altura, largura = piramide[0].shape
+    # Os 8 cantos de cada caixa: (K, 8, 3)
+    selecao = np.array(np.meshgrid([0, 1], [0, 1], [0, 1], indexing='ij')).reshape(3, -1).T
+    cantos = caixas[:, selecao, [0, 1, 2]]
+    pontos, z, w = projetar_vertices(cantos.reshape(-1, 3), mat_transform, largura, altura)
+    pontos, z = pontos.reshape(-1, 8, 2), z.reshape(-1, 8)
+
+    # Caixas que cruzam o plano da câmera não podem ser testadas: ficam visíveis
+    testaveis = (w.reshape(-1, 8) > 0).all(axis=1)
+    with np.errstate(invalid='ignore'):
+        x0 = np.clip(np.floor(pontos[:, :, 0].min(axis=1)), 0, largura)
+        x1 = np.clip(np.ceil(pontos[:, :, 0].max(axis=1)), -1, largura - 1)
+        y0 = np.clip(np.floor(pontos[:, :, 1].min(axis=1)), 0, altura)
+        y1 = np.clip(np.ceil(pontos[:, :, 1].max(axis=1)), -1, altura - 1)
+    fora_da_tela = testaveis & ((x0 > x1) | (y0 > y1))
+    testaveis &= ~fora_da_tela
+    z_proximo = z.max(axis=1) if reversa else z.min(axis=1)
+
+    # --- Nível em que a caixa cobre no máximo (2^refinamento + 1)^2 texels ---
+    extensao = np.maximum(x1 - x0, y1 - y0) + 1
+    nivel = np.ceil(np.log2(np.maximum(extensao, 1))) - refinamento
+    nivel = np.clip(nivel, 0, len(piramide) - 1).astype(np.int64)
+    x0, x1, y0, y1 = (np.where(testaveis, v, 0).astype(np.int64) for v in (x0, x1, y0, y1))
+    passos = np.arange(2 ** refinamento + 1)
+
+    ocultas = fora_da_tela.copy()
+    for n in np.unique(nivel[testaveis]):
+        k = np.flatnonzero(testaveis & (nivel == n))
+        # Janela fixa de texels a partir do canto da caixa; os que passam da caixa
+        # repetem o último texel dela
+        colunas = np.minimum((x0[k] >> n)[:, None] + passos, (x1[k] >> n)[:, None])
+        linhas = np.minimum((y0[k] >> n)[:, None] + passos, (y1[k] >> n)[:, None])
+        janela = piramide[n][linhas[:, :, None], colunas[:, None, :]].reshape(len(k), -1)
+        if reversa:
+            ocultas[k] = z_proximo[k] < janela.min(axis=1)
+        else:
+            ocultas[k] = z_proximo[k] > janela.max(axis=1)
+    return ocultas
+
+def _geometria_objetos(vertices, faces, limites_vertices, limites_faces, selecionados):
+    """
+    Extrai, sem laços Python, os vértices e faces dos objetos selecionados.
+
+    Returns:
+        tuple: (vertices (n, 3), faces (m, 3) reindexadas, índices (m,) das faces na cena).
+    """
+    num_vertices = np.diff(limites_vertices)
+    num_faces = np.diff(limites_faces)
+    mascara_v = np.repeat(selecionados, num_vertices)
+    mascara_f = np.repeat(selecionados, num_faces)
+    # Cada objeto mantido desloca seus índices pelo número de vértices descartados antes dele
+    novo_inicio = np.cumsum(num_vertices * selecionados) - num_vertices * selecionados
+    deslocamento = np.repeat(limites_vertices[:-1] - novo_inicio, num_faces)[mascara_f]
+    return vertices[mascara_v], faces[mascara_f] - deslocamento[:, None], np.flatnonzero(mascara_f)
+
+def rasterizar_com_oclusao(vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha, objetos,
+                           camera, res, sombreamento='flat', direcao_luz=(-0.3, -0.5, -1.0), hi_z=True,
+                           caixas=None):
+    """
+    Rasteriza a cena objeto a objeto, com descarte por frustum e por oclusão Hi-Z.
+
+    Args:
+        objetos (dict): 'limites_vertices', 'limites_faces' e 'oclusor' (ver
+                        cenas_sinteticas.cena_canos_atras_de_paredes).
+        camera (Camera): Câmera da cena.
+        res (int): Resolução do framebuffer (res x res).
+        sombreamento (str): 'flat', 'gouraud' ou None (cores sem luz).
+        hi_z (bool): Se False, só o descarte por frustum é feito (para comparação).
+        caixas (np.array, opcional): Caixas de caixas_objetos, se já calculadas
+                                     (geometria estática entre quadros).
+
+    Returns:
+        tuple: (framebuffer (res, res, 3), estatísticas), com o número de objetos
+               'descartados_frustum', 'descartados_oclusao' e 'rasterizados'.
+    """
+    vertices = np.asarray(vertices_cena, dtype=float)
+    faces_array = np.asarray(faces_cena, dtype=np.int64).reshape(-1, 3)
+    limites_vertices = np.asarray(objetos['limites_vertices'])
+    limites_faces = np.asarray(objetos['limites_faces'])
+    oclusor = np.asarray(objetos['oclusor'], dtype=bool)
+    mat_transform = camera.visao_projecao
+    framebuffer = np.zeros((res, res, 3))
+
+    # --- 1. Descarte por Frustum (esferas das caixas) ---
+    with etapa('recorte', entrada=len(oclusor)) as e:
+        if caixas is None:
+            caixas = caixas_objetos(vertices, limites_vertices)
+        centros = caixas.mean(axis=1)
+        raios = np.linalg.norm(caixas[:, 1] - caixas[:, 0], axis=1) / 2
+        no_frustum = camera.esferas_no_frustum(centros, raios)
+        e.saida = int(np.count_nonzero(no_frustum))
+
+    buffers = {'z': None, 'face': None}
+    passadas = []
+
+    def rasterizar_objetos(selecionados):
+        v, f, ids = _geometria_objetos(vertices, faces_array, limites_vertices, limites_faces, selecionados)
+        with etapa('projecao', entrada=len(v)):
+            pontos, z, w = projetar_vertices(v, mat_transform, res, res)
+        with etapa('rasterizacao', entrada=len(f)):
+            id_base = sum(len(passada[2]) for passada in passadas)
+            buffers['z'], buffers['face'] = rasterizar_triangulos(
+                pontos, z, f, res, res, validos=faces_na_frente(w, f), buffer_z=buffers['z'],
+                buffer_face=buffers['face'], id_base=id_base, reversa=camera.reversa,
+                dtype=np.float32 if camera.reversa else np.float64)
+        passadas.append((v, pontos, f, ids))
+
+    # --- 2. Oclusores Primeiro ---
+    rasterizar_objetos(no_frustum & oclusor)
+
+    # --- 3. Teste Hi-Z dos Demais Objetos ---
+    candidatos = no_frustum & ~oclusor
+    ocultos = np.zeros_like(candidatos)
+    if hi_z and candidatos.any():
+        with etapa('oclusao', entrada=int(np.count_nonzero(candidatos))) as e:
+            piramide = piramide_profundidade(buffers['z'], camera.reversa)
+            indices = np.flatnonzero(candidatos)
+            ocultos[indices] = caixas_ocultas(piramide, caixas[indices], mat_transform, camera.reversa)
+            e.saida = int(np.count_nonzero(candidatos & ~ocultos))
+    rasterizar_objetos(candidatos & ~ocultos)
+
+    # --- 4. Sombreamento das Faces Rasterizadas ---
+    deslocamentos = np.cumsum([0] + [len(passada[0]) for passada in passadas[:-1]])
+    v_todos = np.concatenate([passada[0] for passada in passadas])
+    pontos_todos = np.concatenate([passada[1] for passada in passadas])
+    f_todas = np.concatenate([passada[2] + d for passada, d in zip(passadas, deslocamentos)])
+    ids_todos = np.concatenate([passada[3] for passada in passadas])
+    cores = cores_rgb_faces(np.asarray(cores_faces)[ids_todos])
+    if sombreamento is not None:
+        with etapa('sombreamento', entrada=len(f_todas)):
+            cores = cores_sombreadas(v_todos, f_todas, cores, camera.posicao, direcao_luz,
+                                     sombreamento=sombreamento)
+    sombrear_framebuffer(framebuffer, buffers['face'], pontos_todos, f_todas, cores)
+
+    with etapa('rasterizacao', entrada=len(arestas_linha)):
+        v_homogeneos_linha = np.hstack((vertices_linha, np.ones((len(vertices_linha), 1))))
+        rasterizar_linhas(framebuffer, v_homogeneos_linha @ mat_transform.T, arestas_linha)
+
+    estatisticas = {
+        'objetos': len(oclusor),
+        'descartados_frustum': int(np.count_nonzero(~no_frustum)),
+        'descartados_oclusao': int(np.count_nonzero(ocultos)),
+        'rasterizados': int(np.count_nonzero(no_frustum & ~ocultos)),
+        'faces_rasterizadas': len(f_todas),
+    }
+    return framebuffer, estatisticas
+
+if __name__ == '__main__':
+    from benchmark import cronometrar
+
+    cena, objetos = cena_canos_atras_de_paredes()
+    camera = Camera(*CAMERA_PAREDES)
+    caixas = caixas_objetos(cena[0], objetos['limites_vertices'])
+    res = 400
+    print(f"{len(objetos['oclusor'])} objetos, {len(cena[1])} faces, {res}x{res} pixels")
+
+    referencia = rasterizar_quadro(*cena, None, None, None, res, sombreamento='flat', camera=camera)
+    tempos = {'rasterizar_quadro': cronometrar(
+        lambda: rasterizar_quadro(*cena, None, None, None, res, sombreamento='flat', camera=camera), 3)['minimo_s']}
+    for nome, hi_z in (('só frustum', False), ('frustum + Hi-Z', True)):
+        framebuffer, estatisticas = rasterizar_com_oclusao(*cena, objetos, camera, res, hi_z=hi_z, caixas=caixas)
+        tempos[nome] = cronometrar(lambda: rasterizar_com_oclusao(*cena, objetos, camera, res, hi_z=hi_z,
+                                                                  caixas=caixas), 3)['minimo_s']
+        diferentes = int(np.count_nonzero(np.abs(framebuffer - referencia).max(axis=2) > 1e-9))
+        print(f"{nome:<16} descartados: {estatisticas['descartados_frustum']} frustum, "
+              f"{estatisticas['descartados_oclusao']} oclusão; {estatisticas['faces_rasterizadas']} faces "
+              f"rasterizadas; {diferentes} pixels diferentes do z-buffer completo")
+
+    for nome, tempo in tempos.items():
+        print(f"{nome:<20}{tempo * 1000:>10.1f} ms{tempos['rasterizar_quadro'] / tempo:>8.2f}x")
@@ -0,0 +1,80 @@
+import time
+import numpy as np
+
+# --- Ordenação por Profundidade (Algoritmo do Pintor) ---
+# O pintor só precisa de uma permutação que leve as faces do fundo para a frente.
+# Em vez de ordenar dicionários em Python, a profundidade de todas as faces fica em
+# um array e a ordem é calculada de uma vez: por argsort estável sobre float64 ou
+# por um radix sort LSD de 32 bits (duas passadas de 16 bits) sobre a profundidade
+# convertida em float32. O numpy ordena inteiros de 16 bits com kind='stable'
+# usando radix sort, então cada passada é O(F).
+
+METODOS = ('radix', 'argsort')
+
+def chaves_float32(valores):
+    """
+    Converte valores reais em chaves uint32 com a mesma ordem dos float32
+    correspondentes: positivos têm o bit de sinal ligado; negativos têm todos os
+    bits invertidos.
+
+    Args:
+        valores (np.array): Valores (N,) a ordenar.
+
+    Returns:
+        np.array: Chaves (N,) uint32.
+    """
+    bits = np.ascontiguousarray(valores, dtype=np.float32).view(np.uint32)
+    mascara = (np.uint32(0) - (bits >> np.uint32(31))) | np.uint32(0x80000000)
+    return bits ^ mascara
+
+def ordenar_radix(chaves):
+    """
+    Radix sort LSD estável de chaves uint32 em duas passadas de 16 bits.
+
+    Returns:
+        np.array: Permutação (N,) que ordena as chaves de forma crescente.
+    """
+    ordem = np.argsort((chaves & np.uint32(0xFFFF)).astype(np.uint16), kind='stable')
+    alta = (chaves[ordem] >> np.uint32(16)).astype(np.uint16)
+    return ordem[np.argsort(alta, kind='stable')]
+
+def ordem_pintor(profundidade, metodo='radix'):
+    """
+    Ordem de desenho do algoritmo do pintor.
+
+    Args:
+        profundidade (np.array): Profundidade (F,) de cada face no espaço da câmera
+                                 (z negativo; mais negativo = mais distante).
+        metodo (str): 'radix' (32 bits, sobre float32) ou 'argsort' (estável, float64).
+
+    Returns:
+        np.array: Índices (F,) das faces da mais distante para a mais próxima. Faces
+                  empatadas mantêm a ordem original.
+    """
+    if metodo == 'radix':
+        return ordenar_radix(chaves_float32(profundidade))
+    if metodo == 'argsort':
+        return np.argsort(profundidade, kind='stable')
+    raise ValueError(f"Método de ordenação desconhecido: {metodo!r} (use um de {METODOS})")
+
+if __name__ == '__main__':
+    # Compara a lista de dicionários original com os dois métodos vetorizados
+    gerador = np.random.default_rng(0)
+    print(f"{'faces':>10}{'lista (ms)':>14}{'argsort (ms)':>14}{'radix (ms)':>14}")
+    for num_faces in (10_000, 100_000, 1_000_000):
+        profundidade = -gerador.uniform(1.0, 50.0, num_faces)
+
+        inicio = time.perf_counter()
+        render_list = [{'indice': i, 'profundidade': p} for i, p in enumerate(profundidade)]
+        render_list.sort(key=lambda item: item['profundidade'])
+        tempo_lista = time.perf_counter() - inicio
+
+        tempos = {}
+        for metodo in METODOS:
+            inicio = time.perf_counter()
+            ordem = ordem_pintor(profundidade, metodo)
+            tempos[metodo] = time.perf_counter() - inicio
+            assert np.all(np.diff(profundidade.astype(np.float32)[ordem]) >= 0)
+
+        print(f"{num_faces:>10}{tempo_lista * 1000:>14.1f}{tempos['argsort'] * 1000:>14.1f}"
+              f"{tempos['radix'] * 1000:>14.1f}")
@@ -0,0 +1,262 @@
+import itertools
+import time
+import numpy as np
+
+from camera import Camera
+from mundo import compor_cena
+from buffer_profundidade import projetar_vertices
+from rasterizacao import rasterizar_quadro
+from cenas_sinteticas import cena_sintetica
+
+# --- Otimização de Malhas: Solda, Limpeza e Reordenação ---
+# As malhas chegam de várias fontes (geradores de 'solidos', composições de cena,
+# malhas importadas como "sopa" de triângulos, em que cada face tem os seus três
+# vértices). Este passo, todo vetorizado:
+# 1. Solda vértices coincidentes com um hash espacial: cada vértice cai em uma
+#    célula de uma grade com lado 'tolerancia', vértices na mesma célula viram
+#    um só (o primeiro deles), e células vizinhas com representantes a menos de
+#    'tolerancia' são unidas (pontos dos dois lados de uma divisa).
+# 2. Remove faces degeneradas (índices repetidos ou área nula) e faces duplicadas
+#    (os mesmos vértices na mesma ordem cíclica; a face de enrolamento oposto é
+#    outra superfície e é mantida).
+# 3. Reordena as faces pela curva de Morton dos centros (faces vizinhas no espaço
+#    ficam vizinhas no array) e os vértices pela ordem do primeiro uso, para que
+#    a leitura dos vértices de cada lote de faces percorra a memória em sequência.
+#
+# O ganho aparece nas etapas por vértice (transformação, projeção, sombreamento);
+# a rasterização depende do número de fragmentos, que não muda, e domina o quadro.
+
+def _chaves_linhas(array):
+    """Visão de um array (N, k) contíguo como N chaves opacas (para np.unique por linha)."""
+    array = np.ascontiguousarray(array)
+    return array.view(np.dtype((np.void, array.dtype.itemsize * array.shape[1]))).ravel()
+
+# Metade das 26 células vizinhas (a outra metade é o mesmo par visto do outro lado)
+_VIZINHAS = np.array([d for d in itertools.product((-1, 0, 1), repeat=3) if d > (0, 0, 0)], dtype=np.int64)
+
+def _unir_celulas_vizinhas(pontos, celulas, tolerancia):
+    """
+    Une os representantes (um por célula) a menos de 'tolerancia' de um
+    representante de uma célula vizinha (union-find por propagação de rótulos).
+
+    Returns:
+        np.array: Raiz (N,) de cada representante: o menor índice do seu grupo.
+    """
+    num = len(pontos)
+    pares = []
+    for deslocamento in _VIZINHAS:
+        # A célula vizinha de cada representante, procurada entre as células ocupadas
+        _, inverso = np.unique(_chaves_linhas(np.concatenate((celulas, celulas + deslocamento))),
+                               return_inverse=True)
+        inverso = inverso.reshape(-1)
+        dono = np.full(inverso.max() + 1, -1, dtype=np.int64)
+        dono[inverso[:num]] = np.arange(num)
+        a = np.flatnonzero(dono[inverso[num:]] >= 0)
+        b = dono[inverso[num:]][a]
+        perto = np.linalg.norm(pontos[a] - pontos[b], axis=1) <= tolerancia
+        pares.append(np.column_stack((a[perto], b[perto])))
+    pares = np.concatenate(pares)
+
+    raiz = np.arange(num)
+    while len(pares):
+        menor = np.minimum(raiz[pares[:, 0]], raiz[pares[:, 1]])
+        nova = raiz.copy()
+        np.minimum.at(nova, pares[:, 0], menor)
+        np.minimum.at(nova, pares[:, 1], menor)
+        nova = nova[nova]  # encurta os caminhos até a raiz
+        if np.array_equal(nova, raiz):
+            break
+        raiz = nova
+    return raiz
+
+def soldar_vertices(vertices, faces, tolerancia=1e-6):
+    """
+    Solda os vértices coincidentes a menos de 'tolerancia'.
+
+    Os vértices que caem na mesma célula da grade de lado 'tolerancia' viram um
+    só; depois, o representante de cada célula é comparado com os das 26
+    células vizinhas, para que pontos quase iguais dos dois lados de uma divisa
+    também sejam soldados. A tolerância deve ser bem maior que o erro numérico
+    dos vértices e bem menor que a menor aresta da malha.
+
+    Returns:
+        tuple: (vertices (n, 3), faces (F, 3) reindexadas).
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    celulas = np.round(vertices / tolerancia).astype(np.int64)
+    _, primeiro, inverso = np.unique(_chaves_linhas(celulas), return_index=True, return_inverse=True)
+    # Células na ordem em que os seus primeiros vértices apareceram
+    ordem = np.argsort(primeiro, kind='stable')
+    primeiro = primeiro[ordem]
+    celula_do_vertice = np.empty_like(ordem)
+    celula_do_vertice[ordem] = np.arange(len(ordem))
+    celula_do_vertice = celula_do_vertice[inverso.reshape(-1)]
+
+    # Cada grupo de células unidas fica com o vértice que apareceu primeiro
+    raiz = _unir_celulas_vizinhas(vertices[primeiro], celulas[primeiro], tolerancia)
+    raizes, novo_indice = np.unique(raiz, return_inverse=True)
+    return vertices[primeiro[raizes]], novo_indice.reshape(-1)[celula_do_vertice][np.asarray(faces, dtype=np.int64)]
+
+def limpar_faces(vertices, faces, area_minima=1e-12):
+    """
+    Máscara das faces a manter: sem índices repetidos, com área > area_minima e
+    sem duplicar uma face anterior.
+
+    Returns:
+        np.array: Máscara (F,) booleana.
+    """
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    tri = np.asarray(vertices, dtype=float)[faces]
+    area = 0.5 * np.linalg.norm(np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]), axis=1)
+    manter = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    manter &= area > area_minima
+
+    # Rotação canônica (menor índice primeiro) preserva o enrolamento
+    giro = np.argmin(faces, axis=1)
+    canonicas = faces[np.arange(len(faces))[:, None], (giro[:, None] + np.arange(3)) % 3]
+    candidatas = np.flatnonzero(manter)
+    _, primeira = np.unique(_chaves_linhas(canonicas[candidatas]), return_index=True)
+    unicas = np.zeros(len(faces), dtype=bool)
+    unicas[candidatas[primeira]] = True
+    return manter & unicas
+
+def _espalhar_bits(valores):
+    """Intercala dois zeros entre os bits de inteiros de 21 bits (para o código de Morton 3D)."""
+    x = valores.astype(np.uint64) & np.uint64(0x1FFFFF)
+    for deslocamento, mascara in ((32, 0x1F00000000FFFF), (16, 0x1F0000FF0000FF), (8, 0x100F00F00F00F00F),
+                                  (4, 0x10C30C30C30C30C3), (2, 0x1249249249249249)):
+        x = (x | (x << np.uint64(deslocamento))) & np.uint64(mascara)
+    return x
+
+def codigos_morton(pontos, bits=21):
+    """
+    Código de Morton (curva Z) de cada ponto, quantizado na caixa envolvente.
+
+    Returns:
+        np.array: Códigos (N,) uint64; pontos próximos têm códigos próximos.
+    """
+    pontos = np.asarray(pontos, dtype=float)
+    minimo, maximo = pontos.min(axis=0), pontos.max(axis=0)
+    escala = ((1 << bits) - 1) / np.maximum(maximo - minimo, 1e-300)
+    q = ((pontos - minimo) * escala).astype(np.uint64)
+    return _espalhar_bits(q[:, 0]) | (_espalhar_bits(q[:, 1]) << np.uint64(1)) | (_espalhar_bits(q[:, 2]) << np.uint64(2))
+
+def reordenar(vertices, faces):
+    """
+    Ordena as faces pela curva de Morton dos centros e os vértices pela ordem do
+    primeiro uso nas faces já ordenadas (vértices sem uso são descartados).
+
+    Returns:
+        tuple: (vertices, faces, ordem_faces), com ordem_faces (F,) a permutação
+               aplicada às faces (para levar junto cores e outros atributos).
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    ordem_faces = np.argsort(codigos_morton(vertices[faces].mean(axis=1)), kind='stable')
+    faces = faces[ordem_faces]
+
+    usados, primeiro_uso = np.unique(faces.ravel(), return_index=True)
+    ordem_vertices = usados[np.argsort(primeiro_uso, kind='stable')]
+    novo_indice = np.full(len(vertices), -1, dtype=np.int64)
+    novo_indice[ordem_vertices] = np.arange(len(ordem_vertices))
+    return vertices[ordem_vertices], novo_indice[faces], ordem_faces
+
+def otimizar_malha(vertices, faces, cores, tolerancia=1e-6, reordenar_malha=True):
+    """
+    Solda, limpa e reordena uma malha (ver o cabeçalho do módulo).
+
+    Args:
+        vertices (np.array): Vértices (N, 3).
+        faces (np.array): Faces (F, 3).
+        cores (list): Cor (material) de cada face, levada junto com as faces.
+        tolerancia (float): Lado da célula do hash espacial da solda.
+        reordenar_malha (bool): Aplica a reordenação de Morton / primeiro uso.
+
+    Returns:
+        tuple: (vertices, faces, cores, estatísticas) com as contagens antes e depois.
+    """
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    cores = np.asarray(cores)
+    estatisticas = {'vertices_antes': len(vertices), 'faces_antes': len(faces)}
+
+    novos_vertices, novas_faces = soldar_vertices(vertices, faces, tolerancia)
+    estatisticas['vertices_soldados'] = len(vertices) - len(novos_vertices)
+    manter = limpar_faces(novos_vertices, novas_faces)
+    novas_faces, cores = novas_faces[manter], cores[manter]
+    estatisticas['faces_removidas'] = int(np.count_nonzero(~manter))
+
+    if reordenar_malha:
+        novos_vertices, novas_faces, ordem = reordenar(novos_vertices, novas_faces)
+        cores = cores[ordem]
+    estatisticas.update(vertices_depois=len(novos_vertices), faces_depois=len(novas_faces))
+    return novos_vertices, novas_faces, cores.tolist(), estatisticas
+
+def taxa_falhas_cache(faces, tamanho_cache=32):
+    """
+    ACMR: vértices transformados por triângulo com uma cache FIFO de vértices
+    (3.0 = nenhum reaproveitamento; 0.5 é o ideal em malhas grandes). A simulação
+    é sequencial por natureza e serve apenas como métrica.
+    """
+    cache, presentes, falhas = [], set(), 0
+    for indice in np.asarray(faces).ravel().tolist():
+        if indice not in presentes:
+            falhas += 1
+            cache.append(indice)
+            presentes.add(indice)
+            if len(cache) > tamanho_cache:
+                presentes.discard(cache.pop(0))
+    return falhas / max(len(faces), 1)
+
+def sopa_de_triangulos(vertices, faces):
+    """Desfaz a indexação (cada face com os seus 3 vértices), como em um STL importado."""
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    return np.asarray(vertices, dtype=float)[faces].reshape(-1, 3), np.arange(faces.size).reshape(-1, 3)
+
+if __name__ == '__main__':
+    from benchmark import cronometrar
+
+    camera = Camera((15.0, 13.0, 12.0), (0.0, 0.0, 0.0))
+    res = 800
+
+    # Solda sobre a divisa entre células: com tolerância 1e-6, x = 0.5e-6 -+ 1e-13
+    # cai em células vizinhas; os dois triângulos têm de compartilhar a aresta
+    divisa = 0.5e-6
+    vertices_divisa = np.array([[divisa - 1e-13, 0, 0], [divisa, 1, 0], [-1, 0, 0],
+                                [divisa + 1e-13, 0, 0], [1, 0, 0], [divisa, 1, 0]])
+    v_soldados, f_soldadas = soldar_vertices(vertices_divisa, [[0, 1, 2], [3, 4, 5]])
+    print(f"divisa entre células: {len(vertices_divisa)} -> {len(v_soldados)} vértices "
+          f"(esperado 4), faces {f_soldadas.tolist()}")
+
+    vertices, faces, cores, v_linha, a_linha = compor_cena()
+    vertices_s, faces_s, cores_s, _, _ = cena_sintetica(10)
+    casos = {
+        'compor_cena': (vertices, np.asarray(faces), cores, v_linha, a_linha),
+        'cena_sintetica(10) como sopa': (*sopa_de_triangulos(vertices_s, faces_s), cores_s, v_linha, a_linha),
+    }
+    for nome, (v, f, c, vl, al) in casos.items():
+        inicio = time.perf_counter()
+        v_otim, f_otim, c_otim, estatisticas = otimizar_malha(v, f, c)
+        tempo_otimizacao = time.perf_counter() - inicio
+        print(f"\n{nome} (otimizada em {tempo_otimizacao * 1000:.1f} ms)")
+        print(f"  vértices: {estatisticas['vertices_antes']} -> {estatisticas['vertices_depois']}, "
+              f"faces: {estatisticas['faces_antes']} -> {estatisticas['faces_depois']} "
+              f"({estatisticas['faces_removidas']} removidas)")
+        print(f"  ACMR (cache FIFO de 32): {taxa_falhas_cache(f):.3f} -> {taxa_falhas_cache(f_otim):.3f}")
+
+        antes = rasterizar_quadro(v, f, c, vl, al, None, None, None, res, sombreamento='flat', camera=camera)
+        depois = rasterizar_quadro(v_otim, f_otim, c_otim, vl, al, None, None, None, res, sombreamento='flat',
+                                   camera=camera)
+        diferentes = int(np.count_nonzero(np.abs(antes - depois).max(axis=2) > 1e-9))
+        print(f"  pixels diferentes ({res}x{res}, flat): {diferentes}")
+        medicoes = {
+            'transformação': (lambda: projetar_vertices(v, camera.visao_projecao, res, res),
+                              lambda: projetar_vertices(v_otim, camera.visao_projecao, res, res)),
+            'rasterizar_quadro': (lambda: rasterizar_quadro(v, f, c, vl, al, None, None, None, res,
+                                                            sombreamento='flat', camera=camera),
+                                  lambda: rasterizar_quadro(v_otim, f_otim, c_otim, vl, al, None, None, None, res,
+                                                            sombreamento='flat', camera=camera)),
+        }
+        for nome_medicao, (funcao_antes, funcao_depois) in medicoes.items():
+            t_antes, t_depois = cronometrar(funcao_antes)['minimo_s'], cronometrar(funcao_depois)['minimo_s']
+            print(f"  {nome_medicao:<18}{t_antes * 1000:>9.2f} ms -> {t_depois * 1000:>8.2f} ms "
+                  f"({t_antes / t_depois:.2f}x)")
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+
+# --- Instrumentação do Pipeline (Perfil por Etapa) ---
+# Cada etapa do pipeline é envolvida por "with etapa(nome, entrada=n) as e:" e,
+# ao final, registra "e.saida = m" (primitivas que saíram da etapa). Com o perfil
+# desativado (padrão), etapa() devolve sempre o mesmo objeto nulo: o custo é uma
+# verificação de variável global, sem alocação nem leitura de relógio.
+#
+# Etapas usadas no pipeline:
+#   modelagem, transformacao_mundo, transformacao_visao, projecao, recorte,
+#   oclusao, ordenacao, rasterizacao, sombreamento, mapa_sombra, sombras,
+#   texturas, transparencia, leitura, saida
+# ('oclusao' é o teste Hi-Z de oclusao.py, 'mapa_sombra' o passo da luz de
+# sombras.py e 'leitura' a leitura de um bloco em disco de render_em_blocos.py)
+
+_ativo = False
+_eventos = []
+_trava = threading.Lock()
+_inicio_relogio = time.perf_counter_ns()
+
+class _EtapaNula:
+    """Contexto vazio usado quando o perfil está desativado."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, nome, valor):
+        pass
+
+_ETAPA_NULA = _EtapaNula()
+
+class _Etapa:
+    __slots__ = ('nome', 'entrada', 'saida', '_inicio')
+
+    def __init__(self, nome, entrada):
+        self.nome = nome
+        self.entrada = entrada
+        self.saida = None
+
+    def __enter__(self):
+        self._inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        fim = time.perf_counter_ns()
+        # Etapas que não informam a saída (ex.: transformações) preservam as primitivas
+        saida = self.entrada if self.saida is None else self.saida
+        evento = (self.nome, self._inicio, fim - self._inicio, self.entrada, saida,
+                  os.getpid(), threading.get_ident())
+        with _trava:
+            _eventos.append(evento)
+        return False
+
+def etapa(nome, entrada=None):
+    """
+    Mede uma etapa do pipeline.
+
+    Args:
+        nome (str): Nome da etapa.
+        entrada (int, opcional): Número de primitivas que entram na etapa.
+
+    Returns:
+        Contexto cujo atributo 'saida' pode receber o número de primitivas produzidas.
+    """
+    if not _ativo:
+        return _ETAPA_NULA
+    return _Etapa(nome, entrada)
+
+def ativar():
+    global _ativo
+    _ativo = True
+
+def desativar():
+    global _ativo
+    _ativo = False
+
+def ativo():
+    return _ativo
+
+def limpar():
+    with _trava:
+        _eventos.clear()
+
+def eventos():
+    """Lista de eventos registrados como dicionários (tempos em microssegundos)."""
+    with _trava:
+        copia = list(_eventos)
+    return [{
+        'etapa': nome,
+        'inicio_us': (inicio - _inicio_relogio) / 1000,
+        'duracao_us': duracao / 1000,
+        'entrada': entrada,
+        'saida': saida,
+        'pid': pid,
+        'tid': tid,
+    } for nome, inicio, duracao, entrada, saida, pid, tid in copia]
+
+def resumo():
+    """
+    Agrega os eventos por etapa.
+
+    Returns:
+        dict: {etapa: {'chamadas', 'total_ms', 'media_ms', 'entrada', 'saida'}},
+              na ordem em que cada etapa apareceu pela primeira vez.
+    """
+    agregado = {}
+    for evento in eventos():
+        item = agregado.setdefault(evento['etapa'], {'chamadas': 0, 'total_ms': 0.0, 'entrada': 0, 'saida': 0})
+        item['chamadas'] += 1
+        item['total_ms'] += evento['duracao_us'] / 1000
+        item['entrada'] += evento['entrada'] or 0
+        item['saida'] += evento['saida'] or 0
+    for item in agregado.values():
+        item['media_ms'] = item['total_ms'] / item['chamadas']
+    return agregado
+
+def exportar_json(caminho):
+    """Grava o resumo e os eventos brutos em JSON."""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump({'resumo': resumo(), 'eventos': eventos()}, arquivo, indent=2)
+
+def exportar_chrome_trace(caminho):
+    """
+    Grava os eventos no formato Trace Event do Chrome (abrir em chrome://tracing
+    ou no Perfetto). Cada etapa vira um evento completo ('X') com as contagens de
+    primitivas nos argumentos.
+    """
+    trace = [{
+        'name': evento['etapa'],
+        'cat': 'pipeline',
+        'ph': 'X',
+        'ts': evento['inicio_us'],
+        'dur': evento['duracao_us'],
+        'pid': evento['pid'],
+        'tid': evento['tid'],
+        'args': {'entrada': evento['entrada'], 'saida': evento['saida']},
+    } for evento in eventos()]
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, arquivo)
+
+def imprimir_resumo():
+    """Mostra o resumo em forma de tabela no terminal."""
+    print(f"{'etapa':<22}{'chamadas':>9}{'total (ms)':>12}{'média (ms)':>12}{'entrada':>10}{'saída':>10}")
+    for nome, item in resumo().items():
+        print(f"{nome:<22}{item['chamadas']:>9}{item['total_ms']:>12.2f}{item['media_ms']:>12.3f}"
+              f"{item['entrada']:>10}{item['saida']:>10}")
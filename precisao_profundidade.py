@@ -0,0 +1,114 @@
+import numpy as np
+
+from camera import Camera
+from buffer_profundidade import projetar_vertices, rasterizar_triangulos
+
+# --- Precisão do Buffer de Profundidade (Z Reverso e Far Infinito) ---
+# Compara a projeção padrão (NDC de -1 a 1) com a projeção de Z reverso e far
+# infinito (z = near / distância) guardando a profundidade em float32. A cena de
+# teste tem pares de painéis inclinados de 0,1 m a 10 km da câmera, com o painel
+# de trás afastado uma fração fixa da distância: qualquer pixel em que o painel de
+# trás aparece é "z-fighting". O far da projeção padrão fica além da cena (20 km).
+
+CONFIGURACOES = {
+    'padrao far=20km float64': dict(far=2e4, reversa=False, dtype=np.float64),
+    'padrao far=20km float32': dict(far=2e4, reversa=False, dtype=np.float32),
+    'reversa far=inf float32': dict(far=np.inf, reversa=True, dtype=np.float32),
+}
+
+def separacao_resolvivel(distancias, camera, dtype=np.float32):
+    """
+    Menor diferença de distância que o buffer consegue distinguir em cada distância:
+    a largura do intervalo de distâncias que cai no mesmo valor armazenado.
+
+    Args:
+        distancias (np.array): Distâncias (K,) à câmera, ao longo do eixo de visão.
+        camera (Camera): Câmera cuja projeção será analisada.
+        dtype: Tipo do buffer de profundidade.
+
+    Returns:
+        np.array: Separação resolvível (K,) nas mesmas unidades das distâncias.
+    """
+    distancias = np.asarray(distancias, dtype=float)
+    m = camera.projecao
+    # z_ndc(d) = -m22 + m23 / d, para um ponto a distância d à frente da câmera
+    z = (-m[2, 2] + m[2, 3] / distancias).astype(dtype)
+    z_near = np.array(1.0 if camera.reversa else -1.0, dtype=dtype)
+    z_vizinho = np.nextafter(z, z_near)
+    d = m[2, 3] / (z.astype(float) + m[2, 2])
+    d_vizinho = m[2, 3] / (z_vizinho.astype(float) + m[2, 2])
+    return np.abs(d_vizinho - d)
+
+def cena_precisao(distancias, separacao_relativa=1e-3, inclinacao=0.2, fov=60.0, aspecto=1.0):
+    """
+    Monta, para cada distância, um painel da frente e um painel de trás do mesmo
+    tamanho em tela, lado a lado em uma grade de quadrados. A câmera fica na
+    origem olhando para -Z, então os vértices já estão no espaço da câmera. Os
+    painéis são inclinados (a borda de cima fica inclinacao * distância mais
+    longe que a de baixo) para que a profundidade varie ao longo dos pixels.
+
+    O painel de trás vem primeiro nas faces: como empates ficam com a face
+    desenhada antes, qualquer profundidade igual no buffer aparece como erro.
+
+    Returns:
+        tuple: (vertices (8K, 3), faces (4K, 3), face_de_tras (4K,) booleano).
+    """
+    distancias = np.asarray(distancias, dtype=float)
+    lado = int(np.ceil(np.sqrt(distancias.size)))
+    meio = 0.8 / lado
+    tangente = np.tan(np.radians(fov) / 2)
+    cantos = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], dtype=float) * meio
+
+    vertices, faces = [], []
+    for k, distancia in enumerate(distancias):
+        centro = np.array([-1 + (2 * (k % lado) + 1) / lado, -1 + (2 * (k // lado) + 1) / lado])
+        for camada, d in enumerate((distancia * (1 + separacao_relativa), distancia)):
+            ndc = centro + cantos
+            d_vertice = d * (1 + inclinacao * np.sign(cantos[:, 1]) / 2)
+            vertices.append(np.column_stack((ndc[:, 0] * d_vertice * tangente * aspecto,
+                                             ndc[:, 1] * d_vertice * tangente, -d_vertice)))
+            base = 8 * k + 4 * camada
+            faces += [[base, base + 1, base + 2], [base, base + 2, base + 3]]
+    face_de_tras = np.tile([True, True, False, False], distancias.size)
+    return np.concatenate(vertices), np.array(faces, dtype=np.int64), face_de_tras
+
+def medir_z_fighting(distancias, separacao_relativa=1e-3, res=400, near=0.05, far=2e4, reversa=False,
+                     dtype=np.float64):
+    """
+    Renderiza a cena de precisão e mede, para cada distância, a fração dos pixels
+    em que o painel de trás venceu o teste de profundidade.
+
+    Returns:
+        np.array: Fração (K,) de pixels com z-fighting em cada distância.
+    """
+    camera = Camera((0.0, 0.0, 0.0), (0.0, 0.0, -1.0), (0.0, 1.0, 0.0), near=near, far=far, reversa=reversa)
+    vertices, faces, face_de_tras = cena_precisao(distancias, separacao_relativa, fov=camera.fov)
+    pontos, z, _ = projetar_vertices(vertices, camera.visao_projecao, res, res)
+    _, buffer_face = rasterizar_triangulos(pontos, z, faces, res, res, reversa=reversa, dtype=dtype)
+
+    visiveis = buffer_face[buffer_face >= 0]
+    par = visiveis // 4
+    total = np.bincount(par, minlength=len(distancias))
+    errados = np.bincount(par, weights=face_de_tras[visiveis], minlength=len(distancias))
+    return errados / np.maximum(total, 1)
+
+if __name__ == '__main__':
+    distancias = np.geomspace(0.1, 1e4, 16)
+    near = 0.05
+
+    print("Menor separação resolvível (m):")
+    print(f"{'distância (m)':>14}" + ''.join(f"{nome:>26}" for nome in CONFIGURACOES))
+    separacoes = {nome: separacao_resolvivel(distancias, Camera((0, 0, 0), (0, 0, -1), (0, 1, 0), near=near,
+                                                                far=cfg['far'], reversa=cfg['reversa']),
+                                             cfg['dtype'])
+                  for nome, cfg in CONFIGURACOES.items()}
+    for i, distancia in enumerate(distancias):
+        print(f"{distancia:>14.3g}" + ''.join(f"{separacoes[nome][i]:>26.3g}" for nome in CONFIGURACOES))
+
+    separacao_relativa = 1e-4
+    print(f"\nPixels com z-fighting (painel de trás a {separacao_relativa:.2%} da distância):")
+    print(f"{'distância (m)':>14}" + ''.join(f"{nome:>26}" for nome in CONFIGURACOES))
+    fracoes = {nome: medir_z_fighting(distancias, separacao_relativa, near=near, **cfg)
+               for nome, cfg in CONFIGURACOES.items()}
+    for i, distancia in enumerate(distancias):
+        print(f"{distancia:>14.3g}" + ''.join(f"{fracoes[nome][i]:>26.1%}" for nome in CONFIGURACOES))
@@ -1,97 +1,237 @@
-import matplotlib
-matplotlib.use('TkAgg')
+import os
 import numpy as np
-import solidos
-import matplotlib.pyplot as plt
-from skimage.draw import polygon as sk_polygon, line as sk_line
 
-from camera import matriz_visao, aplicar_transformacao
+from camera import Camera
 from mundo import compor_cena
-from cena_2d import matriz_projecao_perspectiva
+from cena_2d import projetar_poligonos_2d
+from buffer_profundidade import projetar_vertices, rasterizar_triangulos, faces_na_frente
+from iluminacao import cores_sombreadas, sombrear_framebuffer
+from transparencia import alfas_faces, compor_transparentes
+from selecao import montar_buffer_ids
+from sombras import MapaSombra, aplicar_sombras
+from texturas import cores_base_texturizadas, aplicar_texturas, validar_texturas
+from perfil import etapa
+import perfil
+
+# Dicionário para converter nomes de cores em valores RGB (0-1).
+# Os azuis e o verde vêm da paleta 'tab10' do matplotlib.
+MAPA_CORES = {
+    'gray': (0.5, 0.5, 0.5),
+    'cornflowerblue': (0.12156862745098039, 0.4666666666666667, 0.7058823529411765),
+    'lightgreen': (0.17254901960784313, 0.6274509803921569, 0.17254901960784313),
+    'deepskyblue': (1.0, 0.4980392156862745, 0.054901960784313725),
+    'red': (1, 0, 0)
+}
+
+def cores_rgb_faces(cores_faces):
+    """Converte a lista de nomes de cores das faces em um array RGB (F, 3)."""
+    nomes, indice_cor = np.unique(np.asarray(cores_faces), return_inverse=True)
+    return np.array([MAPA_CORES.get(nome, (1, 1, 1)) for nome in nomes]).reshape(-1, 3)[indice_cor]
+
+def rasterizar_quadro(vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha,
+                      camera_pos, ponto_alvo, up_mundo, res, sombreamento=None,
+                      direcao_luz=(-0.3, -0.5, -1.0), alfas=None, transparencia='oit', camera=None,
+                      retornar_ids=False, instancias_faces=None, sombras=None, uvs=None, texturas=None,
+                      filtro_textura='trilinear'):
+    """
+    Executa o pipeline de projeção e rasteriza a cena em um framebuffer (res x res).
+
+    Sem sombreamento, usa o algoritmo do pintor com cores chapadas. Com
+    sombreamento='flat' ou 'gouraud', usa o buffer de profundidade e a
+    iluminação de iluminacao.py (Gouraud interpola as cores por pixel).
+
+    Com alfas (ex.: {'lightgreen': 0.4}), as faces com alfa < 1 são transparentes.
+    No buffer de profundidade elas são compostas depois das opacas pelo modo
+    'transparencia' ('oit' ou 'ordenada', ver transparencia.py); no pintor cada
+    polígono é misturado sobre o que já foi desenhado, na ordem do pintor.
+
+    Uma Camera (camera.py) pode ser passada no lugar de camera_pos, ponto_alvo e
+    up_mundo para reaproveitar as matrizes em cache entre quadros.
+
+    Com sombreamento, sombras=True gera um mapa de sombra da luz direcional para
+    este quadro, e sombras=MapaSombra(...) reaproveita um mapa já pronto (ver
+    sombras.py); as faces opacas ficam só com a luz ambiente onde a luz não chega.
+
+    Com sombreamento, texturas={material: Textura(...)} e as coordenadas de
+    textura uvs (F, 3, 2) dos geradores (retornar_uvs=True), as faces opacas
+    desses materiais são multiplicadas pela textura, amostrada com correção de
+    perspectiva e mipmaps pelo filtro_textura (ver texturas.py).
+
+    Com retornar_ids=True, o mesmo passo grava também o buffer de IDs (ver
+    selecao.py): para cada pixel, a instância (instancias_faces[face], ou 0 sem
+    instancias_faces) e a face opaca visível. As linhas e as faces transparentes
+    não entram no buffer de IDs.
+
+    Returns:
+        np.array: Framebuffer RGB (res, res, 3) com valores em [0, 1]; a linha 0
+                  é a base da imagem (exibir com origin='lower'). Com
+                  retornar_ids=True, devolve (framebuffer, buffer_ids (res, res, 2) uint32).
+    """
+    # --- 1. Definir Parâmetros e Matrizes de Transformação ---
+    with etapa('transformacao_visao', entrada=len(vertices_cena)):
+        # A razão de aspecto padrão é 1.0 pois nossas telas de pixel são quadradas
+        if camera is None:
+            camera = Camera(camera_pos, ponto_alvo, up_mundo)
+        mat_transform = camera.visao_projecao
+
+    # Cria um framebuffer (tela de pixels) RGB, inicializado como preto.
+    framebuffer = np.zeros((res, res, 3))
+
+    # --- 2. Rasterizar Polígonos ---
+    if texturas and sombreamento is None:
+        raise ValueError("Texturas exigem sombreamento 'flat' ou 'gouraud' (buffer de profundidade).")
+    # sombras: um MapaSombra pronto, ou um valor verdadeiro para gerar o mapa do quadro
+    usar_sombras = isinstance(sombras, MapaSombra) or bool(sombras)
+    if usar_sombras and sombreamento is None:
+        raise ValueError("Sombras exigem sombreamento 'flat' ou 'gouraud' (buffer de profundidade).")
+    if texturas and uvs is None:
+        raise ValueError("Texturas exigem as coordenadas de textura (uvs) das faces.")
+    if texturas:
+        validar_texturas(texturas)
+    if sombreamento is not None:
+        # Buffer de profundidade + cores iluminadas
+        faces_array = np.asarray(faces_cena)
+        alfa_faces = None if alfas is None else alfas_faces(cores_faces, alfas)
+        with etapa('sombreamento', entrada=len(faces_array)):
+            cores_rgb = cores_rgb_faces(cores_faces)
+            if texturas:
+                cores_rgb = cores_base_texturizadas(cores_rgb, cores_faces, texturas,
+                                                    None if alfa_faces is None else alfa_faces >= 1)
+            cores_luz = cores_sombreadas(vertices_cena, faces_array, cores_rgb, camera.posicao,
+                                         direcao_luz, sombreamento=sombreamento)
+        with etapa('projecao', entrada=len(vertices_cena)) as e:
+            pontos, z, w = projetar_vertices(vertices_cena, mat_transform, res, res)
+            e.saida = len(pontos)
+        with etapa('recorte', entrada=len(faces_array)) as e:
+            validos = faces_na_frente(w, faces_array)
+            e.saida = int(np.count_nonzero(validos))
+        transparentes = None if alfa_faces is None else validos & (alfa_faces < 1)
+        if transparentes is not None:
+            validos = validos & ~transparentes
+        with etapa('rasterizacao', entrada=len(faces_array)) as e:
+            # Com Z reverso a profundidade é guardada em float32 (ver camera.py)
+            buffer_z, buffer_face = rasterizar_triangulos(pontos, z, faces_array, res, res, validos=validos,
+                                                          reversa=camera.reversa,
+                                                          dtype=np.float32 if camera.reversa else np.float64)
+            sombrear_framebuffer(framebuffer, buffer_face, pontos, faces_array, cores_luz)
+            e.saida = int(np.count_nonzero(buffer_face >= 0))
+            if retornar_ids:
+                buffer_ids = montar_buffer_ids(buffer_face, instancias_faces)
+        if usar_sombras:
+            mapa = sombras if isinstance(sombras, MapaSombra) else MapaSombra(vertices_cena, faces_array,
+                                                                             direcao_luz)
+            with etapa('sombras', entrada=int(np.count_nonzero(buffer_face >= 0))) as e:
+                # As mesmas faces só com a luz ambiente (difusa e especular zeradas)
+                cores_sombra = cores_sombreadas(vertices_cena, faces_array, cores_rgb, camera.posicao,
+                                                direcao_luz, difusa=0.0, especular=0.0)
+                e.saida = aplicar_sombras(framebuffer, buffer_face, buffer_z, mat_transform, vertices_cena,
+                                          faces_array, cores_sombra, mapa)
+        if texturas:
+            with etapa('texturas', entrada=int(np.count_nonzero(buffer_face >= 0))) as e:
+                e.saida = aplicar_texturas(framebuffer, buffer_face, pontos, w, faces_array, uvs, cores_faces,
+                                           texturas, filtro_textura)
+        if transparentes is not None and transparentes.any():
+            with etapa('transparencia', entrada=int(np.count_nonzero(transparentes))) as e:
+                e.saida = compor_transparentes(framebuffer, buffer_z, pontos, z, faces_array, cores_luz,
+                                               alfa_faces, validos=transparentes, modo=transparencia,
+                                               reversa=camera.reversa)['fragmentos']
+    else:
+        # Recorte, ordenação e projeção vetorizados (ver cena_2d.projetar_poligonos_2d)
+        from skimage.draw import polygon as sk_polygon
+        cores_rgb = cores_rgb_faces(cores_faces)
+        if alfas is not None:
+            cores_rgb = np.column_stack((cores_rgb, alfas_faces(cores_faces, alfas)))
+        poligonos_cn, cores_poligonos, _, ordem = projetar_poligonos_2d(
+            vertices_cena, faces_cena, cores_rgb, camera_pos, ponto_alvo, up_mundo, camera=camera,
+            retornar_ordem=True)
+        if retornar_ids:
+            # O pintor sobrescreve o índice da face junto com a cor; as transparentes não entram
+            buffer_face = np.full((res, res), -1, dtype=np.int64)
+
+        # Mapear coordenadas Normalizadas [-1, 1] para coordenadas de pixel [0, res-1]
+        pixel_coords = (poligonos_cn + 1) / 2 * (res - 1)
+
+        with etapa('rasterizacao', entrada=len(poligonos_cn)) as e:
+            for pixels_face, cor, face in zip(pixel_coords, cores_poligonos, ordem.tolist()):
+                # Obter os pixels a serem preenchidos e pintá-los no framebuffer
+                rr, cc = sk_polygon(pixels_face[:, 1], pixels_face[:, 0], shape=framebuffer.shape)
+                if alfas is None:
+                    framebuffer[rr, cc] = cor
+                else:
+                    framebuffer[rr, cc] = cor[:3] * cor[3] + framebuffer[rr, cc] * (1 - cor[3])
+                if retornar_ids and (alfas is None or cor[3] >= 1):
+                    buffer_face[rr, cc] = face
+            e.saida = len(poligonos_cn)
+        if retornar_ids:
+            buffer_ids = montar_buffer_ids(buffer_face, instancias_faces)
+
+    # --- 3. Rasterizar a Linha (sobre os polígonos) ---
+    with etapa('rasterizacao', entrada=len(arestas_linha)):
+        v_homogeneos_linha = np.hstack((vertices_linha, np.ones((vertices_linha.shape[0], 1))))
+        rasterizar_linhas(framebuffer, (mat_transform @ v_homogeneos_linha.T).T, arestas_linha)
+
+    if retornar_ids:
+        return framebuffer, buffer_ids
+    return framebuffer
+
+def rasterizar_linhas(framebuffer, v_clip_linha, arestas_linha, cor=MAPA_CORES['red']):
+    """
+    Desenha as arestas de uma linha (já em coordenadas de recorte) sobre o
+    framebuffer (res, res, 3). A linha só é desenhada se estiver toda à frente
+    da câmera (clipping simples).
+    """
+    res = framebuffer.shape[0]
+    if np.all(v_clip_linha[:, 3] > 0): # Clipping simples
+        v_cn_linha = v_clip_linha[:, :2] / v_clip_linha[:, 3, np.newaxis]
+        pixel_coords_linha = (v_cn_linha + 1) / 2 * (res - 1)
+
+        from skimage.draw import line as sk_line
+
+        for aresta in arestas_linha:
+            p1, p2 = pixel_coords_linha[aresta[0]], pixel_coords_linha[aresta[1]]
+            rr, cc = sk_line(int(p1[1]), int(p1[0]), int(p2[1]), int(p2[0]))
+            valid_idx = (rr >= 0) & (rr < res) & (cc >= 0) & (cc < res)
+            framebuffer[rr[valid_idx], cc[valid_idx]] = cor
 
 def rasterizar_cena_resolucoes(vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha, 
-                               camera_pos, ponto_alvo, up_mundo, resolucoes):
+                               camera_pos, ponto_alvo, up_mundo, resolucoes, sombreamento=None,
+                               direcao_luz=(-0.3, -0.5, -1.0), alfas=None, transparencia='oit', camera=None):
     """
     Executa o pipeline de projeção e rasteriza a cena em um conjunto de imagens 2D
-    em diferentes resoluções.
+    em diferentes resoluções (ver rasterizar_quadro). Todas as resoluções usam a
+    mesma Camera, então as matrizes são calculadas uma única vez.
     """
-    # --- 1. Definir Parâmetros e Matrizes de Transformação ---
-    near_plane, far_plane, fov = 1.0, 50.0, 60.0
-    
-    mat_view = matriz_visao(camera_pos, ponto_alvo, up_mundo)
-    # A razão de aspecto é 1.0 pois nossas telas de pixel serão quadradas
-    mat_persp = matriz_projecao_perspectiva(fov, 1.0, near_plane, far_plane)
-    mat_transform = mat_persp @ mat_view
-
-    # --- 2. Preparar e Ordenar Polígonos (Algoritmo do Pintor) ---
-    render_list_poligonos = []
-    vertices_cena_scc = aplicar_transformacao(vertices_cena, mat_view)
-    
-    for i, face in enumerate(faces_cena):
-        profundidade = np.mean(vertices_cena_scc[list(face), 2])
-        if profundidade < -near_plane and profundidade > -far_plane:
-            render_list_poligonos.append({
-                'vertices_mundo': vertices_cena[list(face)],
-                'cor': cores_faces[i],
-                'profundidade': profundidade
-            })
-    render_list_poligonos.sort(key=lambda item: item['profundidade'])
-
-    # --- 3. Configurar os Gráficos de Saída ---
+    if camera is None:
+        camera = Camera(camera_pos, ponto_alvo, up_mundo)
+
+    # --- 1. Configurar os Gráficos de Saída ---
+    import matplotlib.pyplot as plt
+
     fig, axes = plt.subplots(1, len(resolucoes), figsize=(6 * len(resolucoes), 6))
     if len(resolucoes) == 1: axes = [axes] # Garante que axes seja uma lista
     fig.suptitle("Cena Rasterizada em Diferentes Resoluções", fontsize=16)
 
-    # Dicionário para converter nomes de cores em valores RGB (0-1)
-    cores_rgb = plt.colormaps['tab10'].colors
-    mapa_cores = {
-        'gray': (0.5, 0.5, 0.5), 'cornflowerblue': cores_rgb[0], 
-        'lightgreen': cores_rgb[2], 'deepskyblue': cores_rgb[1], 'red': (1,0,0)
-    }
-
-    # --- 4. Loop de Rasterização para Cada Resolução ---
+    # --- 2. Loop de Rasterização para Cada Resolução ---
     for ax, res in zip(axes, resolucoes):
-        # Cria um framebuffer (tela de pixels) RGB, inicializado como preto.
-        framebuffer = np.zeros((res, res, 3))
-        
-        # --- 4a. Rasterizar Polígonos ---
-        for item in render_list_poligonos:
-            v_mundo = item['vertices_mundo']
-            v_homogeneos = np.hstack((v_mundo, np.ones((v_mundo.shape[0], 1))))
-            v_clip = (mat_transform @ v_homogeneos.T).T
-            
-            v_cn = v_clip[:, :2] / v_clip[:, 3, np.newaxis]
-            
-            # Mapear coordenadas Normalizadas [-1, 1] para coordenadas de pixel [0, res-1]
-            pixel_coords = (v_cn + 1) / 2 * (res - 1)
-            
-            # Obter os pixels a serem preenchidos
-            rr, cc = sk_polygon(pixel_coords[:, 1], pixel_coords[:, 0], shape=framebuffer.shape)
-            # Pintar os pixels no framebuffer
-            framebuffer[rr, cc] = mapa_cores.get(item['cor'], (1,1,1)) # Padrão branco se cor não encontrada
-
-        # --- 4b. Rasterizar a Linha (sobre os polígonos) ---
-        v_homogeneos_linha = np.hstack((vertices_linha, np.ones((vertices_linha.shape[0], 1))))
-        v_clip_linha = (mat_transform @ v_homogeneos_linha.T).T
-        
-        if np.all(v_clip_linha[:, 3] > 0): # Clipping simples
-            v_cn_linha = v_clip_linha[:, :2] / v_clip_linha[:, 3, np.newaxis]
-            pixel_coords_linha = (v_cn_linha + 1) / 2 * (res - 1)
-            
-            for aresta in arestas_linha:
-                p1, p2 = pixel_coords_linha[aresta[0]], pixel_coords_linha[aresta[1]]
-                rr, cc = sk_line(int(p1[1]), int(p1[0]), int(p2[1]), int(p2[0]))
-                valid_idx = (rr >= 0) & (rr < res) & (cc >= 0) & (cc < res)
-                framebuffer[rr[valid_idx], cc[valid_idx]] = mapa_cores['red']
-        
-        # --- 4c. Exibir a Imagem Rasterizada ---
-        ax.imshow(framebuffer, origin='lower')
-        ax.set_title(f"{res}x{res} pixels")
-        ax.set_xticks([]); ax.set_yticks([])
+        framebuffer = rasterizar_quadro(vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha,
+                                        camera_pos, ponto_alvo, up_mundo, res, sombreamento=sombreamento,
+                                        direcao_luz=direcao_luz, alfas=alfas, transparencia=transparencia,
+                                        camera=camera)
+
+        # --- 2a. Exibir a Imagem Rasterizada ---
+        with etapa('saida', entrada=res * res):
+            ax.imshow(framebuffer, origin='lower')
+            ax.set_title(f"{res}x{res} pixels")
+            ax.set_xticks([]); ax.set_yticks([])
 
+    # Só o desenho da figura é medido, não a espera bloqueante de plt.show()
+    with etapa('saida'):
+        fig.canvas.draw()
     plt.show()
 
 if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('TkAgg')
 
     # --- Montagem da Cena no SCM (sem alterações) ---
     vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha = compor_cena()
@@ -102,5 +242,14 @@ if __name__ == '__main__':
 
     resolucoes = [100, 250, 800]
 
+    # Defina PERFIL=1 no ambiente para medir cada etapa do pipeline
+    perfilar = os.environ.get('PERFIL') == '1'
+    if perfilar:
+        perfil.ativar()
+
     rasterizar_cena_resolucoes(vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha,
                                posicao_camera, ponto_alvo, vetor_up_mundo, resolucoes)
+
+    if perfilar:
+        perfil.imprimir_resumo()
+        perfil.exportar_chrome_trace('perfil_rasterizacao.json')
@@ -0,0 +1,143 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+from mundo import compor_cena
+from rasterizacao import rasterizar_quadro
+from cenas_sinteticas import cena_sintetica
+import nucleos
+
+# --- Regressão Visual com Imagens de Referência (Golden Images) ---
+# Renderiza um conjunto fixo de poses de câmera sobre compor_cena() e sobre uma
+# cena sintética, nas resoluções de rasterizacao.py, e compara com framebuffers
+# de referência guardados em um .npz comprimido. Qualquer otimização do
+# rasterizador deve manter estas imagens.
+#
+# Uso:
+#   python regressao_visual.py              # compara com as referências
+#   python regressao_visual.py --atualizar  # regrava as referências
+#   python regressao_visual.py --backend numba  # mesmos casos com os núcleos compilados
+
+ARQUIVO_REFERENCIAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'referencias',
+                                   'regressao_visual.npz')
+
+POSES = {
+    'diagonal': ((15.0, 13.0, 12.0), (0.0, 0.0, 0.0), (0.0, 0.0, 1.0)),
+    'frontal': ((0.0, 4.0, 25.0), (0.0, 2.0, 0.0), (0.0, 1.0, 0.0)),
+    'superior': ((2.0, 28.0, 1.0), (0.0, 0.0, 0.0), (0.0, 0.0, -1.0)),
+}
+RESOLUCOES = (100, 250, 800)
+ALFAS = {'lightgreen': 0.35, 'deepskyblue': 0.5, 'cornflowerblue': 0.6}
+
+def casos_regressao():
+    """
+    Lista os casos da regressão: (nome, cena, pose, resolução, opções de
+    rasterizar_quadro). O pintor (lento) e a transparência só rodam sobre
+    compor_cena(); o z-buffer opaco roda nas duas cenas.
+    """
+    cenas = {'compor_cena': compor_cena(), 'sintetica_5': cena_sintetica(5)}
+    casos = []
+    for nome_cena, cena in cenas.items():
+        for nome_pose, pose in POSES.items():
+            for res in RESOLUCOES:
+                casos.append((f"{nome_cena}/{nome_pose}/zbuffer/{res}", cena, pose, res,
+                               {'sombreamento': 'flat'}))
+                if nome_cena == 'compor_cena':
+                    casos.append((f"{nome_cena}/{nome_pose}/pintor/{res}", cena, pose, res, {}))
+            if nome_cena == 'compor_cena':
+                casos.append((f"{nome_cena}/{nome_pose}/oit/250", cena, pose, 250,
+                              {'sombreamento': 'flat', 'alfas': ALFAS, 'transparencia': 'oit'}))
+    return casos
+
+def renderizar_caso(cena, pose, res, opcoes):
+    """Renderiza um caso e quantiza o framebuffer para uint8."""
+    camera_pos, ponto_alvo, up_mundo = (np.array(vetor) for vetor in pose)
+    framebuffer = rasterizar_quadro(*cena, camera_pos, ponto_alvo, up_mundo, res, **opcoes)
+    return (np.clip(framebuffer, 0, 1) * 255 + 0.5).astype(np.uint8)
+
+def comparar_imagens(referencia, atual, tolerancia_pixel=2):
+    """
+    Compara duas imagens uint8 de forma vetorizada.
+
+    Args:
+        referencia, atual (np.array): Imagens (A, L, 3) em uint8.
+        tolerancia_pixel (int): Diferença máxima por canal para o pixel ser considerado igual.
+
+    Returns:
+        dict: 'erro_maximo', 'psnr' (dB, inf se idênticas), 'pixels_diferentes' e
+              'mapa_diferenca' (A, L) com o maior erro por pixel.
+    """
+    if referencia.shape != atual.shape:
+        return {'erro_maximo': 255, 'psnr': 0.0, 'pixels_diferentes': int(np.prod(referencia.shape[:2])),
+                'mapa_diferenca': None}
+    diferenca = np.abs(referencia.astype(np.int16) - atual.astype(np.int16))
+    mapa = diferenca.max(axis=2)
+    mse = np.mean(diferenca.astype(np.float64) ** 2)
+    psnr = float('inf') if mse == 0 else float(10 * np.log10(255.0 ** 2 / mse))
+    return {
+        'erro_maximo': int(mapa.max()),
+        'psnr': psnr,
+        'pixels_diferentes': int(np.count_nonzero(mapa > tolerancia_pixel)),
+        'mapa_diferenca': mapa,
+    }
+
+def salvar_mapa_diferenca(mapa, caminho):
+    """Grava o mapa de diferença como imagem (mapa de calor)."""
+    import matplotlib.pyplot as plt
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    plt.imsave(caminho, mapa[::-1], cmap='inferno', vmin=0, vmax=max(int(mapa.max()), 1))
+
+def executar_regressao(atualizar=False, tolerancia_pixel=2, max_pixels_diferentes=0, psnr_minimo=40.0,
+                       diretorio_diferencas='diferencas_regressao', arquivo=ARQUIVO_REFERENCIAS):
+    """
+    Executa a regressão visual (ou regrava as referências).
+
+    Returns:
+        list: Nomes dos casos que falharam (vazia se tudo passou).
+    """
+    inicio = time.perf_counter()
+    imagens = {nome: renderizar_caso(cena, pose, res, opcoes)
+               for nome, cena, pose, res, opcoes in casos_regressao()}
+
+    if atualizar:
+        os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+        np.savez_compressed(arquivo, **imagens)
+        print(f"{len(imagens)} referências gravadas em {arquivo} ({time.perf_counter() - inicio:.2f} s)")
+        return []
+
+    referencias = np.load(arquivo)
+    falhas = []
+    for nome, atual in imagens.items():
+        if nome not in referencias:
+            print(f"[SEM REFERÊNCIA] {nome}")
+            falhas.append(nome)
+            continue
+        metricas = comparar_imagens(referencias[nome], atual, tolerancia_pixel)
+        passou = (metricas['pixels_diferentes'] <= max_pixels_diferentes and metricas['psnr'] >= psnr_minimo)
+        if not passou:
+            falhas.append(nome)
+            if metricas['mapa_diferenca'] is not None:
+                caminho = os.path.join(diretorio_diferencas, nome.replace('/', '_') + '.png')
+                salvar_mapa_diferenca(metricas['mapa_diferenca'], caminho)
+            print(f"[FALHOU] {nome}: erro máx {metricas['erro_maximo']}, PSNR {metricas['psnr']:.1f} dB, "
+                  f"{metricas['pixels_diferentes']} pixels diferentes")
+    print(f"{len(imagens) - len(falhas)}/{len(imagens)} casos iguais às referências "
+          f"({time.perf_counter() - inicio:.2f} s)")
+    return falhas
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Regressão visual do rasterizador")
+    parser.add_argument('--atualizar', action='store_true', help="Regrava as imagens de referência")
+    parser.add_argument('--tolerancia-pixel', type=int, default=2)
+    parser.add_argument('--max-pixels-diferentes', type=int, default=0)
+    parser.add_argument('--psnr-minimo', type=float, default=40.0)
+    parser.add_argument('--backend', choices=nucleos.BACKENDS, help="Backend dos núcleos (ver nucleos.py)")
+    args = parser.parse_args()
+    if args.backend:
+        nucleos.usar_backend(args.backend)
+
+    falhas = executar_regressao(args.atualizar, args.tolerancia_pixel, args.max_pixels_diferentes,
+                                args.psnr_minimo)
+    sys.exit(1 if falhas else 0)
@@ -0,0 +1,345 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+from camera import Camera
+from buffer_profundidade import projetar_vertices, rasterizar_triangulos, faces_na_frente
+from iluminacao import cores_sombreadas, sombrear_framebuffer
+from rasterizacao import MAPA_CORES, rasterizar_quadro
+from cenas_sinteticas import cena_sintetica
+from perfil import etapa
+
+# --- Renderização em Blocos de Cenas Maiores que a Memória (Out-of-Core) ---
+# compor_cena monta todos os vértices em um único array e o rasterizador espera
+# todas as faces na memória; o modelo de uma planta inteira não cabe. Aqui a cena
+# fica em disco, dividida em blocos de tamanho fixo:
+# - EscritorCena grava a geometria à medida que ela é gerada, em arquivos binários
+#   crus (vértices float32, faces int32 com índices locais ao bloco, material
+#   uint16) e um índice JSON com os limites e a caixa envolvente de cada bloco;
+# - CenaEmDisco lê um bloco por vez do arquivo (np.fromfile com deslocamento);
+# - rasterizar_em_blocos descarta pelo frustum os blocos inteiros (sem lê-los),
+#   transforma, rasteriza e sombreia cada bloco sobre um buffer de profundidade e
+#   um framebuffer persistentes, e libera o bloco antes de ler o próximo.
+# A memória de pico é a de um bloco (mais os lotes de fragmentos) mais o framebuffer,
+# independente do tamanho da cena.
+
+ARQUIVOS = {
+    # nome: (arquivo, tipo, colunas)
+    'vertices': ('vertices.f32', np.float32, 3),
+    'faces': ('faces.i32', np.int32, 3),
+    'materiais': ('materiais.u16', np.uint16, 1),
+}
+ARQUIVO_INDICE = 'indice.json'
+MAX_MATERIAIS = int(np.iinfo(ARQUIVOS['materiais'][1]).max) + 1
+
+def bytes_por_linha(nome):
+    """Bytes em disco de uma linha (vértice, face ou material) do arquivo nome."""
+    _, tipo, colunas = ARQUIVOS[nome]
+    return np.dtype(tipo).itemsize * colunas
+
+# Memória de trabalho por face de um bloco, somada a partir dos tipos dos arrays
+# vivos no pico da renderização (sombreamento 'gouraud'). As malhas de
+# cena_sintetica têm ~0.5 vértice por face.
+VERTICES_POR_FACE = 0.5
+_B64 = np.dtype(np.float64).itemsize
+_BYTES_ARRAYS_POR_FACE = (
+    # leitura: faces do disco e em int64; material do disco e cor RGB em float64
+    bytes_por_linha('faces') + 3 * _B64 + bytes_por_linha('materiais') + 3 * _B64
+    # vértices do disco e em float64, e a projeção (pontos 2D, z e w)
+    + VERTICES_POR_FACE * (bytes_por_linha('vertices') + 3 * _B64 + 4 * _B64)
+    # preparar_triangulos: índices, caixa (4 int64), A, B, C e z (3 float64 cada), topo-esquerda (3 bool)
+    + _B64 + 4 * _B64 + 4 * 3 * _B64 + 3
+    # iluminação 'gouraud': normais de face e de vértice, cores (3, 3) por face
+    + 3 * _B64 + VERTICES_POR_FACE * 3 * _B64 + 9 * _B64
+)
+# As expressões vetorizadas criam temporários do mesmo tamanho dos arrays acima:
+# com tracemalloc o pico ficou em ~2.1x a soma (~710 bytes por face com 'gouraud'),
+# e o fator 2.25 deixa uma margem.
+BYTES_POR_FACE = int(2.25 * _BYTES_ARRAYS_POR_FACE)
+# Framebuffer RGB float64, buffer de profundidade float64, buffer de faces int64
+# e a máscara de faces do bloco (int64)
+BYTES_POR_PIXEL = 3 * _B64 + _B64 + 2 * np.dtype(np.int64).itemsize
+
+def faces_por_bloco_para(orcamento_bytes, res):
+    """Maior tamanho de bloco cuja renderização cabe no orçamento de memória."""
+    return max(int((orcamento_bytes - BYTES_POR_PIXEL * res * res) // BYTES_POR_FACE), 1024)
+
+class EscritorCena:
+    """
+    Grava uma cena em disco bloco a bloco, sem montá-la inteira na memória.
+
+    Os objetos são acumulados até somarem faces_por_bloco faces e então gravados
+    como um bloco; um objeto nunca é dividido entre blocos, então cada bloco
+    referencia apenas os seus próprios vértices.
+
+    Uso:
+        with EscritorCena(diretorio) as escritor:
+            escritor.adicionar(vertices, faces, cores)
+    """
+
+    def __init__(self, diretorio, faces_por_bloco=1 << 16):
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self.faces_por_bloco = faces_por_bloco
+        self._arquivos = {nome: open(os.path.join(diretorio, arquivo), 'wb')
+                          for nome, (arquivo, _, _) in ARQUIVOS.items()}
+        self._pendentes = []
+        self._faces_pendentes = 0
+        self._materiais = {}
+        self.limites_vertices, self.limites_faces, self.caixas = [0], [0], []
+
+    def adicionar(self, vertices, faces, cores):
+        """
+        Acrescenta um objeto (ou grupo de objetos) à cena.
+
+        Args:
+            vertices (np.array): Vértices (n, 3) no mundo.
+            faces (np.array): Faces (m, 3) com índices em vertices.
+            cores (list): Nome da cor (material) de cada face.
+        """
+        total = len(self._materiais) + len(set(cores).difference(self._materiais))
+        if total > MAX_MATERIAIS:
+            raise ValueError(f"A cena teria {total} materiais; o formato em disco comporta {MAX_MATERIAIS}")
+        materiais = np.array([self._materiais.setdefault(cor, len(self._materiais)) for cor in cores],
+                             dtype=ARQUIVOS['materiais'][1])
+        self._pendentes.append((np.asarray(vertices, dtype=np.float32), np.asarray(faces, dtype=np.int64),
+                                materiais))
+        self._faces_pendentes += len(materiais)
+        if self._faces_pendentes >= self.faces_por_bloco:
+            self._gravar_bloco()
+
+    def _gravar_bloco(self):
+        if not self._pendentes:
+            return
+        deslocamentos = np.cumsum([0] + [len(v) for v, _, _ in self._pendentes[:-1]])
+        vertices = np.concatenate([v for v, _, _ in self._pendentes])
+        faces = np.concatenate([f + d for (_, f, _), d in zip(self._pendentes, deslocamentos)])
+        materiais = np.concatenate([m for _, _, m in self._pendentes])
+
+        vertices.tofile(self._arquivos['vertices'])
+        faces.astype(np.int32).tofile(self._arquivos['faces'])
+        materiais.tofile(self._arquivos['materiais'])
+        self.limites_vertices.append(self.limites_vertices[-1] + len(vertices))
+        self.limites_faces.append(self.limites_faces[-1] + len(faces))
+        self.caixas.append([vertices.min(axis=0).tolist(), vertices.max(axis=0).tolist()])
+        self._pendentes, self._faces_pendentes = [], 0
+
+    def fechar(self):
+        """Grava o último bloco e o índice da cena."""
+        self._gravar_bloco()
+        for arquivo in self._arquivos.values():
+            arquivo.close()
+        materiais = sorted(self._materiais, key=self._materiais.get)
+        indice = {'limites_vertices': self.limites_vertices, 'limites_faces': self.limites_faces,
+                  'caixas': self.caixas, 'materiais': materiais}
+        with open(os.path.join(self.diretorio, ARQUIVO_INDICE), 'w') as arquivo:
+            json.dump(indice, arquivo)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+class CenaEmDisco:
+    """
+    Cena gravada por EscritorCena, lida um bloco por vez.
+
+    Atributos:
+        limites_vertices, limites_faces (np.array): Início (K+1,) de cada bloco.
+        caixas (np.array): Caixas envolventes (K, 2, 3) dos blocos.
+        cores_materiais (np.array): Cor RGB (M, 3) de cada material.
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        with open(os.path.join(diretorio, ARQUIVO_INDICE)) as arquivo:
+            indice = json.load(arquivo)
+        self.limites_vertices = np.array(indice['limites_vertices'], dtype=np.int64)
+        self.limites_faces = np.array(indice['limites_faces'], dtype=np.int64)
+        self.caixas = np.array(indice['caixas'], dtype=float).reshape(-1, 2, 3)
+        self.materiais = indice['materiais']
+        self.cores_materiais = np.array([MAPA_CORES.get(nome, (1, 1, 1)) for nome in self.materiais],
+                                        dtype=float).reshape(-1, 3)
+
+    def __len__(self):
+        return len(self.caixas)
+
+    @property
+    def num_faces(self):
+        return int(self.limites_faces[-1])
+
+    @property
+    def bytes_em_disco(self):
+        return sum(os.path.getsize(os.path.join(self.diretorio, arquivo)) for arquivo, _, _ in ARQUIVOS.values())
+
+    def _ler(self, nome, inicio, fim):
+        arquivo, tipo, colunas = ARQUIVOS[nome]
+        dados = np.fromfile(os.path.join(self.diretorio, arquivo), dtype=tipo, count=(fim - inicio) * colunas,
+                            offset=inicio * colunas * np.dtype(tipo).itemsize)
+        return dados.reshape(-1, colunas) if colunas > 1 else dados
+
+    def bloco(self, i):
+        """
+        Lê o bloco i.
+
+        Returns:
+            tuple: (vertices (n, 3) float64, faces (m, 3) com índices locais, cores RGB (m, 3)).
+        """
+        v0, v1 = self.limites_vertices[i], self.limites_vertices[i + 1]
+        f0, f1 = self.limites_faces[i], self.limites_faces[i + 1]
+        vertices = self._ler('vertices', v0, v1).astype(float)
+        faces = self._ler('faces', f0, f1).astype(np.int64)
+        return vertices, faces, self.cores_materiais[self._ler('materiais', f0, f1)]
+
+def rasterizar_em_blocos(cena, camera, res, sombreamento='flat', direcao_luz=(-0.3, -0.5, -1.0),
+                         max_fragmentos=1 << 18):
+    """
+    Rasteriza uma CenaEmDisco bloco a bloco em um framebuffer persistente.
+
+    Cada bloco grava no buffer de faces os índices globais das suas faces, que
+    crescem de bloco para bloco: depois de rasterizá-lo, os pixels com índice a
+    partir do início do bloco são exatamente os que ele ganhou, e só esses são
+    sombreados. O resultado é o mesmo do z-buffer com a cena inteira na memória.
+
+    Args:
+        cena (CenaEmDisco): Cena em disco.
+        camera (Camera): Câmera.
+        res (int): Resolução do framebuffer (res x res).
+        sombreamento (str): 'flat', 'gouraud' ou None (cores sem luz).
+        max_fragmentos (int): Tamanho dos lotes de fragmentos do rasterizador.
+
+    Returns:
+        tuple: (framebuffer (res, res, 3), estatísticas), com os 'blocos' lidos,
+               os 'blocos_descartados' pelo frustum, as 'faces' e os 'bytes_lidos'.
+    """
+    framebuffer = np.zeros((res, res, 3))
+    buffer_z = np.full((res, res), 0.0 if camera.reversa else np.inf,
+                       dtype=np.float32 if camera.reversa else np.float64)
+    buffer_face = np.full((res, res), -1, dtype=np.int64)
+    mat_transform = camera.visao_projecao
+
+    with etapa('recorte', entrada=len(cena)) as e:
+        centros = cena.caixas.mean(axis=1)
+        raios = np.linalg.norm(cena.caixas[:, 1] - cena.caixas[:, 0], axis=1) / 2
+        blocos = np.flatnonzero(camera.esferas_no_frustum(centros, raios))
+        e.saida = len(blocos)
+
+    faces_lidas = bytes_lidos = 0
+    for i in blocos:
+        with etapa('leitura', entrada=1) as e:
+            vertices, faces, cores = cena.bloco(i)
+            e.saida = len(faces)
+        with etapa('projecao', entrada=len(vertices)):
+            pontos, z, w = projetar_vertices(vertices, mat_transform, res, res)
+        with etapa('rasterizacao', entrada=len(faces)):
+            inicio = cena.limites_faces[i]
+            rasterizar_triangulos(pontos, z, faces, res, res, validos=faces_na_frente(w, faces), buffer_z=buffer_z,
+                                  buffer_face=buffer_face, id_base=inicio, reversa=camera.reversa,
+                                  max_fragmentos=max_fragmentos)
+        with etapa('sombreamento', entrada=len(faces)):
+            if sombreamento is not None:
+                cores = cores_sombreadas(vertices, faces, cores, camera.posicao, direcao_luz,
+                                         sombreamento=sombreamento)
+            faces_do_bloco = np.where(buffer_face >= inicio, buffer_face - inicio, -1)
+            sombrear_framebuffer(framebuffer, faces_do_bloco, pontos, faces, cores)
+        faces_lidas += len(faces)
+        bytes_lidos += (len(vertices) * bytes_por_linha('vertices')
+                        + len(faces) * (bytes_por_linha('faces') + bytes_por_linha('materiais')))
+        del vertices, faces, cores, pontos, z, w, faces_do_bloco
+
+    estatisticas = {'blocos': len(blocos), 'blocos_descartados': len(cena) - len(blocos),
+                    'faces': faces_lidas, 'bytes_lidos': bytes_lidos}
+    return framebuffer, estatisticas
+
+def gravar_planta(diretorio, bytes_alvo, faces_por_bloco=1 << 16, modulos_distintos=8, espacamento=20.0):
+    """
+    Grava em disco uma "planta" sintética com pelo menos bytes_alvo bytes: uma
+    grade de módulos de cena_sintetica(10), cada um deslocado para a sua posição.
+    Só os modulos_distintos módulos base ficam na memória.
+
+    Returns:
+        tuple: (número de módulos, lado da grade em unidades do mundo).
+    """
+    modulos = [cena_sintetica(10, semente=semente) for semente in range(modulos_distintos)]
+    bytes_modulo = np.mean([len(v) * bytes_por_linha('vertices')
+                            + len(f) * (bytes_por_linha('faces') + bytes_por_linha('materiais'))
+                            for v, f, _, _, _ in modulos])
+    num_modulos = int(np.ceil(bytes_alvo / bytes_modulo))
+    lado = int(np.ceil(np.sqrt(num_modulos)))
+    with EscritorCena(diretorio, faces_por_bloco) as escritor:
+        for k in range(num_modulos):
+            vertices, faces, cores, _, _ = modulos[k % modulos_distintos]
+            deslocamento = np.array([k % lado, 0.0, k // lado]) * espacamento
+            escritor.adicionar(vertices + deslocamento, faces, cores)
+    return num_modulos, lado * espacamento
+
+def camera_planta(extensao):
+    """Câmera que enquadra uma planta de gravar_planta vista do alto, na diagonal."""
+    centro = np.array([extensao / 2, 0.0, extensao / 2])
+    return Camera(centro + [0.0, 0.7 * extensao, 0.9 * extensao], centro, (0.0, 1.0, 0.0),
+                  near=1.0, far=3 * extensao)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Renderização em blocos de uma cena maior que a memória")
+    parser.add_argument('--orcamento-mb', type=float, default=64.0,
+                        help="Memória disponível para a renderização (MB)")
+    parser.add_argument('--fator', type=float, default=10.0, help="Tamanho da cena em múltiplos do orçamento")
+    parser.add_argument('--res', type=int, default=400)
+    parser.add_argument('--faces-por-bloco', type=int, default=None,
+                        help="Tamanho dos blocos (padrão: o maior que cabe no orçamento)")
+    parser.add_argument('--diretorio', default=None, help="Onde gravar a cena (padrão: diretório temporário)")
+    args = parser.parse_args()
+
+    diretorio = args.diretorio or tempfile.mkdtemp(prefix='planta_')
+    try:
+        # --- 1. Conferência: blocos x cena inteira na memória ---
+        pequena = os.path.join(diretorio, 'conferencia')
+        num_modulos, extensao = gravar_planta(pequena, 4e6, faces_por_bloco=20_000)
+        cena = CenaEmDisco(pequena)
+        camera = camera_planta(extensao)
+        framebuffer, _ = rasterizar_em_blocos(cena, camera, args.res)
+        partes = [cena.bloco(i) for i in range(len(cena))]
+        deslocamentos = np.cumsum([0] + [len(v) for v, _, _ in partes[:-1]])
+        vertices = np.concatenate([v for v, _, _ in partes])
+        faces = np.concatenate([f + d for (_, f, _), d in zip(partes, deslocamentos)])
+        nomes = [cena.materiais[m] for m in cena._ler('materiais', 0, cena.num_faces)]
+        referencia = rasterizar_quadro(vertices, faces, nomes, np.zeros((0, 3)), [], None, None, None, args.res,
+                                       sombreamento='flat', camera=camera)
+        diferentes = int(np.count_nonzero(np.abs(framebuffer - referencia).max(axis=2) > 1e-9))
+        print(f"Conferência ({len(cena)} blocos, {cena.num_faces} faces): "
+              f"{diferentes} pixels diferentes da cena inteira na memória")
+        del partes, vertices, faces, nomes, referencia
+
+        # --- 2. Cena com fator x o orçamento de memória ---
+        orcamento = args.orcamento_mb * 2 ** 20
+        grande = os.path.join(diretorio, 'planta')
+        inicio = time.perf_counter()
+        # Os blocos são fechados depois de passar do limite, então ele desconta um módulo (~16k faces)
+        faces_por_bloco = args.faces_por_bloco or faces_por_bloco_para(orcamento, args.res) - 16_000
+        num_modulos, extensao = gravar_planta(grande, args.fator * orcamento, faces_por_bloco)
+        cena = CenaEmDisco(grande)
+        tempo_gravacao = time.perf_counter() - inicio
+        print(f"Cena: {num_modulos} módulos, {cena.num_faces} faces, {len(cena)} blocos, "
+              f"{cena.bytes_em_disco / 2 ** 20:.0f} MB em disco (gravada em {tempo_gravacao:.1f} s)")
+
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        framebuffer, estatisticas = rasterizar_em_blocos(cena, camera_planta(extensao), args.res)
+        tempo = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"Renderização: {tempo:.1f} s, {estatisticas['faces'] / tempo / 1e6:.2f} M faces/s, "
+              f"{estatisticas['bytes_lidos'] / tempo / 2 ** 20:.1f} MB/s lidos, "
+              f"{estatisticas['blocos_descartados']} blocos descartados pelo frustum")
+        print(f"Pico de memória: {pico / 2 ** 20:.1f} MB (orçamento {args.orcamento_mb:.0f} MB, "
+              f"cena {cena.bytes_em_disco / orcamento:.1f}x o orçamento)")
+    finally:
+        if args.diretorio is None:
+            shutil.rmtree(diretorio, ignore_errors=True)
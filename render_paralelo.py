@@ -0,0 +1,242 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+
+from camera import Camera
+from buffer_profundidade import projetar_vertices, preparar_triangulos, rasterizar_faixa, faces_na_frente
+from iluminacao import cores_sombreadas, sombrear_framebuffer
+from rasterizacao import cores_rgb_faces, rasterizar_linhas
+from perfil import etapa
+
+# --- Renderização em Faixas com um Pool de Threads ---
+# Para um único quadro interativo, um pool de processos (como o de
+# servico_render.py) paga a serialização das faixas de volta ao processo
+# principal, e cada processo refaz a iluminação e a projeção da cena inteira.
+# Aqui o quadro é dividido em faixas horizontais da tela e distribuído entre
+# threads do mesmo processo:
+# - a parte por vértice e por face (iluminação, projeção, recorte e
+#   preparar_triangulos) roda uma única vez, na thread que pede o quadro;
+# - cada thread rasteriza (rasterizar_faixa) e sombreia (sombrear_framebuffer)
+#   a sua faixa diretamente em fatias do framebuffer e dos buffers de
+#   profundidade e de faces, alocados antes: as faixas são disjuntas, então não
+#   há travas nem cópias;
+# - as linhas (poucas arestas) são desenhadas no fim, sobre o quadro inteiro.
+# Faixas de linhas inteiras, e não blocos quadrados, porque cada faixa é
+# contígua na memória: os seus buffers são visões que os núcleos tratam como
+# arrays (altura da faixa, largura) sem copiar. Há FAIXAS_POR_THREAD faixas por
+# thread para equilibrar a carga, já que os triângulos não se distribuem
+# igualmente pela tela.
+#
+# O paralelismo vem do que roda sem o GIL: as ufuncs e ordenações do NumPy sobre
+# arrays grandes no backend 'numpy', e a chamada inteira do núcleo sequencial
+# (nogil) no backend 'numba' de nucleos.py. O quadro sai idêntico, bit a bit, ao
+# de rasterizar_quadro com o mesmo sombreamento (sem transparência, sombras nem
+# texturas, que continuam só em rasterizar_quadro).
+#
+# O __main__ mede a escalabilidade forte (threads x processos, por número de
+# núcleos, a 800x800 e 2160x2160) e grava as medições em JSON. Ela só tem
+# sentido em uma máquina com vários núcleos:
+#   python render_paralelo.py --saida escalabilidade_render_paralelo.json
+#   python render_paralelo.py --resolucoes 200 --saida /tmp/teste.json   # conferência rápida
+
+FAIXAS_POR_THREAD = 4
+
+def dividir_faixas(altura, num_faixas):
+    """
+    Divide as linhas 0 .. altura - 1 em faixas contíguas de alturas quase iguais.
+
+    Returns:
+        list: Pares (y_inicio, y_fim), inclusivos.
+    """
+    limites = np.linspace(0, altura, min(num_faixas, altura) + 1).astype(int)
+    return [(int(inicio), int(fim) - 1) for inicio, fim in zip(limites[:-1], limites[1:])]
+
+def preparar_quadro(vertices_cena, faces_cena, cores_faces, camera, res, sombreamento='flat',
+                    direcao_luz=(-0.3, -0.5, -1.0)):
+    """
+    Parte do quadro que vale para todas as faixas: cores iluminadas, projeção,
+    recorte e configuração dos triângulos (as mesmas etapas de rasterizar_quadro).
+
+    Returns:
+        dict: 'preparados' (preparar_triangulos, ou None se nada aparece na tela),
+              'pontos', 'faces', 'cores' e 'reversa'.
+    """
+    faces_array = np.asarray(faces_cena, dtype=np.int64).reshape(-1, 3)
+    with etapa('sombreamento', entrada=len(faces_array)):
+        cores = cores_sombreadas(vertices_cena, faces_array, cores_rgb_faces(cores_faces), camera.posicao,
+                                 direcao_luz, sombreamento=sombreamento)
+    with etapa('projecao', entrada=len(vertices_cena)) as e:
+        pontos, z, w = projetar_vertices(vertices_cena, camera.visao_projecao, res, res)
+        e.saida = len(pontos)
+    with etapa('recorte', entrada=len(faces_array)) as e:
+        validos = faces_na_frente(w, faces_array)
+        preparados = preparar_triangulos(pontos, z, faces_array, res, res, validos)
+        e.saida = 0 if preparados is None else len(preparados[0])
+    return {'preparados': preparados, 'pontos': pontos, 'faces': faces_array, 'cores': cores,
+            'reversa': camera.reversa}
+
+def buffers_faixa(altura, largura, reversa=False):
+    """Framebuffer, buffer de profundidade e buffer de faces vazios (como em rasterizar_quadro)."""
+    return (np.zeros((altura, largura, 3)),
+            np.full((altura, largura), 0.0 if reversa else np.inf, dtype=np.float32 if reversa else np.float64),
+            np.full((altura, largura), -1, dtype=np.int64))
+
+def renderizar_faixa(quadro, framebuffer, buffer_z, buffer_face, y_inicio):
+    """
+    Rasteriza e sombreia uma faixa do quadro nos buffers (fatias) dessa faixa.
+
+    Args:
+        quadro (dict): Saída de preparar_quadro.
+        framebuffer, buffer_z, buffer_face (np.array): Buffers da faixa, com a
+                                                       linha 0 na linha y_inicio da tela.
+        y_inicio (int): Primeira linha da faixa.
+    """
+    if quadro['preparados'] is None:
+        return
+    rasterizar_faixa(quadro['preparados'], buffer_z, buffer_face, y_inicio, reversa=quadro['reversa'],
+                     paralelo=False)
+    sombrear_framebuffer(framebuffer, buffer_face, quadro['pontos'], quadro['faces'], quadro['cores'], y_inicio)
+
+def _desenhar_linhas(framebuffer, vertices_linha, arestas_linha, camera):
+    with etapa('rasterizacao', entrada=len(arestas_linha)):
+        v_homogeneos_linha = np.hstack((vertices_linha, np.ones((vertices_linha.shape[0], 1))))
+        rasterizar_linhas(framebuffer, (camera.visao_projecao @ v_homogeneos_linha.T).T, arestas_linha)
+
+def rasterizar_quadro_faixas(cena, camera, res, sombreamento='flat', direcao_luz=(-0.3, -0.5, -1.0),
+                             num_threads=None, faixas_por_thread=FAIXAS_POR_THREAD, executor=None):
+    """
+    Rasteriza um quadro com as faixas da tela distribuídas entre threads.
+
+    Args:
+        cena (tuple): Cena no formato de compor_cena().
+        camera (Camera): Câmera.
+        res (int): Resolução do framebuffer (res x res).
+        sombreamento (str): 'flat' ou 'gouraud'.
+        num_threads (int, opcional): Threads do pool; padrão os.cpu_count().
+        faixas_por_thread (int): Faixas por thread (equilíbrio de carga).
+        executor (ThreadPoolExecutor, opcional): Pool já criado, para reaproveitar
+                                                 as threads entre quadros (com
+                                                 num_threads igual ao seu tamanho).
+
+    Returns:
+        np.array: Framebuffer RGB (res, res, 3), igual ao de rasterizar_quadro.
+    """
+    vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha = cena
+    num_threads = num_threads or os.cpu_count()
+    framebuffer, buffer_z, buffer_face = buffers_faixa(res, res, camera.reversa)
+    quadro = preparar_quadro(vertices_cena, faces_cena, cores_faces, camera, res, sombreamento, direcao_luz)
+
+    with etapa('rasterizacao', entrada=len(quadro['faces'])) as e:
+        faixas = dividir_faixas(res, num_threads * faixas_por_thread)
+        pool = executor or ThreadPoolExecutor(num_threads)
+        try:
+            # Cada tarefa escreve só nas linhas da sua faixa: não há travas
+            tarefas = [pool.submit(renderizar_faixa, quadro, framebuffer[inicio:fim + 1],
+                                   buffer_z[inicio:fim + 1], buffer_face[inicio:fim + 1], inicio)
+                       for inicio, fim in faixas]
+            for tarefa in tarefas:
+                tarefa.result()
+        finally:
+            if executor is None:
+                pool.shutdown()
+        e.saida = int(np.count_nonzero(buffer_face >= 0))
+
+    _desenhar_linhas(framebuffer, vertices_linha, arestas_linha, camera)
+    return framebuffer
+
+# Cena residente em cada processo do pool de comparação (ver _iniciar_processo)
+_cena_processo = None
+
+def _iniciar_processo(cena):
+    global _cena_processo
+    _cena_processo = cena
+
+def _faixa_em_processo(camera, res, sombreamento, direcao_luz, faixa):
+    """Renderiza uma faixa em um processo: refaz a preparação e devolve a faixa (serializada)."""
+    vertices_cena, faces_cena, cores_faces = _cena_processo[:3]
+    quadro = preparar_quadro(vertices_cena, faces_cena, cores_faces, camera, res, sombreamento, direcao_luz)
+    inicio, fim = faixa
+    framebuffer, buffer_z, buffer_face = buffers_faixa(fim - inicio + 1, res, camera.reversa)
+    renderizar_faixa(quadro, framebuffer, buffer_z, buffer_face, inicio)
+    return framebuffer
+
+def rasterizar_quadro_processos(cena, camera, res, pool, num_faixas, sombreamento='flat',
+                                direcao_luz=(-0.3, -0.5, -1.0)):
+    """
+    O mesmo quadro com as faixas em um ProcessPoolExecutor (iniciado com
+    initializer=_iniciar_processo, initargs=(cena,)), para comparação: cada
+    processo refaz a preparação da cena e devolve a sua faixa por pickle.
+
+    Returns:
+        np.array: Framebuffer RGB (res, res, 3).
+    """
+    faixas = dividir_faixas(res, num_faixas)
+    partes = pool.map(_faixa_em_processo, *zip(*[(camera, res, sombreamento, direcao_luz, faixa)
+                                                 for faixa in faixas]))
+    framebuffer = np.concatenate(list(partes))
+    _desenhar_linhas(framebuffer, cena[3], cena[4], camera)
+    return framebuffer
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    from mundo import compor_cena
+    from rasterizacao import rasterizar_quadro
+    from cenas_sinteticas import cena_sintetica
+    from benchmark import cronometrar, metadados
+    import nucleos
+
+    parser = argparse.ArgumentParser(description="Escalabilidade forte: faixas em threads x em processos")
+    parser.add_argument('--saida', default='escalabilidade_render_paralelo.json',
+                        help="Arquivo JSON com as medições (para guardar junto com os resultados)")
+    # 2160 x 2160: a altura de um quadro 4K (3840 x 2160), na tela quadrada do pipeline
+    parser.add_argument('--resolucoes', type=int, nargs='+', default=[800, 2160])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    def tempo_minimo(funcao):
+        return cronometrar(funcao, repeticoes=args.repeticoes)['minimo_s']
+
+    num_cpus = os.cpu_count()
+    contagens = [n for n in (1, 2, 4, 8, 16, 32, 64) if n <= max(num_cpus, 2)]
+    print(f"{num_cpus} CPUs; threads/processos testados: {contagens}; backends: {nucleos.backends_disponiveis()}")
+    medicoes = []
+    casos = {
+        'compor_cena': (compor_cena(), Camera((15.0, 13.0, 12.0), (0.0, 0.0, 0.0))),
+        'cena_sintetica(20)': (cena_sintetica(20), Camera((40.0, 34.0, 30.0), (0.0, 0.0, 0.0))),
+    }
+    for nome, (cena, camera) in casos.items():
+        for res in args.resolucoes:
+            for nome_backend in nucleos.backends_disponiveis():
+                nucleos.usar_backend(nome_backend)
+                referencia = rasterizar_quadro(*cena, None, None, None, res, sombreamento='flat', camera=camera)
+                t_serial = tempo_minimo(lambda: rasterizar_quadro(*cena, None, None, None, res, sombreamento='flat',
+                                                                  camera=camera))
+                print(f"\n{nome}, {res}x{res}, backend {nome_backend}: rasterizar_quadro {t_serial * 1000:.0f} ms")
+                print(f"  {'n':>3}{'threads (ms)':>14}{'aceleração':>12}{'processos (ms)':>16}{'aceleração':>12}"
+                      f"{'início do pool (ms)':>21}  idênticos")
+                for n in contagens:
+                    with ThreadPoolExecutor(n) as threads:
+                        def quadro_threads():
+                            return rasterizar_quadro_faixas(cena, camera, res, num_threads=n, executor=threads)
+                        t_threads = tempo_minimo(quadro_threads)
+                        iguais = np.array_equal(quadro_threads(), referencia)
+                    inicio = time.perf_counter()
+                    with ProcessPoolExecutor(n, initializer=_iniciar_processo, initargs=(cena,)) as processos:
+                        def quadro_processos():
+                            return rasterizar_quadro_processos(cena, camera, res, processos, n * FAIXAS_POR_THREAD)
+                        quadro_processos()
+                        t_inicio_pool = time.perf_counter() - inicio
+                        t_processos = tempo_minimo(quadro_processos)
+                        iguais &= np.array_equal(quadro_processos(), referencia)
+                    print(f"  {n:>3}{t_threads * 1000:>14.0f}{t_serial / t_threads:>11.2f}x{t_processos * 1000:>16.0f}"
+                          f"{t_serial / t_processos:>11.2f}x{t_inicio_pool * 1000:>21.0f}  {iguais}")
+                    medicoes.append({'cena': nome, 'res': res, 'backend': nome_backend, 'n': n,
+                                     'serial_s': t_serial, 'threads_s': t_threads, 'processos_s': t_processos,
+                                     'inicio_pool_s': t_inicio_pool, 'identicos': bool(iguais)})
+        nucleos.usar_backend('numpy')
+
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump({'metadados': dict(metadados(), cpus=num_cpus), 'medicoes': medicoes}, arquivo, indent=2)
+    print(f"\nmedições gravadas em {args.saida}")
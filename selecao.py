@@ -0,0 +1,203 @@
+import time
+import numpy as np
+
+# --- Seleção na Tela (Buffer de IDs) ---
+# rasterizar_quadro(..., retornar_ids=True) grava, no mesmo passo da cor, um
+# buffer (res, res, 2) uint32 com a instância e a face visíveis em cada pixel
+# (SEM_OBJETO no fundo). A partir dele:
+# - selecionar() responde a um clique com uma leitura do buffer, O(1), em vez de
+#   testar o raio do pixel contra todas as F faces (intersecao_raio, mantida como
+#   referência);
+# - objetos_na_regiao() devolve os objetos visíveis em um retângulo com um
+#   np.unique sobre a fatia do buffer.
+# Como no framebuffer, a linha 0 é a base da imagem: o pixel (x, y) é buffer[y, x].
+
+SEM_OBJETO = np.uint32(0xFFFFFFFF)
+
+def montar_buffer_ids(buffer_face, instancias_faces=None):
+    """
+    Monta o buffer de IDs a partir do buffer de faces do rasterizador.
+
+    Args:
+        buffer_face (np.array): Buffer (altura, largura) com a face visível (-1 no fundo).
+        instancias_faces (np.array, opcional): Instância (F,) de cada face; sem ele,
+                                               todas as faces são da instância 0.
+
+    Returns:
+        np.array: Buffer (altura, largura, 2) uint32 com (instância, face) por pixel.
+    """
+    buffer_ids = np.empty(buffer_face.shape + (2,), dtype=np.uint32)
+    # -1 convertido para uint32 é exatamente SEM_OBJETO
+    buffer_ids[..., 1] = buffer_face.astype(np.uint32)
+    if instancias_faces is None:
+        buffer_ids[..., 0] = np.where(buffer_face >= 0, 0, SEM_OBJETO)
+    else:
+        # Tabela com SEM_OBJETO no fim: o índice -1 do fundo cai nela
+        tabela = np.append(np.asarray(instancias_faces, dtype=np.uint32), SEM_OBJETO)
+        buffer_ids[..., 0] = tabela[buffer_face]
+    return buffer_ids
+
+def selecionar(buffer_ids, x, y):
+    """
+    Objeto sob o pixel (x, y).
+
+    Returns:
+        tuple: (instância, face), ou None no fundo ou fora da tela.
+    """
+    altura, largura = buffer_ids.shape[:2]
+    if not (0 <= x < largura and 0 <= y < altura):
+        return None
+    instancia, face = buffer_ids[y, x]
+    if face == SEM_OBJETO:
+        return None
+    return int(instancia), int(face)
+
+def objetos_na_regiao(buffer_ids, x0, y0, x1, y1, retornar_contagens=False):
+    """
+    Instâncias visíveis no retângulo de cantos (x0, y0) e (x1, y1), inclusive.
+
+    Args:
+        retornar_contagens (bool): Se True, devolve também quantos pixels de cada
+                                   instância aparecem na região.
+
+    Returns:
+        np.array: IDs das instâncias (ordenados), seguidos das contagens quando
+                  retornar_contagens é True.
+    """
+    altura, largura = buffer_ids.shape[:2]
+    x0, x1 = max(min(x0, x1), 0), min(max(x0, x1), largura - 1)
+    y0, y1 = max(min(y0, y1), 0), min(max(y0, y1), altura - 1)
+    regiao = buffer_ids[y0:y1 + 1, x0:x1 + 1, 0]
+    instancias, contagens = np.unique(regiao, return_counts=True)
+    # SEM_OBJETO é o maior uint32, então o fundo (se houver) é sempre o último
+    if len(instancias) and instancias[-1] == SEM_OBJETO:
+        instancias, contagens = instancias[:-1], contagens[:-1]
+    return (instancias, contagens) if retornar_contagens else instancias
+
+def instancias_conexas(faces, num_vertices=None):
+    """
+    Instância de cada face pelas componentes conexas da malha (faces que
+    compartilham vértices), numeradas na ordem em que aparecem. Serve para cenas
+    como compor_cena(), em que cada sólido é uma malha separada.
+
+    Returns:
+        np.array: Instância (F,) de cada face.
+    """
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    if num_vertices is None:
+        num_vertices = int(faces.max()) + 1 if len(faces) else 0
+    rotulos = np.arange(num_vertices)
+    while True:
+        # Cada vértice recebe o menor rótulo das suas faces; o salto de ponteiros
+        # (rotulos[rotulos]) encurta as cadeias a cada volta
+        anteriores = rotulos
+        rotulos = rotulos.copy()
+        np.minimum.at(rotulos, faces, rotulos[faces].min(axis=1, keepdims=True))
+        rotulos = rotulos[rotulos]
+        if np.array_equal(rotulos, anteriores):
+            break
+    _, primeira, instancias = np.unique(rotulos[faces[:, 0]], return_index=True, return_inverse=True)
+    ordem = np.argsort(np.argsort(primeira, kind='stable'), kind='stable')
+    return ordem[instancias.reshape(-1)]
+
+def raio_pixel(camera, x, y, res):
+    """
+    Raio do mundo que passa pelo centro do pixel (x, y) (inverso do mapeamento
+    de projetar_vertices).
+
+    Returns:
+        tuple: (origem (3,), direção (3,) unitária).
+    """
+    ndc_x, ndc_y = 2 * x / (res - 1) - 1, 2 * y / (res - 1) - 1
+    z_near, z_meio = (1.0, 0.5) if camera.reversa else (-1.0, 0.0)
+    pontos = np.array([[ndc_x, ndc_y, z_near, 1.0], [ndc_x, ndc_y, z_meio, 1.0]]) @ \
+        np.linalg.inv(camera.visao_projecao).T
+    pontos = pontos[:, :3] / pontos[:, 3:]
+    direcao = pontos[1] - pontos[0]
+    return pontos[0], direcao / np.linalg.norm(direcao)
+
+def intersecao_raio(vertices, faces, origem, direcao):
+    """
+    Primeira face atingida pelo raio (Möller-Trumbore contra todas as faces, O(F)).
+
+    Returns:
+        tuple: (face, distância), ou None se o raio não atinge nenhuma face.
+    """
+    tri = np.asarray(vertices, dtype=float)[np.asarray(faces, dtype=np.int64).reshape(-1, 3)]
+    aresta1, aresta2 = tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]
+    p = np.cross(direcao, aresta2)
+    det = np.einsum('ij,ij->i', aresta1, p)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_det = 1.0 / det
+        s = origem - tri[:, 0]
+        u = np.einsum('ij,ij->i', s, p) * inv_det
+        q = np.cross(s, aresta1)
+        v = (q @ direcao) * inv_det
+        t = np.einsum('ij,ij->i', aresta2, q) * inv_det
+    acerto = (np.abs(det) > 1e-12) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t > 0)
+    if not acerto.any():
+        return None
+    candidatas = np.flatnonzero(acerto)
+    face = candidatas[np.argmin(t[candidatas])]
+    return int(face), float(t[face])
+
+if __name__ == '__main__':
+    from camera import Camera
+    from mundo import compor_cena
+    from rasterizacao import rasterizar_quadro
+    from construtor_cena import planta_aleatoria
+    from benchmark import cronometrar
+
+    res = 800
+    gerador = np.random.default_rng(0)
+    construtor = planta_aleatoria(2000, extensao=12.0)
+    v_planta, f_planta, c_planta, vl_planta, al_planta, instancias_planta = construtor.cena(retornar_instancias=True)
+    vertices, faces, cores, v_linha, a_linha = compor_cena()
+    faces = np.asarray(faces)
+    casos = {
+        'compor_cena': (vertices, faces, cores, v_linha, a_linha, instancias_conexas(faces),
+                        Camera((15.0, 13.0, 12.0), (0.0, 0.0, 0.0))),
+        'planta_aleatoria(2000)': (v_planta, f_planta, c_planta, vl_planta, al_planta,
+                                   instancias_planta, Camera((40.0, 34.0, 30.0), (0.0, 0.0, 0.0))),
+    }
+    for nome, (v, f, c, vl, al, instancias, camera) in casos.items():
+        print(f"\n{nome}: {len(f)} faces, {instancias.max() + 1} instâncias")
+        tempos = {}
+        for sombreamento in ('flat', None):
+            if sombreamento is None and len(f) > 100000:
+                continue
+            def quadro(ids, sombreamento=sombreamento):
+                return rasterizar_quadro(v, f, c, vl, al, None, None, None, res, sombreamento=sombreamento,
+                                         camera=camera, retornar_ids=ids, instancias_faces=instancias)
+            t_sem = cronometrar(lambda: quadro(False), 3)['minimo_s']
+            t_com = cronometrar(lambda: quadro(True), 3)['minimo_s']
+            tempos[sombreamento] = t_sem
+            print(f"  quadro {str(sombreamento):<5} sem IDs {t_sem * 1000:8.1f} ms, com IDs {t_com * 1000:8.1f} ms")
+
+        # O custo próprio do buffer de IDs no caminho com profundidade é montar_buffer_ids
+        framebuffer, buffer_ids = quadro(True, 'flat')
+        buffer_face = np.where(buffer_ids[..., 1] == SEM_OBJETO, -1, buffer_ids[..., 1].astype(np.int64))
+        t_ids = cronometrar(lambda: montar_buffer_ids(buffer_face, instancias), 20)['minimo_s']
+        print(f"  montar_buffer_ids: {t_ids * 1000:.2f} ms por quadro ({t_ids / tempos['flat'] * 100:.1f}% do quadro "
+              f"flat), {buffer_ids.nbytes / 2**20:.1f} MiB")
+
+        # Cliques em pixels cobertos: a leitura do buffer contra o teste de raio O(F)
+        ys, xs = np.nonzero(buffer_ids[..., 1] != SEM_OBJETO)
+        amostra = gerador.choice(len(xs), 200, replace=False)
+        iguais, t_raio = 0, 0.0
+        for x, y in zip(xs[amostra].tolist(), ys[amostra].tolist()):
+            inicio = time.perf_counter()
+            acerto = intersecao_raio(v, f, *raio_pixel(camera, x, y, res))
+            t_raio += time.perf_counter() - inicio
+            iguais += acerto is not None and instancias[acerto[0]] == selecionar(buffer_ids, x, y)[0]
+        inicio = time.perf_counter()
+        for x, y in zip(xs[amostra].tolist(), ys[amostra].tolist()):
+            selecionar(buffer_ids, x, y)
+        t_buffer = time.perf_counter() - inicio
+        print(f"  clique: buffer {t_buffer / len(amostra) * 1e6:.2f} µs, raio O(F) "
+              f"{t_raio / len(amostra) * 1e3:.2f} ms ({t_raio / t_buffer:.0f}x); "
+              f"mesma instância em {iguais}/{len(amostra)} cliques")
+        inicio = time.perf_counter()
+        visiveis = objetos_na_regiao(buffer_ids, 200, 200, 599, 599)
+        print(f"  região 400x400: {len(visiveis)} instâncias visíveis em "
+              f"{(time.perf_counter() - inicio) * 1000:.2f} ms")
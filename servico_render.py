@@ -0,0 +1,334 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from camera import Camera
+from mundo import compor_cena
+from vistas import rasterizar_vistas
+
+# --- Serviço Local de Renderização Sob Demanda ---
+# Cada requisição é uma pose de câmera (posição, alvo, up) e uma resolução; a
+# resposta é a imagem RGB. A cena fica residente na memória de cada processo
+# trabalhador (carregada uma única vez pelo inicializador do pool). Requisições
+# concorrentes são agrupadas em lotes, requisições idênticas em andamento são
+# unificadas, e os resultados recentes ficam em um cache LRU. No trabalhador, as
+# vistas do lote com a mesma resolução são renderizadas juntas por
+# rasterizar_vistas (vistas.py): uma transformação e um recorte para todas as
+# câmeras, uma viewport por vista. Requisições inválidas são recusadas antes de
+# entrar na fila, e a falha de uma vista não derruba as outras do mesmo lote.
+
+# Maior resolução aceita por requisição
+RES_MAXIMA = 4096
+
+# Cena residente no processo trabalhador (preenchida por _iniciar_trabalhador)
+_cena_trabalhador = None
+
+def _iniciar_trabalhador(cena):
+    global _cena_trabalhador
+    vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha = cena
+    # Arrays NumPy persistentes: o cache de normais de iluminacao.py passa a
+    # acertar em todas as requisições seguintes deste trabalhador.
+    _cena_trabalhador = (np.asarray(vertices_cena, dtype=float), np.asarray(faces_cena), list(cores_faces),
+                         np.asarray(vertices_linha, dtype=float), arestas_linha)
+
+def _renderizar_vistas(requisicoes, sombreamento, descartar_costas):
+    """Renderiza vistas de mesma resolução da cena residente em uma única chamada de rasterizar_vistas."""
+    res = requisicoes[0][3]
+    cameras = [Camera(np.array(camera_pos), np.array(ponto_alvo), np.array(up_mundo))
+               for camera_pos, ponto_alvo, up_mundo, _ in requisicoes]
+    # Uma linha de viewports, uma por câmera
+    framebuffer = rasterizar_vistas(*_cena_trabalhador, cameras, res, colunas=len(cameras),
+                                    sombreamento=sombreamento, descartar_costas=descartar_costas)
+    imagens = (framebuffer[::-1] * 255 + 0.5).astype(np.uint8)
+    return [np.ascontiguousarray(imagens[:, k * res:(k + 1) * res]) for k in range(len(cameras))]
+
+def _renderizar_lote(requisicoes, sombreamento, descartar_costas=True):
+    """
+    Renderiza, no processo trabalhador, um lote de vistas da cena residente.
+
+    As vistas são agrupadas por resolução e cada grupo vai em uma chamada de
+    rasterizar_vistas. Se um grupo falhar, as suas vistas são refeitas uma a
+    uma, para que só a vista com problema fique com o erro.
+
+    Returns:
+        list: Para cada requisição, a imagem RGB (res, res, 3) em uint8 ou a exceção.
+    """
+    grupos = {}
+    for i, requisicao in enumerate(requisicoes):
+        grupos.setdefault(requisicao[3], []).append(i)
+
+    resultados = [None] * len(requisicoes)
+    for indices in grupos.values():
+        try:
+            imagens = _renderizar_vistas([requisicoes[i] for i in indices], sombreamento, descartar_costas)
+        except Exception:
+            imagens = []
+            for i in indices:
+                try:
+                    imagens.append(_renderizar_vistas([requisicoes[i]], sombreamento, descartar_costas)[0])
+                except Exception as erro:
+                    imagens.append(erro)
+        for i, imagem in zip(indices, imagens):
+            resultados[i] = imagem
+    return resultados
+
+def validar_requisicao(camera_pos, ponto_alvo, up_mundo, res):
+    """
+    Confere uma requisição antes de ela entrar em um lote.
+
+    Returns:
+        tuple: (camera_pos, ponto_alvo, up_mundo, res) como tuplas de float e int.
+
+    Raises:
+        ValueError: Se algum vetor não tiver 3 números finitos, se a câmera
+                    coincidir com o alvo, se o up for paralelo à direção de
+                    visão ou se res não for um inteiro entre 1 e RES_MAXIMA.
+    """
+    vetores = []
+    for nome, valor in (('camera', camera_pos), ('alvo', ponto_alvo), ('up', up_mundo)):
+        try:
+            vetor = np.asarray(valor, dtype=float)
+        except (TypeError, ValueError):
+            vetor = None
+        if vetor is None or vetor.shape != (3,) or not np.all(np.isfinite(vetor)):
+            raise ValueError(f"'{nome}' deve ser um vetor de 3 números finitos, não {valor!r}")
+        vetores.append(vetor)
+    if isinstance(res, (bool, np.bool_)) or not isinstance(res, (int, np.integer)) or not 1 <= res <= RES_MAXIMA:
+        raise ValueError(f"'res' deve ser um inteiro entre 1 e {RES_MAXIMA}, não {res!r}")
+    direcao = vetores[1] - vetores[0]
+    if not np.linalg.norm(direcao) > 0:
+        raise ValueError("A câmera coincide com o alvo")
+    if not np.linalg.norm(np.cross(direcao, vetores[2])) > 0:
+        raise ValueError("O vetor up é nulo ou paralelo à direção de visão")
+    return tuple(tuple(vetor.tolist()) for vetor in vetores) + (int(res),)
+
+def chave_requisicao(camera_pos, ponto_alvo, up_mundo, res, casas_decimais=6):
+    """Chave de cache de uma requisição (pose arredondada + resolução)."""
+    pose = np.round(np.concatenate((camera_pos, ponto_alvo, up_mundo)).astype(float), casas_decimais)
+    return tuple(pose.tolist()) + (int(res),)
+
+class CacheLRU:
+    """Cache com descarte do item usado há mais tempo."""
+
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave):
+        if chave not in self._itens:
+            self.faltas += 1
+            return None
+        self.acertos += 1
+        self._itens.move_to_end(chave)
+        return self._itens[chave]
+
+    def guardar(self, chave, valor):
+        self._itens[chave] = valor
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+
+class ServicoRender:
+    """
+    Serviço assíncrono de renderização.
+
+    Args:
+        cena (tuple): Cena no formato de compor_cena(); padrão é a própria compor_cena().
+        num_processos (int): Tamanho do pool de processos.
+        max_lote (int): Máximo de vistas por lote enviado a um trabalhador.
+        janela_lote (float): Tempo (s) de espera para juntar requisições em um lote.
+        capacidade_cache (int): Número de imagens mantidas no cache LRU.
+        sombreamento (str): Modo de sombreamento passado a rasterizar_vistas.
+        descartar_costas (bool): Descarta as faces de costas para cada câmera (ver
+                                 vistas.py); com False, cada imagem é igual à de
+                                 rasterizar_quadro com o mesmo sombreamento.
+    """
+
+    def __init__(self, cena=None, num_processos=2, max_lote=8, janela_lote=0.005,
+                 capacidade_cache=64, sombreamento='flat', descartar_costas=True):
+        self.cena = cena if cena is not None else compor_cena()
+        self.num_processos = num_processos
+        self.max_lote = max_lote
+        self.janela_lote = janela_lote
+        self.sombreamento = sombreamento
+        self.descartar_costas = descartar_costas
+        self.cache = CacheLRU(capacidade_cache)
+        self.lotes_enviados = 0
+        self._pendentes = {}
+        self._fila = None
+        self._pool = None
+        self._tarefa_lotes = None
+        self._lotes_em_andamento = set()
+
+    async def iniciar(self):
+        self._pool = ProcessPoolExecutor(self.num_processos, initializer=_iniciar_trabalhador,
+                                         initargs=(self.cena,))
+        self._fila = asyncio.Queue()
+        self._tarefa_lotes = asyncio.create_task(self._agrupar_lotes())
+
+    async def parar(self):
+        self._tarefa_lotes.cancel()
+        try:
+            await self._tarefa_lotes
+        except asyncio.CancelledError:
+            pass
+        if self._lotes_em_andamento:
+            await asyncio.gather(*self._lotes_em_andamento, return_exceptions=True)
+        self._pool.shutdown()
+
+    async def __aenter__(self):
+        await self.iniciar()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.parar()
+
+    async def renderizar(self, camera_pos, ponto_alvo, up_mundo, res):
+        """
+        Renderiza uma vista da cena.
+
+        Returns:
+            np.array: Imagem RGB (res, res, 3) em uint8, com a linha 0 no topo.
+
+        Raises:
+            ValueError: Se a requisição for inválida (ver validar_requisicao).
+        """
+        requisicao = validar_requisicao(camera_pos, ponto_alvo, up_mundo, res)
+        chave = chave_requisicao(*requisicao)
+        imagem = self.cache.obter(chave)
+        if imagem is not None:
+            return imagem
+
+        # Requisição idêntica já em andamento: espera o mesmo resultado
+        if chave in self._pendentes:
+            return await asyncio.shield(self._pendentes[chave])
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes[chave] = futuro
+        await self._fila.put((chave, requisicao))
+        return await asyncio.shield(futuro)
+
+    async def _agrupar_lotes(self):
+        """Junta as requisições que chegam dentro da janela em lotes de até max_lote."""
+        while True:
+            lote = [await self._fila.get()]
+            prazo = asyncio.get_running_loop().time() + self.janela_lote
+            while len(lote) < self.max_lote:
+                restante = prazo - asyncio.get_running_loop().time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            tarefa = asyncio.create_task(self._executar_lote(lote))
+            self._lotes_em_andamento.add(tarefa)
+            tarefa.add_done_callback(self._lotes_em_andamento.discard)
+
+    async def _executar_lote(self, lote):
+        self.lotes_enviados += 1
+        chaves = [chave for chave, _ in lote]
+        try:
+            imagens = await asyncio.get_running_loop().run_in_executor(
+                self._pool, _renderizar_lote, [requisicao for _, requisicao in lote], self.sombreamento,
+                self.descartar_costas)
+        except Exception as erro:
+            for chave in chaves:
+                self._pendentes.pop(chave).set_exception(erro)
+            return
+        # Cada requisição recebe a sua imagem ou o seu próprio erro
+        for chave, imagem in zip(chaves, imagens):
+            futuro = self._pendentes.pop(chave)
+            if isinstance(imagem, Exception):
+                futuro.set_exception(imagem)
+            else:
+                self.cache.guardar(chave, imagem)
+                futuro.set_result(imagem)
+
+    async def atender_conexao(self, leitor, escritor):
+        """
+        Protocolo TCP simples: cada linha é um JSON {"camera", "alvo", "up", "res"};
+        a resposta é uma linha JSON com {"largura", "altura", "bytes"} seguida dos
+        bytes RGB24 da imagem, ou {"erro": ...} se o pedido ou a renderização
+        falhar.
+        """
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    pedido = json.loads(linha)
+                    imagem = await self.renderizar(pedido['camera'], pedido['alvo'],
+                                                   pedido.get('up', [0, 0, 1]), pedido['res'])
+                except Exception as erro:
+                    # Pedido malformado ou falha na renderização: a conexão segue aberta
+                    escritor.write((json.dumps({'erro': str(erro)}) + '\n').encode())
+                    await escritor.drain()
+                    continue
+                cabecalho = {'largura': imagem.shape[1], 'altura': imagem.shape[0], 'bytes': imagem.nbytes}
+                escritor.write((json.dumps(cabecalho) + '\n').encode())
+                escritor.write(imagem.tobytes())
+                await escritor.drain()
+        finally:
+            escritor.close()
+
+    async def servir(self, host='127.0.0.1', porta=8765):
+        """Abre o servidor TCP local e atende até ser cancelado."""
+        servidor = await asyncio.start_server(self.atender_conexao, host, porta)
+        async with servidor:
+            await servidor.serve_forever()
+
+async def gerar_carga(servico, num_requisicoes=200, concorrencia=16, num_poses=40, res=100, semente=0):
+    """
+    Gerador de carga local: dispara requisições concorrentes com poses sorteadas
+    de um conjunto fixo (para exercitar também o cache) e mede a latência de cada uma.
+
+    Returns:
+        dict: Percentis de latência (ms), vazão e estatísticas de cache e lotes.
+    """
+    gerador = np.random.default_rng(semente)
+    angulos = np.linspace(0, 2 * np.pi, num_poses, endpoint=False)
+    poses = np.column_stack((20 * np.cos(angulos), 20 * np.sin(angulos), np.full(num_poses, 12.0)))
+    escolhas = gerador.integers(0, num_poses, num_requisicoes)
+
+    latencias = []
+    semaforo = asyncio.Semaphore(concorrencia)
+
+    async def uma_requisicao(indice):
+        async with semaforo:
+            inicio = time.perf_counter()
+            await servico.renderizar(poses[indice], (0, 0, 0), (0, 0, 1), res)
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(uma_requisicao(i) for i in escolhas))
+    total = time.perf_counter() - inicio
+
+    latencias_ms = np.array(latencias) * 1000
+    p50, p90, p99 = np.percentile(latencias_ms, [50, 90, 99])
+    return {
+        'requisicoes': num_requisicoes,
+        'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99, 'max_ms': latencias_ms.max(),
+        'requisicoes_por_segundo': num_requisicoes / total,
+        'acertos_cache': servico.cache.acertos,
+        'lotes': servico.lotes_enviados,
+    }
+
+if __name__ == '__main__':
+
+    async def principal():
+        async with ServicoRender(num_processos=2) as servico:
+            resultado = await gerar_carga(servico, num_requisicoes=200, concorrencia=16, res=100)
+        print(f"{resultado['requisicoes']} requisições, {resultado['lotes']} lotes, "
+              f"{resultado['acertos_cache']} acertos de cache")
+        print(f"Latência: p50 {resultado['p50_ms']:.1f} ms | p90 {resultado['p90_ms']:.1f} ms | "
+              f"p99 {resultado['p99_ms']:.1f} ms | máx {resultado['max_ms']:.1f} ms")
+        print(f"Vazão: {resultado['requisicoes_por_segundo']:.1f} requisições/s")
+
+    asyncio.run(principal())
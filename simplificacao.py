@@ -0,0 +1,435 @@
+import heapq
+import time
+import numpy as np
+
+from camera import Camera
+from otimizacao_malha import codigos_morton
+from rasterizacao import rasterizar_quadro
+from solidos.cano_curvo import cano_curvado
+
+# --- Simplificação de Malhas por Métrica de Erro Quádrico ---
+# Decimação por colapso de arestas (Garland e Heckbert): cada vértice guarda a
+# quádrica Q (4x4) dos planos das faces originais em volta dele, e o custo de
+# colapsar a aresta (u, v) em um ponto x é x^T (Q_u + Q_v) x, a soma dos quadrados
+# das distâncias de x a esses planos. As arestas ficam em uma fila de prioridade
+# (um heap binário sobre uma lista, com remoção preguiçosa: cada entrada carrega a
+# versão dos dois vértices e é descartada se algum deles mudou depois).
+#
+# A cada colapso a malha é atualizada pelas tabelas de adjacência vértice -> faces;
+# colapsos que dobrariam alguma face (a normal gira demais) ou que quebrariam a
+# variedade (condição de enlace) são recusados. O passo inicial (quádricas, custos
+# de todas as arestas) é vetorizado; os colapsos, sequenciais por natureza, são um
+# laço em Python que recalcula em lote só as arestas do vértice que sobrou.
+#
+# Como a decimação é progressiva, niveis_detalhe() tira várias "fotos" da mesma
+# execução para montar os níveis de detalhe (LOD) pré-calculados, e escolher_nivel()
+# escolhe o mais simples cujo erro (distância de Hausdorff) cabe em um limite em
+# pixels para a câmera.
+
+# Cosseno mínimo entre a normal de uma face antes e depois do colapso
+_COS_MINIMO_NORMAL = 0.2
+
+def _vetorial(a, b):
+    """Produto vetorial de arrays (..., 3); np.cross pesa nos lotes pequenos do laço de colapsos."""
+    return np.stack((a[..., 1] * b[..., 2] - a[..., 2] * b[..., 1],
+                     a[..., 2] * b[..., 0] - a[..., 0] * b[..., 2],
+                     a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]), axis=-1)
+
+def quadricas_vertices(vertices, faces, peso_borda=1.0):
+    """
+    Quádrica de erro de cada vértice: a soma das quádricas dos planos das faces
+    que o contêm. Nas arestas de borda (de uma face só) entra também um plano
+    perpendicular à face, com peso peso_borda, para que a borda não encolha.
+
+    Returns:
+        np.array: Quádricas (N, 4, 4).
+    """
+    tri = vertices[faces]
+    normais = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    normais /= np.maximum(np.linalg.norm(normais, axis=1), 1e-300)[:, None]
+    planos = np.column_stack((normais, -np.einsum('ij,ij->i', normais, tri[:, 0])))
+    quadricas = np.zeros((len(vertices), 4, 4))
+    for k in range(3):
+        np.add.at(quadricas, faces[:, k], planos[:, :, None] * planos[:, None, :])
+
+    # Arestas de borda: as arestas orientadas (a, b) sem a oposta (b, a)
+    origem, destino = faces.ravel(), np.roll(faces, -1, axis=1).ravel()
+    chaves = np.minimum(origem, destino) * len(vertices) + np.maximum(origem, destino)
+    _, inverso, contagem = np.unique(chaves, return_inverse=True, return_counts=True)
+    borda = np.flatnonzero(contagem[inverso] == 1)
+    if len(borda) and peso_borda > 0:
+        aresta = vertices[destino[borda]] - vertices[origem[borda]]
+        normal_borda = np.cross(aresta, normais[borda // 3])
+        normal_borda /= np.maximum(np.linalg.norm(normal_borda, axis=1), 1e-300)[:, None]
+        planos_borda = np.column_stack((normal_borda, -np.einsum('ij,ij->i', normal_borda,
+                                                                 vertices[origem[borda]])))
+        q_borda = peso_borda * planos_borda[:, :, None] * planos_borda[:, None, :]
+        np.add.at(quadricas, origem[borda], q_borda)
+        np.add.at(quadricas, destino[borda], q_borda)
+    return quadricas
+
+def custos_colapso(quadricas, vertices, u, v):
+    """
+    Melhor posição e custo do colapso de cada aresta (u, v).
+
+    A posição ótima resolve o sistema 3x3 da quádrica; onde ele é singular (regiões
+    planas, cilindros) ou leva para longe da aresta, vale o melhor entre os dois
+    extremos e o ponto médio.
+
+    Returns:
+        tuple: (custos (K,), posicoes (K, 3)).
+    """
+    q = quadricas[u] + quadricas[v]
+    a, b = vertices[u], vertices[v]
+    medio = (a + b) / 2
+    otimo = medio.copy()
+    # A quádrica é semidefinida positiva: det / traço³ pequeno indica um autovalor
+    # quase nulo em relação ao maior (sistema mal condicionado)
+    sistema = q[:, :3, :3]
+    determinante = np.einsum('ij,ij->i', sistema[:, 0], _vetorial(sistema[:, 1], sistema[:, 2]))
+    bem_condicionado = determinante > 1e-10 * np.einsum('kii->k', sistema) ** 3
+    if bem_condicionado.any():
+        otimo[bem_condicionado] = np.linalg.solve(sistema[bem_condicionado], -q[bem_condicionado, :3, 3:])[..., 0]
+        longe = np.einsum('ij,ij->i', otimo - medio, otimo - medio) > np.einsum('ij,ij->i', b - a, b - a)
+        otimo[longe] = medio[longe]
+
+    candidatos = np.stack((otimo, a, b, medio), axis=1)
+    homogeneos = np.concatenate((candidatos, np.ones(candidatos.shape[:2] + (1,))), axis=2)
+    custos = np.einsum('kci,kij,kcj->kc', homogeneos, q, homogeneos)
+    melhor = custos.argmin(axis=1)
+    linhas = np.arange(len(u))
+    return np.maximum(custos[linhas, melhor], 0.0), candidatos[linhas, melhor]
+
+class _Simplificador:
+    """Estado de uma decimação progressiva (malha, adjacência e fila de arestas)."""
+
+    def __init__(self, vertices, faces, peso_borda=1.0):
+        inicio = time.perf_counter()
+        self.vertices = np.array(vertices, dtype=float)
+        self.faces = np.array(faces, dtype=np.int64).reshape(-1, 3)
+        self.face_viva = np.ones(len(self.faces), dtype=bool)
+        self.num_faces = len(self.faces)
+        self.quadricas = quadricas_vertices(self.vertices, self.faces, peso_borda)
+        self.versao = np.zeros(len(self.vertices), dtype=np.int64)
+        self.colapsos = 0
+        self.erro_maximo = 0.0
+
+        self.faces_vertice = [set() for _ in range(len(self.vertices))]
+        for f, (a, b, c) in enumerate(self.faces.tolist()):
+            self.faces_vertice[a].add(f)
+            self.faces_vertice[b].add(f)
+            self.faces_vertice[c].add(f)
+
+        arestas = np.sort(np.stack((self.faces, np.roll(self.faces, -1, axis=1)), axis=2).reshape(-1, 2), axis=1)
+        arestas = np.unique(arestas, axis=0)
+        self.fila = []
+        self._enfileirar(arestas[:, 0], arestas[:, 1])
+        self.tempo_preparo = time.perf_counter() - inicio
+        self.tempo_colapsos = 0.0
+
+    def _enfileirar(self, u, v):
+        custos, posicoes = custos_colapso(self.quadricas, self.vertices, u, v)
+        versao_u, versao_v = self.versao[u].tolist(), self.versao[v].tolist()
+        entradas = zip(custos.tolist(), u.tolist(), v.tolist(), versao_u, versao_v, map(tuple, posicoes.tolist()))
+        if self.fila:
+            for entrada in entradas:
+                heapq.heappush(self.fila, entrada)
+        else:
+            self.fila = list(entradas)
+            heapq.heapify(self.fila)
+
+    def _vizinhos(self, vertice):
+        return set(self.faces[list(self.faces_vertice[vertice])].ravel().tolist()) - {vertice}
+
+    def _colapsar(self, u, v, posicao):
+        faces_u, faces_v = self.faces_vertice[u], self.faces_vertice[v]
+        compartilhadas = faces_u & faces_v
+
+        # Condição de enlace: os vizinhos comuns de u e v são só os vértices opostos
+        # à aresta nas faces que a contêm; senão o colapso cria arestas não-variedade
+        opostos = set(self.faces[list(compartilhadas)].ravel().tolist()) - {u, v}
+        if self._vizinhos(u) & self._vizinhos(v) != opostos:
+            return False
+
+        # As faces que sobram não podem dobrar sobre si mesmas
+        restantes = np.fromiter((faces_u | faces_v) - compartilhadas, dtype=np.int64)
+        if len(restantes):
+            indices = self.faces[restantes]
+            tri = self.vertices[indices]
+            antes = _vetorial(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+            tri[(indices == u) | (indices == v)] = posicao
+            depois = _vetorial(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+            limite = _COS_MINIMO_NORMAL * np.sqrt(np.einsum('ij,ij->i', antes, antes) *
+                                                  np.einsum('ij,ij->i', depois, depois))
+            if np.any(np.einsum('ij,ij->i', antes, depois) <= limite):
+                return False
+            # Nem coincidir com outra (o caso do tetraedro, que passa pelo enlace)
+            novas = np.sort(np.where(indices == v, u, indices), axis=1)
+            if len(set(map(tuple, novas.tolist()))) < len(novas):
+                return False
+
+        for f in compartilhadas:
+            self.face_viva[f] = False
+            for w in self.faces[f].tolist():
+                if w != u and w != v:
+                    self.faces_vertice[w].discard(f)
+        for f in faces_v - compartilhadas:
+            self.faces[f][self.faces[f] == v] = u
+        self.faces_vertice[u] = (faces_u | faces_v) - compartilhadas
+        self.faces_vertice[v] = set()
+        self.num_faces -= len(compartilhadas)
+
+        self.vertices[u] = posicao
+        self.quadricas[u] += self.quadricas[v]
+        self.versao[u] += 1
+        self.versao[v] = -1
+        vizinhos = np.fromiter(self._vizinhos(u), dtype=np.int64)
+        if len(vizinhos):
+            self._enfileirar(np.full(len(vizinhos), u), vizinhos)
+        return True
+
+    def reduzir(self, alvo_faces=0, erro_maximo=np.inf):
+        """Colapsa arestas até ficar com no máximo alvo_faces ou até o custo passar de erro_maximo²."""
+        inicio = time.perf_counter()
+        limite = erro_maximo ** 2
+        while self.fila and self.num_faces > alvo_faces:
+            entrada = self.fila[0]
+            custo, u, v, versao_u, versao_v, posicao = entrada
+            if self.versao[u] != versao_u or self.versao[v] != versao_v:
+                heapq.heappop(self.fila)
+                continue
+            if custo > limite:
+                break
+            heapq.heappop(self.fila)
+            if self._colapsar(u, v, np.array(posicao)):
+                self.colapsos += 1
+                self.erro_maximo = max(self.erro_maximo, custo)
+        self.tempo_colapsos += time.perf_counter() - inicio
+
+    def malha(self):
+        """Malha atual compactada: (vertices, faces, indices_faces das faces originais)."""
+        indices_faces = np.flatnonzero(self.face_viva)
+        faces = self.faces[indices_faces]
+        usados, faces = np.unique(faces, return_inverse=True)
+        return self.vertices[usados], faces.reshape(-1, 3), indices_faces
+
+    def estatisticas(self, faces, vertices):
+        return {
+            'faces': faces,
+            'vertices': vertices,
+            'colapsos': self.colapsos,
+            'erro_quadrico': float(np.sqrt(self.erro_maximo)),
+            'tempo': self.tempo_preparo + self.tempo_colapsos,
+            'colapsos_por_segundo': self.colapsos / max(self.tempo_colapsos, 1e-12),
+        }
+
+def simplificar(vertices, faces, alvo_faces=0, erro_maximo=np.inf, peso_borda=1.0):
+    """
+    Decima uma malha por colapso de arestas com a métrica de erro quádrico.
+
+    Args:
+        vertices (np.array): Vértices (N, 3), como devolvidos pelos sólidos.
+        faces (np.array): Faces (F, 3).
+        alvo_faces (int): Para quando a malha chega a este número de faces.
+        erro_maximo (float): Para antes do primeiro colapso cujo erro (raiz do
+                             custo quádrico, em unidades da cena) passaria disto.
+        peso_borda (float): Peso dos planos que prendem as arestas de borda.
+
+    Returns:
+        tuple: (vertices, faces, indices_faces, estatísticas), com indices_faces (F',)
+               o índice original de cada face que sobrou (para levar cores e outros
+               atributos).
+    """
+    simplificador = _Simplificador(vertices, faces, peso_borda)
+    simplificador.reduzir(alvo_faces, erro_maximo)
+    novos_vertices, novas_faces, indices_faces = simplificador.malha()
+    return (novos_vertices, novas_faces, indices_faces,
+            simplificador.estatisticas(len(novas_faces), len(novos_vertices)))
+
+def amostrar_superficie(vertices, faces, num_amostras, semente=0):
+    """Os vértices da malha mais num_amostras pontos sorteados nas faces, proporcionalmente à área."""
+    tri = np.asarray(vertices, dtype=float)[faces]
+    areas = np.linalg.norm(np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]), axis=1)
+    gerador = np.random.default_rng(semente)
+    escolhidas = gerador.choice(len(tri), num_amostras, p=areas / areas.sum())
+    r1, r2 = gerador.random((2, num_amostras))
+    dobrar = r1 + r2 > 1
+    r1[dobrar], r2[dobrar] = 1 - r1[dobrar], 1 - r2[dobrar]
+    t = tri[escolhidas]
+    pontos = t[:, 0] + r1[:, None] * (t[:, 1] - t[:, 0]) + r2[:, None] * (t[:, 2] - t[:, 0])
+    return np.concatenate((np.asarray(vertices, dtype=float)[np.unique(faces)], pontos))
+
+def _distancia_ponto_triangulo(p, a, b, c):
+    """Distância de cada ponto p ao triângulo (a, b, c) correspondente (arrays (K, 3))."""
+    ab, ac, ap = b - a, c - a, p - a
+    normal = np.cross(ab, ac)
+    n2 = np.einsum('ij,ij->i', normal, normal)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.einsum('ij,ij->i', np.cross(ap, ac), normal) / n2
+        t = np.einsum('ij,ij->i', np.cross(ab, ap), normal) / n2
+        dentro = (s >= 0) & (t >= 0) & (s + t <= 1)
+        distancia = np.where(dentro, np.abs(np.einsum('ij,ij->i', ap, normal)) / np.sqrt(n2), np.inf)
+
+    # Fora da projeção, o ponto mais próximo está em uma das arestas
+    for inicio, fim in ((a, b), (b, c), (c, a)):
+        aresta = fim - inicio
+        comprimento2 = np.maximum(np.einsum('ij,ij->i', aresta, aresta), 1e-300)
+        u = np.clip(np.einsum('ij,ij->i', p - inicio, aresta) / comprimento2, 0, 1)
+        distancia = np.minimum(distancia, np.linalg.norm(p - inicio - u[:, None] * aresta, axis=1))
+    return distancia
+
+def _triangulos_perto_da_caixa(pontos, centros, raios, amostra=64):
+    """Triângulos que podem ser os mais próximos de algum ponto da caixa envolvente de 'pontos'."""
+    minimo, maximo = pontos.min(axis=0), pontos.max(axis=0)
+    perto = np.linalg.norm(centros - np.clip(centros, minimo, maximo), axis=1)
+    # Limite superior da distância de todos os pontos à malha: o pior ponto em
+    # relação aos triângulos mais próximos da caixa (com menos triângulos o mínimo
+    # de cada ponto só pode ser maior, então o limite continua válido)
+    proximos = np.argpartition(perto, amostra)[:amostra] if len(perto) > amostra else np.arange(len(perto))
+    superior = (np.linalg.norm(pontos[:, None] - centros[proximos], axis=2) + raios[proximos]).min(axis=1).max()
+    return np.flatnonzero(perto - raios <= superior)
+
+def distancia_pontos_malha(pontos, vertices, faces, blocos=(1024, 32)):
+    """
+    Distância de cada ponto à superfície da malha.
+
+    Cada triângulo é envolvido por uma esfera: |p - centro| - raio é um limite
+    inferior da distância, então a distância exata só é calculada para os
+    triângulos cujo limite inferior fica abaixo da distância ao triângulo de
+    centro mais próximo. Antes disso, os pontos são ordenados pela curva de
+    Morton e agrupados em blocos vizinhos no espaço (grandes e depois pequenos, de
+    acordo com 'blocos'), e o mesmo teste feito com a caixa de cada bloco descarta
+    a maior parte dos triângulos de uma vez.
+
+    Returns:
+        np.array: Distâncias (P,).
+    """
+    pontos = np.asarray(pontos, dtype=float)
+    tri = np.asarray(vertices, dtype=float)[faces]
+    centros = tri.mean(axis=1)
+    raios = np.linalg.norm(tri - centros[:, None], axis=2).max(axis=1)
+
+    ordem = np.argsort(codigos_morton(pontos), kind='stable')
+    distancias = np.empty(len(pontos))
+    bloco_grande, bloco = blocos
+    for inicio_grande in range(0, len(pontos), bloco_grande):
+        indices_grande = ordem[inicio_grande:inicio_grande + bloco_grande]
+        perto_grande = _triangulos_perto_da_caixa(pontos[indices_grande], centros, raios)
+        for inicio in range(0, len(indices_grande), bloco):
+            indices = indices_grande[inicio:inicio + bloco]
+            p = pontos[indices]
+            candidatos = perto_grande[_triangulos_perto_da_caixa(p, centros[perto_grande], raios[perto_grande])]
+
+            d = np.linalg.norm(p[:, None] - centros[candidatos], axis=2)
+            # A distância exata ao triângulo de centro mais próximo é o limite superior de cada ponto
+            mais_proximo = candidatos[d.argmin(axis=1)]
+            menores = _distancia_ponto_triangulo(p, *tri[mais_proximo].transpose(1, 0, 2))
+            ponto, k = np.nonzero(d - raios[candidatos] < menores[:, None])
+            exata = _distancia_ponto_triangulo(p[ponto], *tri[candidatos[k]].transpose(1, 0, 2))
+            np.minimum.at(menores, ponto, exata)
+            distancias[indices] = menores
+    return distancias
+
+def distancia_hausdorff(vertices_a, faces_a, vertices_b, faces_b, num_amostras=5000, semente=0):
+    """
+    Distância de Hausdorff simétrica entre duas malhas, estimada nos vértices e em
+    num_amostras pontos sorteados na superfície de cada uma.
+
+    Returns:
+        float: O maior dos dois desvios (de A até B e de B até A).
+    """
+    pontos_a = amostrar_superficie(vertices_a, faces_a, num_amostras, semente)
+    pontos_b = amostrar_superficie(vertices_b, faces_b, num_amostras, semente)
+    return float(max(distancia_pontos_malha(pontos_a, vertices_b, faces_b).max(),
+                     distancia_pontos_malha(pontos_b, vertices_a, faces_a).max()))
+
+def niveis_detalhe(vertices, faces, fracoes=(0.5, 0.25, 0.1, 0.05), peso_borda=1.0, medir_hausdorff=True,
+                   num_amostras=5000):
+    """
+    Pré-calcula níveis de detalhe (LOD) em uma única decimação progressiva.
+
+    Args:
+        vertices (np.array): Vértices (N, 3) da malha original.
+        faces (np.array): Faces (F, 3).
+        fracoes (tuple): Fração das faces originais em cada nível, decrescente.
+        medir_hausdorff (bool): Mede a distância de Hausdorff de cada nível à original.
+
+    Returns:
+        list: Níveis (vertices, faces, indices_faces, estatísticas), começando pela
+              malha original (nível 0, erro nulo).
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    original = {'faces': len(faces), 'vertices': len(vertices), 'colapsos': 0, 'erro_quadrico': 0.0,
+                'tempo': 0.0, 'colapsos_por_segundo': 0.0, 'hausdorff': 0.0}
+    niveis = [(vertices, faces, np.arange(len(faces)), original)]
+
+    simplificador = _Simplificador(vertices, faces, peso_borda)
+    for fracao in fracoes:
+        simplificador.reduzir(int(round(fracao * len(faces))))
+        novos_vertices, novas_faces, indices_faces = simplificador.malha()
+        estatisticas = simplificador.estatisticas(len(novas_faces), len(novos_vertices))
+        if medir_hausdorff:
+            estatisticas['hausdorff'] = distancia_hausdorff(vertices, faces, novos_vertices, novas_faces,
+                                                            num_amostras)
+        niveis.append((novos_vertices, novas_faces, indices_faces, estatisticas))
+    return niveis
+
+def escolher_nivel(niveis, camera, centro, erro_pixels=1.0, res=800):
+    """
+    Escolhe o nível mais simples cujo erro (Hausdorff) projetado na tela, a partir
+    da distância da câmera ao centro do objeto, fica abaixo de erro_pixels.
+
+    Returns:
+        int: Índice do nível em 'niveis'.
+    """
+    # Pixels por unidade da cena: projecao[1, 1] leva a altura do volume de visão a 2
+    pixels_por_unidade = camera.projecao[1, 1] * res / 2
+    if not camera.paralela:
+        pixels_por_unidade /= max(np.linalg.norm(np.asarray(centro, dtype=float) - camera.posicao), 1e-12)
+    escolhido = 0
+    for i, (_, _, _, estatisticas) in enumerate(niveis):
+        if estatisticas.get('hausdorff', np.inf) * pixels_por_unidade <= erro_pixels:
+            escolhido = i
+    return escolhido
+
+if __name__ == '__main__':
+    # Cano curvado com tesselação alta, como os que pesam nas cenas de tubulação
+    vertices, _, faces = cano_curvado(1.0, 0.2, np.array([0.0, 0.0, 0.0]), np.array([10.0, 0.0, 10.0]),
+                                      np.array([15.0, 0.0, 0.0]), np.array([0.0, 15.0, 0.0]),
+                                      num_segmentos_curva=200, num_divisoes_circulo=48)
+    faces = np.asarray(faces, dtype=np.int64)
+    cores = ['deepskyblue'] * len(faces)
+    print(f"cano curvado: {len(vertices)} vértices, {len(faces)} faces")
+
+    niveis = niveis_detalhe(vertices, faces)
+    print(f"\n{'nível':>5}{'faces':>8}{'vértices':>10}{'colapsos':>10}{'tempo (s)':>11}{'colapsos/s':>12}"
+          f"{'erro quádrico':>15}{'Hausdorff':>11}")
+    for i, (_, f, _, e) in enumerate(niveis):
+        print(f"{i:>5}{len(f):>8}{e['vertices']:>10}{e['colapsos']:>10}{e['tempo']:>11.2f}"
+              f"{e['colapsos_por_segundo']:>12.0f}{e['erro_quadrico']:>15.4f}{e['hausdorff']:>11.4f}")
+
+    # Escolha do nível pela distância e custo da rasterização de cada um
+    centro = (vertices.min(axis=0) + vertices.max(axis=0)) / 2
+    direcao = np.array([1.0, -1.0, 0.6]) / np.linalg.norm([1.0, -1.0, 0.6])
+    res = 400
+    vazio = np.zeros((0, 3)), np.zeros((0, 2), dtype=np.int64)
+    print(f"\n{'distância':>9}{'nível':>7}{'faces':>8}{'rasterizar (ms)':>17}{'silhueta (px)':>15}"
+          f"{'cor (px)':>10}")
+    for distancia in (15.0, 30.0, 60.0, 120.0):
+        camera = Camera(centro + distancia * direcao, centro, (0.0, 0.0, 1.0), near=distancia / 4,
+                        far=distancia * 2)
+        i = escolher_nivel(niveis, camera, centro, erro_pixels=0.5, res=res)
+        v_nivel, f_nivel, indices_faces, _ = niveis[i]
+        imagens, tempos = [], []
+        for v, f, c in ((vertices, faces, cores), (v_nivel, f_nivel, [cores[k] for k in indices_faces])):
+            inicio = time.perf_counter()
+            imagens.append(rasterizar_quadro(v, f, c, *vazio, None, None, None, res, sombreamento='flat',
+                                             camera=camera))
+            tempos.append(time.perf_counter() - inicio)
+        # Silhueta: pixels cobertos em uma imagem e não na outra; cor: diferença visível
+        # do sombreamento flat, que muda com as facetas mesmo sem erro geométrico
+        silhueta = int(np.count_nonzero((imagens[0].max(axis=2) > 0) != (imagens[1].max(axis=2) > 0)))
+        cor = int(np.count_nonzero(np.abs(imagens[0] - imagens[1]).max(axis=2) > 0.05))
+        print(f"{distancia:>9.0f}{i:>7}{len(f_nivel):>8}{tempos[0] * 1000:>8.1f} -> {tempos[1] * 1000:>5.1f}"
+              f"{silhueta:>15}{cor:>10}")
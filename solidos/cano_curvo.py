@@ -1,9 +1,7 @@
-import matplotlib
-matplotlib.use('TkAgg')
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from mpl_toolkits.mplot3d import Axes3D
+
+from solidos.varredura import perfil_anel, varrer_perfil
+from solidos.spline_hermite import SplineHermite, base_hermite
 
 # --- Função Auxiliar para Curva de Hermite ---
 def curva_hermite(P0, P1, T0, T1, num_pontos=50):
@@ -20,133 +18,67 @@ def curva_hermite(P0, P1, T0, T1, num_pontos=50):
     Returns:
         np.array: Um array de pontos 3D que formam a curva.
     """
-    t = np.linspace(0, 1, num_pontos)
-    h00 = 2*t**3 - 3*t**2 + 1
-    h10 = t**3 - 2*t**2 + t
-    h01 = -2*t**3 + 3*t**2
-    h11 = t**3 - t**2
+    controle = np.array([P0, T0, P1, T1], dtype=float)
+    return base_hermite(np.linspace(0, 1, num_pontos)) @ controle
+
+def caminho_hermite(pontos, tangentes, pontos_por_trecho=20):
+    """
+    Encadeia trechos de curva de Hermite que passam pelos pontos de controle.
 
-    curva = np.outer(h00, P0) + np.outer(h10, T0) + np.outer(h01, P1) + np.outer(h11, T1)
-    return curva
+    Args:
+        pontos (np.array): Pontos de controle (K, 3) por onde o caminho passa.
+        tangentes (np.array): Tangente (K, 3) em cada ponto de controle; trechos
+                              vizinhos compartilham a tangente, então a junção é suave.
+        pontos_por_trecho (int): Pontos gerados em cada trecho (com as pontas).
+
+    Returns:
+        np.array: Pontos do caminho, sem repetir os pontos de junção.
+    """
+    spline = SplineHermite(pontos, tangentes)
+    return spline.avaliar(np.linspace(0, spline.num_trechos, spline.num_trechos * (pontos_por_trecho - 1) + 1))
 
 # --- Função Principal para Modelagem do Cano Curvado ---
-def cano_curvado(raio, espessura, P0, P1, T0, T1, num_segmentos_curva=50, num_divisoes_circulo=20):
+def cano_curvado(raio, espessura, P0, P1, T0, T1, num_segmentos_curva=50, num_divisoes_circulo=20,
+                 retornar_uvs=False):
     """
     Modela um cano curvado ao longo de uma curva de Hermite, usando faces triangulares.
 
+    É a varredura (solidos/varredura.py) de um perfil de anel pela curva; os anéis
+    são igualmente espaçados em comprimento de arco (solidos/spline_hermite.py), o
+    plano de cada anel é perpendicular à tangente analítica da curva e a normal do
+    anel vem do eixo Y projetado nesse plano.
+
     Args:
         raio (float): O raio externo do cano.
         espessura (float): A espessura da parede do cano.
         P0, P1, T0, T1: Parâmetros da curva de Hermite (pontos e tangentes).
         num_segmentos_curva (int): Número de anéis de vértices ao longo do cano.
         num_divisoes_circulo (int): Número de vértices em cada anel circular.
+        retornar_uvs (bool): Se True, devolve também as coordenadas de textura
+                             (F, 3, 2): ângulo x comprimento de arco na parede.
 
     Returns:
-        tuple: Uma tupla contendo (vértices, arestas, faces).
+        tuple: Uma tupla contendo (vértices, arestas, faces), com arestas (E, 2) e
+               faces (F, 3) como arrays de índices, seguida das coordenadas de
+               textura quando retornar_uvs é True.
     """
-    if espessura >= raio:
-        raise ValueError("A espessura deve ser menor que o raio.")
-
-    # --- 1. Gerar a "espinha" do cano ---
-    pontos_curva = curva_hermite(P0, P1, T0, T1, num_segmentos_curva)
-
-    # --- 2. Preparar para gerar a malha ---
-    raio_interno = raio - espessura
-    vertices = []
-    faces = []
-    arestas = []
-    angulos_circulo = np.linspace(0, 2 * np.pi, num_divisoes_circulo, endpoint=False)
-
-    # --- 3. Calcular os frames e gerar os vértices ---
-    # Começamos com um vetor "para cima" arbitrário
-    up = np.array([0, 1, 0])
-
-    for i in range(num_segmentos_curva):
-        # Vetor tangente (direção da curva)
-        if i < num_segmentos_curva - 1:
-            tangente = pontos_curva[i+1] - pontos_curva[i]
-        else: # Reutiliza a última tangente para o último ponto
-            tangente = pontos_curva[i] - pontos_curva[i-1]
-
-        tangente = tangente / np.linalg.norm(tangente)
-
-        # Evitar problema se a tangente for paralela ao vetor "up"
-        if np.allclose(np.abs(np.dot(tangente, up)), 1.0):
-            up = np.array([1, 0, 0]) # Usa um vetor "up" diferente
-
-        # Calcula os vetores Normal e Binormal para criar o plano do anel
-        # Usamos o processo de Gram-Schmidt para garantir a ortogonalidade
-        normal = up - np.dot(up, tangente) * tangente
-        normal = normal / np.linalg.norm(normal)
-        binormal = np.cross(tangente, normal)
-
-        # Gera os anéis de vértices (externo e interno) neste ponto da curva
-        centro_anel = pontos_curva[i]
-        for angulo in angulos_circulo:
-            # Ponto no círculo externo
-            offset_vetor = (normal * np.cos(angulo) + binormal * np.sin(angulo))
-            vertices.append(centro_anel + raio * offset_vetor)
-            # Ponto no círculo interno
-            vertices.append(centro_anel + raio_interno * offset_vetor)
-
-    vertices = np.array(vertices)
-
-    # --- 4. Gerar Faces Triangulares e Arestas ---
-    for i in range(num_segmentos_curva - 1): # Itera pelos "segmentos" do cano
-        for j in range(num_divisoes_circulo): # Itera pelos vértices de cada anel
-            # Índice do próximo vértice no anel (com wrap-around)
-            k = (j + 1) % num_divisoes_circulo
-
-            # Índices dos vértices para o quadrilátero atual
-            # Cada "passo" no loop externo gera 2 vértices (externo, interno)
-            # por divisão de círculo.
-            idx_v1_ext = (i * num_divisoes_circulo + j) * 2
-            idx_v1_int = idx_v1_ext + 1
-            idx_v2_ext = (i * num_divisoes_circulo + k) * 2
-            idx_v2_int = idx_v2_ext + 1
-
-            idx_v3_ext = ((i + 1) * num_divisoes_circulo + k) * 2
-            idx_v3_int = idx_v3_ext + 1
-            idx_v4_ext = ((i + 1) * num_divisoes_circulo + j) * 2
-            idx_v4_int = idx_v4_ext + 1
-
-            # Triangulação da superfície externa
-            faces.append((idx_v1_ext, idx_v4_ext, idx_v3_ext))
-            faces.append((idx_v1_ext, idx_v3_ext, idx_v2_ext))
-
-            # Triangulação da superfície interna
-            faces.append((idx_v1_int, idx_v3_int, idx_v4_int))
-            faces.append((idx_v1_int, idx_v2_int, idx_v3_int))
-
-            # Arestas
-            arestas.append((idx_v1_ext, idx_v2_ext)) # Aresta no anel i (externo)
-            arestas.append((idx_v1_int, idx_v2_int)) # Aresta no anel i (interno)
-            arestas.append((idx_v1_ext, idx_v4_ext)) # Aresta longitudinal
-
-    # --- 5. Gerar faces das "tampas" (anéis de início e fim) ---
-    for j in range(num_divisoes_circulo):
-        k = (j + 1) % num_divisoes_circulo
-
-        # Tampa inicial
-        idx_i_v1_ext = (0 * num_divisoes_circulo + j) * 2
-        idx_i_v1_int = idx_i_v1_ext + 1
-        idx_i_v2_ext = (0 * num_divisoes_circulo + k) * 2
-        idx_i_v2_int = idx_i_v2_ext + 1
-        faces.append((idx_i_v1_int, idx_i_v2_ext, idx_i_v1_ext))
-        faces.append((idx_i_v1_int, idx_i_v2_int, idx_i_v2_ext))
-
-        # Tampa final
-        idx_f_v1_ext = ((num_segmentos_curva - 1) * num_divisoes_circulo + j) * 2
-        idx_f_v1_int = idx_f_v1_ext + 1
-        idx_f_v2_ext = ((num_segmentos_curva - 1) * num_divisoes_circulo + k) * 2
-        idx_f_v2_int = idx_f_v2_ext + 1
-        faces.append((idx_f_v1_int, idx_f_v1_ext, idx_f_v2_ext))
-        faces.append((idx_f_v1_int, idx_f_v2_ext, idx_f_v2_int))
-
-    return vertices, arestas, faces
+    perfil = perfil_anel(raio, espessura, num_divisoes_circulo)
+
+    # --- 1. Gerar a "espinha" do cano e a direção de avanço de cada anel ---
+    spline = SplineHermite([P0, P1], [T0, T1])
+    pontos_curva, tangentes = spline.amostrar_direcoes(num_segmentos_curva)
+
+    # --- 2. Varrer o anel pela curva, com tampas no início e no fim ---
+    return varrer_perfil(perfil, pontos_curva, tangentes, up=(0.0, 1.0, 0.0), retornar_uvs=retornar_uvs)
 
 # --- Bloco de Execução Principal e Visualização ---
 if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('TkAgg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    from mpl_toolkits.mplot3d import Axes3D
+
     # --- Parâmetros da Curva de Hermite ---
     # Pontos de início e fim do cano
     P0 = np.array([0, 0, 0])
@@ -1,93 +1,43 @@
-import matplotlib
-matplotlib.use('TkAgg')
-import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from mpl_toolkits.mplot3d import Axes3D
+from solidos.varredura import perfil_anel, varrer_perfil
 
-def cano_reto(raio, altura, espessura, num_divisoes=20):
+def cano_reto(raio, altura, espessura, num_divisoes=20, retornar_uvs=False):
     """
-    Modela um cano reto (cilindro oco) alinhado com o eixo Z, usando faces triangulares.
+    Modela um cano reto (cilindro oco) alinhado com o eixo Y, usando faces triangulares.
+
+    É a varredura (solidos/varredura.py) de um perfil de anel ao longo do segmento
+    de (0, 0, 0) a (0, altura, 0), com os círculos no plano XZ.
 
     Args:
         raio (float): O raio externo do cano.
-        comprimento (float): O comprimento do cano ao longo do eixo Z.
+        altura (float): O comprimento do cano ao longo do eixo Y.
         espessura (float): A espessura da parede do cano.
         num_divisoes (int): O número de segmentos para formar os círculos.
+        retornar_uvs (bool): Se True, devolve também as coordenadas de textura
+                             (F, 3, 2): cilíndricas na parede, planares nas tampas.
 
     Returns:
         tuple: Uma tupla contendo (vértices, arestas, faces).
                - vertices: um array NumPy de pontos [x, y, z].
-               - arestas: uma lista de tuplas conectando os índices dos vértices.
-               - faces: uma lista de tuplas definindo as superfícies triangulares.
+               - arestas: um array (E, 2) de índices dos vértices.
+               - faces: um array (F, 3) de índices das superfícies triangulares.
+               Com retornar_uvs=True, seguida das coordenadas de textura.
     """
-    if espessura >= raio:
-        raise ValueError("A espessura deve ser menor que o raio.")
-
-    # Listas para armazenar a geometria
-    vertices = []
-    faces = []
-    arestas = []
-
-    # --- 1. Geração dos Vértices ---
-    raio_interno = raio - espessura
-    angulos = np.linspace(0, 2 * np.pi, num_divisoes, endpoint=False)
-
-    # Vértices do círculo externo no início (z=0) e no fim (z=comprimento)
-    for angulo in angulos:
-        # O círculo agora é formado por X e Z para ficar no "chão"
-        x = raio * np.cos(angulo)
-        z = raio * np.sin(angulo) # MUDANÇA: y -> z
-
-        # A altura agora é aplicada em Y
-        vertices.append([x, 0, z])      # Vértice externo na base (y=0)
-        vertices.append([x, altura, z]) # Vértice externo no topo (y=altura)
-
-        # Vértices internos
-        x_int = raio_interno * np.cos(angulo)
-        z_int = raio_interno * np.sin(angulo) # MUDANÇA: y -> z
-        vertices.append([x_int, 0, z_int])      # Vértice interno na base (y=0)
-        vertices.append([x_int, altura, z_int]) # Vértice interno no topo (y=altura)
-
-    vertices = np.array(vertices)
-
-        # --- 2. Geração das Faces e Arestas (Lógica de indexação não muda) ---
-    for i in range(num_divisoes):
-        j = (i + 1) % num_divisoes
+    pontos, contornos, tampa = perfil_anel(raio, espessura, num_divisoes)
 
-        # Índices dos 4 vértices para o segmento atual (externo e interno)
-        idx_ext_base_i, idx_ext_topo_i = i * 4, i * 4 + 1
-        idx_int_base_i, idx_int_topo_i = i * 4 + 2, i * 4 + 3
-        idx_ext_base_j, idx_ext_topo_j = j * 4, j * 4 + 1
-        idx_int_base_j, idx_int_topo_j = j * 4 + 2, j * 4 + 3
-
-        # Triangulação da superfície externa
-        faces.append((idx_ext_base_i, idx_ext_topo_j, idx_ext_topo_i))
-        faces.append((idx_ext_base_i, idx_ext_base_j, idx_ext_topo_j))
-
-        # Triangulação da superfície interna
-        faces.append((idx_int_base_i, idx_int_topo_i, idx_int_topo_j))
-        faces.append((idx_int_base_i, idx_int_topo_j, idx_int_base_j))
-
-        # Triangulação do anel da base
-        faces.append((idx_ext_base_i, idx_int_base_i, idx_int_base_j))
-        faces.append((idx_ext_base_i, idx_int_base_j, idx_ext_base_j))
-
-        # Triangulação do anel do topo
-        faces.append((idx_ext_topo_i, idx_int_topo_j, idx_int_topo_i))
-        faces.append((idx_ext_topo_i, idx_ext_topo_j, idx_int_topo_j))
-
-        # Arestas
-        arestas.append((idx_ext_base_i, idx_ext_base_j))
-        arestas.append((idx_int_base_i, idx_int_base_j))
-        arestas.append((idx_ext_topo_i, idx_ext_topo_j))
-        arestas.append((idx_int_topo_i, idx_int_topo_j))
-        arestas.append((idx_ext_base_i, idx_ext_topo_i))
-
-    return vertices, arestas, faces
+    # Com o eixo em +Y e a normal em +X, a binormal é -Z; o perfil é espelhado para
+    # que o ângulo gire de X para +Z, como nos círculos do cilindro
+    perfil = (pontos * (1.0, -1.0), contornos, tampa)
+    return varrer_perfil(perfil, [[0.0, 0.0, 0.0], [0.0, altura, 0.0]], up=(1.0, 0.0, 0.0),
+                         retornar_uvs=retornar_uvs)
 
 # --- Bloco de Execução Principal e Visualização ---
 if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('TkAgg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    from mpl_toolkits.mplot3d import Axes3D
+
     # Parâmetros do cano
     raio_cano = 2.5
     altura_cano = 5.0
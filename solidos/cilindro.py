@@ -1,11 +1,6 @@
-import matplotlib
-matplotlib.use('TkAgg')
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from mpl_toolkits.mplot3d import Axes3D
 
-def cilindro(raio, altura, num_divisoes=20):
+def cilindro(raio, altura, num_divisoes=20, retornar_uvs=False):
     """
     Modela um cilindro sólido com orientação Y-Up (Y como altura), usando faces triangulares.
     A base do cilindro está no plano XZ.
@@ -14,14 +9,23 @@ def cilindro(raio, altura, num_divisoes=20):
         raio (float): O raio da base do cilindro.
         altura (float): A altura do cilindro ao longo do eixo Y.
         num_divisoes (int): O número de segmentos para formar a base circular.
+        retornar_uvs (bool): Se True, devolve também as coordenadas de textura por
+                             canto de face (F, 3, 2): cilíndricas na parede (u é a
+                             fração da volta e v a fração da altura, como um rótulo
+                             em volta de um tanque) e planares nas tampas.
 
     Returns:
         tuple: Uma tupla contendo (vértices, arestas, faces).
+               - vertices: um array NumPy (N, 3) de pontos [x, y, z].
+               - arestas: um array (E, 2) de índices dos vértices.
+               - faces: um array (F, 3) de índices das superfícies triangulares.
+               Com retornar_uvs=True, seguida das coordenadas de textura.
     """
     # Listas para armazenar a geometria
     vertices = []
     faces = []
     arestas = []
+    uvs = []
 
     # --- 1. Geração dos Vértices (LÓGICA Y-UP) ---
     # Adicionar os pontos centrais da base (y=0) e do topo (y=altura)
@@ -41,7 +45,7 @@ def cilindro(raio, altura, num_divisoes=20):
         vertices.append([x, 0, z])      # Vértice na borda da base (y=0)
         vertices.append([x, altura, z]) # Vértice na borda do topo (y=altura)
 
-    vertices = np.array(vertices)
+    vertices = np.array(vertices, dtype=float)
 
     # --- 2. Geração das Faces Triangulares e Arestas ---
     # A lógica de indexação permanece a mesma, pois a ordem de criação dos vértices foi mantida.
@@ -57,15 +61,24 @@ def cilindro(raio, altura, num_divisoes=20):
         idx_base_j = 2 + j * 2
         idx_topo_j = 2 + j * 2 + 1
 
-        # Triangulação da parede lateral
-        faces.append((idx_base_i, idx_topo_j, idx_topo_i))
-        faces.append((idx_base_i, idx_base_j, idx_topo_j))
+        # Triangulação da parede lateral (anti-horário visto de fora: normal para fora)
+        faces.append((idx_base_i, idx_topo_i, idx_topo_j))
+        faces.append((idx_base_i, idx_topo_j, idx_base_j))
 
-        # Triangulação da tampa da base (sentido horário para normal apontar para -Y)
-        faces.append((idx_centro_base, idx_base_j, idx_base_i))
+        # Triangulação da tampa da base (de i para j, anti-horário visto de baixo: normal para -Y)
+        faces.append((idx_centro_base, idx_base_i, idx_base_j))
 
-        # Triangulação da tampa do topo (sentido anti-horário para normal apontar para +Y)
-        faces.append((idx_centro_topo, idx_topo_i, idx_topo_j))
+        # Triangulação da tampa do topo (de j para i, anti-horário visto de cima: normal para +Y)
+        faces.append((idx_centro_topo, idx_topo_j, idx_topo_i))
+
+        # Coordenadas de textura de cada canto, na mesma ordem das faces acima
+        u_i, u_j = i / num_divisoes, (i + 1) / num_divisoes
+        tampa_i = (0.5 + 0.5 * np.cos(angulos[i]), 0.5 + 0.5 * np.sin(angulos[i]))
+        tampa_j = (0.5 + 0.5 * np.cos(angulos[j]), 0.5 + 0.5 * np.sin(angulos[j]))
+        uvs.append(((u_i, 0), (u_i, 1), (u_j, 1)))
+        uvs.append(((u_i, 0), (u_j, 1), (u_j, 0)))
+        uvs.append(((0.5, 0.5), tampa_i, tampa_j))
+        uvs.append(((0.5, 0.5), tampa_j, tampa_i))
 
         # Arestas (opcional, para visualização wireframe)
         arestas.append((idx_base_i, idx_base_j))
@@ -74,10 +87,21 @@ def cilindro(raio, altura, num_divisoes=20):
         arestas.append((idx_centro_base, idx_base_i))
         arestas.append((idx_centro_topo, idx_topo_i))
 
+    # Mesmo formato das malhas de solidos/varredura.py
+    arestas = np.array(arestas, dtype=np.int64)
+    faces = np.array(faces, dtype=np.int64)
+    if retornar_uvs:
+        return vertices, arestas, faces, np.array(uvs, dtype=float)
     return vertices, arestas, faces
 
 # --- Bloco de Execução Principal e Visualização ---
 if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('TkAgg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    from mpl_toolkits.mplot3d import Axes3D
+
     # Parâmetros do cilindro
     raio_cilindro = 3.0
     altura_cilindro = 7.0
@@ -92,7 +116,7 @@ if __name__ == '__main__':
     ax: Axes3D = fig.add_subplot(projection='3d')
 
     # Preparar faces para renderização
-    poly3d = [vertices_cilindro[list(face)] for face in faces_cilindro]
+    poly3d = vertices_cilindro[faces_cilindro]
 
     # Adicionar a coleção de polígonos (faces) ao gráfico
     ax.add_collection3d(Poly3DCollection(
@@ -1,18 +1,21 @@
-import matplotlib
-matplotlib.use('TkAgg')
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
-from mpl_toolkits.mplot3d import Axes3D
 
 # Substitua o conteúdo de solidos/paralelepipedo.py por este código:
 
 import numpy as np
 
-def paralelepipedo(largura, altura, profundidade):
+def paralelepipedo(largura, altura, profundidade, retornar_uvs=False):
     """
     Modela um paralelepípedo sólido com um canto na origem, usando faces triangulares.
     Esta é uma versão corrigida e verificada.
+
+    Com retornar_uvs=True, devolve também as coordenadas de textura por canto de
+    face (F, 3, 2), com mapeamento de caixa: cada face recebe a textura inteira,
+    de (0, 0) a (1, 1), sem espelhar quando vista de fora.
+
+    Returns:
+        tuple: (vertices (8, 3), arestas (12, 2), faces (12, 3)) como arrays NumPy,
+               no mesmo formato das malhas de solidos/varredura.py.
     """
     # --- 1. Definição dos 8 Vértices ---
     # Usaremos uma convenção Y-Up (Y representa a altura) para maior clareza.
@@ -36,35 +39,48 @@ def paralelepipedo(largura, altura, profundidade):
         [largura, 0,      0],            # Vértice 5: Trás-Base-Direita
         [0,       altura, 0],            # Vértice 6: Trás-Topo-Esquerda
         [largura, altura, 0]             # Vértice 7: Trás-Topo-Direita
-    ])
+    ], dtype=float)
 
     # --- 2. Geração das Faces a partir de Quadriláteros ---
     # Definimos as 6 faces como quadriláteros com vértices em sentido anti-horário (visto de fora)
     quads = [
         (0, 1, 3, 2), # Face da Frente
         (4, 5, 1, 0), # Face de Baixo
-        (5, 7, 6, 4), # Face de Trás
+        (4, 6, 7, 5), # Face de Trás
         (2, 3, 7, 6), # Face de Cima
         (0, 2, 6, 4), # Face da Esquerda
         (1, 5, 7, 3)  # Face da Direita
     ]
 
     faces = []
+    uvs = []
     for v0, v1, v2, v3 in quads:
         # Divide cada quadrilátero em dois triângulos
         faces.append([v0, v1, v2])
         faces.append([v0, v2, v3])
+        # Os cantos do quadrilátero (anti-horário visto de fora) nos cantos da textura
+        uvs.append([(0, 0), (1, 0), (1, 1)])
+        uvs.append([(0, 0), (1, 1), (0, 1)])
 
     # --- 3. Geração das 12 Arestas ---
-    arestas = [
+    arestas = np.array([
         (0, 1), (0, 2), (0, 4), (1, 3), (1, 5), (2, 3),
         (2, 6), (3, 7), (4, 5), (4, 6), (5, 7), (6, 7)
-    ]
+    ], dtype=np.int64)
 
+    faces = np.array(faces, dtype=np.int64)
+    if retornar_uvs:
+        return vertices, arestas, faces, np.array(uvs, dtype=float)
     return vertices, arestas, faces
 
 # --- Bloco de Execução Principal e Visualização ---
 if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('TkAgg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    from mpl_toolkits.mplot3d import Axes3D
+
     # Parâmetros do paralelepípedo
     largura_caixa = 8.0
     altura_caixa = 3.0
@@ -80,7 +96,7 @@ if __name__ == '__main__':
     ax: Axes3D = fig.add_subplot(projection='3d')
 
     # Preparar faces para renderização
-    poly3d = [vertices_caixa[list(face)] for face in faces_caixa]
+    poly3d = vertices_caixa[faces_caixa]
 
     # Adicionar a coleção de polígonos (faces) ao gráfico
     ax.add_collection3d(Poly3DCollection(
@@ -1,8 +1,4 @@
-import matplotlib
-matplotlib.use('TkAgg')
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 
 def linha_reta(comprimento):
     """
@@ -14,30 +10,35 @@ def linha_reta(comprimento):
     Returns:
         tuple: Uma tupla contendo (vértices, arestas, faces).
                - vertices: um array NumPy de 2 pontos [x, y, z].
-               - arestas: uma lista de 1 tupla conectando os dois vértices.
-               - faces: uma lista vazia, pois uma linha não tem faces.
+               - arestas: um array (1, 2) conectando os dois vértices.
+               - faces: um array (0, 3) vazio, pois uma linha não tem faces.
     """
     # --- 1. Definição dos 2 Vértices (início e fim) ---
     # A origem é fixa em (0, 0, 0) e a linha se estende pelo eixo X.
     vertices = np.array([
         [0, 0, 0],           # Vértice 0: Ponto de início
         [comprimento, 0, 0]  # Vértice 1: Ponto final
-    ])
+    ], dtype=float)
 
     # --- 2. Definição da Aresta ---
     # Apenas uma aresta que conecta o vértice 0 ao vértice 1.
-    arestas = [
+    arestas = np.array([
         (0, 1)
-    ]
+    ], dtype=np.int64)
 
     # --- 3. Faces ---
     # Uma linha não tem área, portanto, não tem faces.
-    faces = []
+    faces = np.zeros((0, 3), dtype=np.int64)
 
     return vertices, arestas, faces
 
 # --- Bloco de Execução Principal e Visualização ---
 if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('TkAgg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D
+
     # Parâmetro da linha
     tamanho_linha = 4
 
@@ -54,7 +55,7 @@ if __name__ == '__main__':
     ax.scatter(vertices_linha[:, 0], vertices_linha[:, 1], vertices_linha[:, 2], color='red', s=100, label='Vértices')
 
     # Desenhar as arestas como linhas azuis
-    for aresta in arestas_linha:
+    for k, aresta in enumerate(arestas_linha):
         # Pega os pontos de início e fim da aresta
         ponto_inicio = vertices_linha[aresta[0]]
         ponto_fim = vertices_linha[aresta[1]]
@@ -62,7 +63,7 @@ if __name__ == '__main__':
         xs = [ponto_inicio[0], ponto_fim[0]]
         ys = [ponto_inicio[1], ponto_fim[1]]
         zs = [ponto_inicio[2], ponto_fim[2]]
-        ax.plot(xs, ys, zs, color='blue', linewidth=3, label='Aresta' if aresta == arestas_linha[0] else "")
+        ax.plot(xs, ys, zs, color='blue', linewidth=3, label='Aresta' if k == 0 else "")
 
     # Configurações do gráfico
     ax.set_xlabel('Eixo X')
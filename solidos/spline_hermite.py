@@ -0,0 +1,302 @@
+import numpy as np
+
+# --- Splines de Hermite em Lote ---
+# Uma spline de Hermite passa por K pontos de controle com uma tangente em cada
+# um; o trecho i (entre os pontos i e i + 1) é a cúbica
+#   C(t) = h00(t) P_i + h10(t) T_i + h01(t) P_i+1 + h11(t) T_i+1,  t em [0, 1].
+# O parâmetro global u vai de 0 a K - 1: a parte inteira escolhe o trecho e a
+# fracionária é o t local.
+#
+# A avaliação é uma única operação sobre arrays: as S amostras viram uma matriz
+# de base (S, 4) (as potências de t vezes MATRIZ_HERMITE) e os controles do
+# trecho de cada amostra um tensor (S, 4, 3); o produto dá as posições e, com
+# as potências derivadas, as primeiras e segundas derivadas analíticas. Várias
+# splines com o mesmo número de pontos, (N, K, 3), são avaliadas juntas.
+#
+# Para anéis (ou quadros de câmera) igualmente espaçados, o comprimento de arco
+# é tabelado uma vez por spline (quadratura de Gauss-Legendre da velocidade em
+# subintervalos de u) e invertido por interpolação na tabela, com um passo de
+# Newton sobre a velocidade analítica.
+
+# Base na forma de potências: [1, t, t², t³] @ MATRIZ_HERMITE = (h00, h10, h01, h11),
+# a mesma ordem dos controles (P_i, T_i, P_i+1, T_i+1)
+MATRIZ_HERMITE = np.array([[1.0, 0.0, 0.0, 0.0],
+                           [0.0, 1.0, 0.0, 0.0],
+                           [-3.0, -2.0, 3.0, -1.0],
+                           [2.0, 1.0, -2.0, 1.0]])
+
+# Abaixo desta fração do comprimento do polígono das amostras, a derivada é
+# considerada nula e a direção de avanço vem da corda (ver direcoes_avanco)
+TOLERANCIA_DIRECAO = 1e-9
+
+# Nós e pesos da quadratura do comprimento de arco (exata para polinômios de
+# grau 9; a velocidade de uma cúbica é a raiz de um polinômio de grau 4)
+_NOS_GAUSS, _PESOS_GAUSS = np.polynomial.legendre.leggauss(5)
+
+def base_hermite(t, derivada=0):
+    """
+    Funções de base de Hermite (ou as suas derivadas) nos parâmetros locais t.
+
+    Args:
+        t (np.array): Parâmetros em [0, 1], de qualquer formato.
+        derivada (int): 0, 1 ou 2.
+
+    Returns:
+        np.array: Formato t.shape + (4,), na ordem (h00, h10, h01, h11).
+    """
+    t = np.asarray(t, dtype=float)
+    um, zero = np.ones_like(t), np.zeros_like(t)
+    if derivada == 0:
+        potencias = (um, t, t * t, t * t * t)
+    elif derivada == 1:
+        potencias = (zero, um, 2 * t, 3 * t * t)
+    elif derivada == 2:
+        potencias = (zero, zero, 2 * um, 6 * t)
+    else:
+        raise ValueError(f"Derivada não suportada: {derivada} (use 0, 1 ou 2).")
+    return np.stack(potencias, axis=-1) @ MATRIZ_HERMITE
+
+def controles_hermite(pontos, tangentes):
+    """
+    Tensor de controle dos trechos de splines que passam pelos pontos.
+
+    Args:
+        pontos (np.array): Pontos de controle (..., K, 3).
+        tangentes (np.array): Tangente em cada ponto, mesmo formato; trechos
+                              vizinhos compartilham a tangente (junção suave).
+
+    Returns:
+        np.array: Controles (..., K - 1, 4, 3), um (P_i, T_i, P_i+1, T_i+1) por trecho.
+    """
+    pontos, tangentes = np.broadcast_arrays(np.asarray(pontos, dtype=float), np.asarray(tangentes, dtype=float))
+    if pontos.shape[-2] < 2:
+        raise ValueError("Uma spline precisa de pelo menos dois pontos de controle.")
+    return np.stack((pontos[..., :-1, :], tangentes[..., :-1, :], pontos[..., 1:, :], tangentes[..., 1:, :]),
+                    axis=-2)
+
+def avaliar_hermite(controles, u, derivadas=0):
+    """
+    Avalia N splines nos parâmetros globais u.
+
+    Args:
+        controles (np.array): Controles (N, S, 4, 3) de controles_hermite.
+        u (np.array): Parâmetros (N, Q) em [0, S] (ou (Q,), os mesmos para todas).
+        derivadas (int): Até qual derivada devolver (0, 1 ou 2).
+
+    Returns:
+        list: [posições, primeiras derivadas, segundas derivadas][:derivadas + 1],
+              cada uma (N, Q, 3); as derivadas são em relação a u.
+    """
+    return _avaliar_ordens(controles, u, range(derivadas + 1))
+
+def _avaliar_ordens(controles, u, ordens):
+    num_trechos = controles.shape[1]
+    u = np.broadcast_to(np.asarray(u, dtype=float), (controles.shape[0], np.shape(u)[-1]))
+    trecho = np.clip(np.floor(u).astype(np.int64), 0, num_trechos - 1)
+    t = u - trecho
+    # Controles do trecho de cada amostra (N, Q, 4, 3), multiplicados pela base (N, Q, 1, 4)
+    controle = np.take_along_axis(controles, trecho[:, :, None, None], axis=1)
+    return [(base_hermite(t, ordem)[:, :, None] @ controle)[:, :, 0] for ordem in ordens]
+
+def direcoes_avanco(pontos, derivadas):
+    """
+    Direção de avanço em cada amostra de uma spline, para orientar anéis e câmeras.
+
+    É a primeira derivada, exceto onde ela se anula: numa ponta com tangente nula
+    (entrada ou saída suave) a derivada é zero, mas a curva segue a direção da
+    segunda derivada, que é o limite da corda até a amostra seguinte (ou desde a
+    anterior, na última amostra).
+
+    Args:
+        pontos (np.array): Amostras (..., Q, 3).
+        derivadas (np.array): Primeiras derivadas nas amostras, mesmo formato.
+
+    Returns:
+        np.array: Direções (..., Q, 3), não normalizadas.
+    """
+    cordas = np.diff(pontos, axis=-2)
+    cordas = np.concatenate((cordas, cordas[..., -1:, :]), axis=-2)
+    escala = np.linalg.norm(cordas, axis=-1).sum(axis=-1, keepdims=True)
+    nula = np.linalg.norm(derivadas, axis=-1) <= TOLERANCIA_DIRECAO * escala
+    return np.where(nula[..., None], cordas, derivadas)
+
+class SplineHermite:
+    """
+    Uma spline de Hermite (pontos (K, 3)) ou um lote de N splines com o mesmo
+    número de pontos (pontos (N, K, 3)), com a tabela de comprimento de arco
+    calculada na primeira vez em que é pedida.
+
+    Uso:
+        spline = SplineHermite(pontos, tangentes)
+        posicoes, derivadas = spline.amostrar(40, derivadas=1)  # igualmente espaçadas
+    """
+
+    def __init__(self, pontos, tangentes, amostras_por_trecho=32):
+        self._lote = np.ndim(pontos) == 3 or np.ndim(tangentes) == 3
+        controles = controles_hermite(pontos, tangentes)
+        self.controles = controles.reshape((-1,) + controles.shape[-3:])
+        self.amostras_por_trecho = amostras_por_trecho
+        self._tabela = None
+
+    @property
+    def num_trechos(self):
+        return self.controles.shape[1]
+
+    def _formatar(self, valores):
+        """Remove a dimensão do lote quando a spline é única."""
+        valores = [v if self._lote else v[0] for v in valores]
+        return valores[0] if len(valores) == 1 else tuple(valores)
+
+    def avaliar(self, u, derivadas=0):
+        """
+        Posições (e derivadas) nos parâmetros globais u, em [0, K - 1].
+
+        Args:
+            u (np.array): (Q,) para todas as splines, ou (N, Q) uma linha por spline.
+            derivadas (int): 0 devolve só as posições; 1 ou 2 devolvem também as
+                             derivadas analíticas em relação a u.
+
+        Returns:
+            np.array ou tuple: (Q, 3) ou (N, Q, 3) cada; uma tupla quando derivadas > 0.
+        """
+        return self._formatar(avaliar_hermite(self.controles, u, derivadas))
+
+    def _velocidade(self, u):
+        return np.linalg.norm(_avaliar_ordens(self.controles, u, (1,))[0], axis=-1)
+
+    def _integrar(self, inicio, fim):
+        """Comprimento de arco (N, Q) de u = inicio até u = fim, por Gauss-Legendre."""
+        meio, meia_largura = (fim + inicio) / 2, (fim - inicio) / 2
+        nos = (meio[..., None] + meia_largura[..., None] * _NOS_GAUSS).reshape(len(meio), -1)
+        velocidade = self._velocidade(nos).reshape(nos.shape[0], -1, len(_NOS_GAUSS))
+        return meia_largura * (velocidade @ _PESOS_GAUSS)
+
+    def tabela_comprimento(self):
+        """
+        Tabela do comprimento de arco acumulado.
+
+        Returns:
+            tuple: (parametros (J + 1,), comprimentos (N, J + 1)), com J =
+                   num_trechos * amostras_por_trecho subintervalos iguais de u.
+        """
+        if self._tabela is None:
+            parametros = np.linspace(0, self.num_trechos, self.num_trechos * self.amostras_por_trecho + 1)
+            inicio = np.broadcast_to(parametros[:-1], (len(self.controles), len(parametros) - 1))
+            trechos = self._integrar(inicio, inicio + (parametros[1] - parametros[0]))
+            comprimentos = np.concatenate((np.zeros((len(trechos), 1)), np.cumsum(trechos, axis=1)), axis=1)
+            self._tabela = (parametros, comprimentos)
+        return self._tabela
+
+    @property
+    def comprimento(self):
+        """Comprimento total: escalar, ou (N,) para um lote."""
+        total = self.tabela_comprimento()[1][:, -1]
+        return total if self._lote else total[0]
+
+    def parametros_por_comprimento(self, s):
+        """
+        Parâmetros u em que o comprimento de arco desde o início vale s.
+
+        Args:
+            s (np.array): Comprimentos (Q,) ou (N, Q); recortados para [0, comprimento].
+
+        Returns:
+            np.array: Parâmetros globais com o mesmo formato de saída de avaliar.
+        """
+        parametros, comprimentos = self.tabela_comprimento()
+        num_splines, num_nos = comprimentos.shape
+        s = np.clip(np.broadcast_to(np.asarray(s, dtype=float), (num_splines, np.shape(s)[-1])),
+                    0, comprimentos[:, -1:])
+        # Uma única interpolação para todo o lote: cada spline vira uma faixa
+        # disjunta do eixo, deslocada de mais que o maior comprimento
+        deslocamento = (np.arange(num_splines) * (comprimentos[:, -1].max() + 1))[:, None]
+        u = np.interp((s + deslocamento).ravel(), (comprimentos + deslocamento).ravel(),
+                      np.tile(parametros, num_splines)).reshape(s.shape)
+
+        # Passo de Newton: corrige o erro da interpolação linear com a velocidade
+        # analítica, sem sair do subintervalo da tabela que contém a solução
+        j = np.clip(np.searchsorted(parametros, u, side='right') - 1, 0, num_nos - 2)
+        no = parametros[j]
+        erro = np.take_along_axis(comprimentos, j, axis=1) + self._integrar(no, u) - s
+        u = np.clip(u - erro / np.maximum(self._velocidade(u), 1e-300), no, parametros[j + 1])
+        return u if self._lote else u[0]
+
+    def parametros_uniformes(self, num_pontos):
+        """Parâmetros de num_pontos amostras igualmente espaçadas em comprimento de arco (pontas incluídas)."""
+        fracoes = np.linspace(0, 1, num_pontos)
+        u = self.parametros_por_comprimento(np.outer(np.atleast_1d(self.comprimento), fracoes))
+        # As pontas são exatas (sem o erro de arredondamento do passo de Newton)
+        u[..., 0], u[..., -1] = 0.0, self.num_trechos
+        return u
+
+    def amostrar(self, num_pontos, derivadas=0, uniforme=True):
+        """
+        Amostra a spline em num_pontos pontos, das pontas inclusive.
+
+        Args:
+            num_pontos (int): Número de amostras.
+            derivadas (int): Como em avaliar.
+            uniforme (bool): True espaça as amostras igualmente em comprimento de
+                             arco; False, igualmente no parâmetro u.
+
+        Returns:
+            np.array ou tuple: Como em avaliar.
+        """
+        u = self.parametros_uniformes(num_pontos) if uniforme else np.linspace(0, self.num_trechos, num_pontos)
+        return self.avaliar(u, derivadas)
+
+    def amostrar_direcoes(self, num_pontos, uniforme=True):
+        """
+        Amostra a spline como amostrar e devolve também a direção de avanço de
+        cada amostra (direcoes_avanco), nunca nula nas pontas de tangente nula.
+
+        Returns:
+            tuple: (pontos, direcoes), (Q, 3) ou (N, Q, 3) cada.
+        """
+        pontos, derivadas = self.amostrar(num_pontos, derivadas=1, uniforme=uniforme)
+        return pontos, direcoes_avanco(pontos, derivadas)
+
+if __name__ == '__main__':
+    import time
+
+    # --- Exatidão das derivadas analíticas e do espaçamento por comprimento de arco ---
+    spline = SplineHermite([[0, 0, 0], [10, 0, 10]], [[15, 0, 0], [0, 15, 0]])
+    u = np.linspace(0, 1, 2001)
+    pontos, d1, d2 = spline.avaliar(u, derivadas=2)
+    passo = u[1] - u[0]
+    erro_d1 = np.abs((pontos[2:] - pontos[:-2]) / (2 * passo) - d1[1:-1]).max()
+    erro_d2 = np.abs((pontos[2:] - 2 * pontos[1:-1] + pontos[:-2]) / passo ** 2 - d2[1:-1]).max()
+    print(f"derivadas analíticas x diferenças centrais: {erro_d1:.1e} (primeira), {erro_d2:.1e} (segunda)")
+    print(f"comprimento: {spline.comprimento:.9f} (polilinha de 2001 pontos: "
+          f"{np.linalg.norm(np.diff(pontos, axis=0), axis=1).sum():.9f})")
+    for uniforme in (False, True):
+        anel = np.linalg.norm(np.diff(spline.amostrar(40, uniforme=uniforme), axis=0), axis=1)
+        print(f"40 anéis {'por comprimento' if uniforme else 'por parâmetro '}: "
+              f"espaçamento de {anel.min():.4f} a {anel.max():.4f}")
+
+    # --- Pontas com tangente nula: a derivada zera, a direção de avanço não ---
+    suave = SplineHermite([[0, 0, 0], [5, 0, 0]], [[0, 0, 0], [0, 0, 0]])
+    _, derivadas_suave = suave.amostrar(10, derivadas=1)
+    _, direcoes_suave = suave.amostrar_direcoes(10)
+    direcoes_suave /= np.linalg.norm(direcoes_suave, axis=1, keepdims=True)
+    print(f"tangentes nulas nas pontas: |derivada| nas pontas {np.linalg.norm(derivadas_suave[[0, -1]], axis=1)}, "
+          f"direções de avanço alinhadas com X: {np.allclose(direcoes_suave, [1, 0, 0])}")
+
+    # --- Lote: 2000 canos, tabela e amostragem uniforme em uma chamada ---
+    gerador = np.random.default_rng(0)
+    num_canos, num_aneis = 2000, 30
+    pontos = np.stack((np.zeros((num_canos, 3)), gerador.uniform(-4, 4, (num_canos, 3))), axis=1)
+    tangentes = gerador.uniform(-8, 8, (num_canos, 2, 3))
+    inicio = time.perf_counter()
+    lote = SplineHermite(pontos, tangentes)
+    caminhos, derivadas_lote = lote.amostrar(num_aneis, derivadas=1)
+    tempo = time.perf_counter() - inicio
+    # Comprimento de arco real entre amostras vizinhas, por uma polilinha densa de cada spline
+    densa = lote.avaliar(np.linspace(0, 1, 4001))
+    arco = np.concatenate((np.zeros((num_canos, 1)),
+                           np.cumsum(np.linalg.norm(np.diff(densa, axis=1), axis=2), axis=1)), axis=1)
+    arco_amostras = np.stack([np.interp(u, np.linspace(0, 1, 4001), a) for u, a in
+                              zip(lote.parametros_uniformes(num_aneis), arco)])
+    desvio = np.abs(np.diff(arco_amostras, axis=1) / (arco[:, -1:] / (num_aneis - 1)) - 1).max()
+    print(f"{num_canos} splines x {num_aneis} amostras uniformes em {tempo * 1000:.0f} ms "
+          f"(desvio máximo do arco entre amostras: {desvio:.3%})")
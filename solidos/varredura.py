@@ -0,0 +1,344 @@
+import numpy as np
+
+import nucleos
+
+# --- Varredura de Perfis (Sweep) ---
+# Um sólido de varredura é um perfil 2D levado ao longo de um caminho 3D: em cada
+# ponto do caminho o perfil é colocado no plano perpendicular à tangente, usando um
+# referencial (normal, binormal), e anéis consecutivos são ligados por faixas de
+# triângulos. As tampas fecham o início e o fim, então a malha sai fechada.
+#
+# Um perfil é a tupla (pontos, contornos, tampa):
+#   - pontos (M, 2): coordenadas (x, y) no plano do perfil; x vai para a normal e
+#     y para a binormal do referencial;
+#   - contornos: lista de arrays de índices em 'pontos', todos no sentido
+#     anti-horário; o primeiro é a borda externa e os demais são furos;
+#   - tampa (T, 3): triângulos anti-horários que cobrem a região do perfil.
+#
+# Tudo é gerado em lote: vários caminhos com o mesmo número de pontos, (P, K, 3),
+# viram uma única chamada, e os índices das faces e arestas saem de operações
+# sobre arrays, sem laços por anel ou por divisão do perfil.
+#
+# As coordenadas de textura são por canto de face, (F, 3, 2), para que a costura
+# (onde u volta de 1 para 0) não exija duplicar vértices: nas paredes, u é a
+# fração do perímetro do contorno e v o comprimento de arco do caminho dividido
+# pelo perímetro externo (texels quadrados; a textura se repete ao longo do
+# cano); nas tampas, u e v são as coordenadas do perfil levadas para [0, 1].
+
+def _area_com_sinal(pontos):
+    """Área com sinal de um polígono 2D (positiva no sentido anti-horário)."""
+    x, y = pontos[:, 0], pontos[:, 1]
+    return 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+
+def _triangular_poligono(pontos):
+    """
+    Triangula um polígono simples anti-horário por remoção de orelhas.
+
+    Returns:
+        np.array: Triângulos (M - 2, 3) com índices em 'pontos'.
+    """
+    restantes = list(range(len(pontos)))
+    triangulos = []
+    while len(restantes) > 3:
+        n = len(restantes)
+        for k in range(n):
+            a, b, c = restantes[k - 1], restantes[k], restantes[(k + 1) % n]
+            ab, ac = pontos[b] - pontos[a], pontos[c] - pontos[a]
+            if ab[0] * ac[1] - ab[1] * ac[0] <= 1e-12:
+                continue  # vértice reflexo ou colinear
+            # Nenhum outro vértice pode estar dentro (ou na borda) da orelha
+            outros = pontos[[i for i in restantes if i not in (a, b, c)]]
+            lados = [(pontos[q] - pontos[p])[0] * (outros[:, 1] - pontos[p][1]) -
+                     (pontos[q] - pontos[p])[1] * (outros[:, 0] - pontos[p][0])
+                     for p, q in ((a, b), (b, c), (c, a))]
+            if np.any((lados[0] >= 0) & (lados[1] >= 0) & (lados[2] >= 0)):
+                continue
+            triangulos.append((a, b, c))
+            del restantes[k]
+            break
+        else:
+            raise ValueError("O contorno do perfil não é um polígono simples.")
+    triangulos.append(tuple(restantes))
+    return np.array(triangulos, dtype=np.int64)
+
+def _tampa_entre_contornos(externo, interno):
+    """Faixa de triângulos entre dois contornos com o mesmo número de pontos (anel, tubo)."""
+    proximo_externo, proximo_interno = np.roll(externo, -1), np.roll(interno, -1)
+    return np.stack((np.column_stack((interno, externo, proximo_externo)),
+                     np.column_stack((interno, proximo_externo, proximo_interno))), axis=1).reshape(-1, 3)
+
+def perfil_circulo(raio, divisoes=20):
+    """Perfil de um círculo cheio (barra redonda)."""
+    angulos = np.linspace(0, 2 * np.pi, divisoes, endpoint=False)
+    pontos = raio * np.column_stack((np.cos(angulos), np.sin(angulos)))
+    contorno = np.arange(divisoes)
+    return pontos, [contorno], _triangular_poligono(pontos)
+
+def perfil_anel(raio, espessura, divisoes=20):
+    """
+    Perfil de um tubo: coroa circular de raio externo 'raio' e parede 'espessura'.
+
+    Os pontos alternam externo e interno em cada ângulo (a ordem dos vértices dos
+    canos de 'solidos').
+    """
+    if espessura >= raio:
+        raise ValueError("A espessura deve ser menor que o raio.")
+    angulos = np.linspace(0, 2 * np.pi, divisoes, endpoint=False)
+    circulo = np.column_stack((np.cos(angulos), np.sin(angulos)))
+    pontos = np.stack((raio * circulo, (raio - espessura) * circulo), axis=1).reshape(-1, 2)
+    externo, interno = np.arange(0, 2 * divisoes, 2), np.arange(1, 2 * divisoes, 2)
+    return pontos, [externo, interno], _tampa_entre_contornos(externo, interno)
+
+def perfil_retangulo(largura, altura, espessura=None):
+    """Perfil retangular centrado na origem; com 'espessura', um tubo retangular."""
+    cantos = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], dtype=float) / 2
+    externo = cantos * (largura, altura)
+    if espessura is None:
+        return externo, [np.arange(4)], _triangular_poligono(externo)
+    if 2 * espessura >= min(largura, altura):
+        raise ValueError("A espessura deve ser menor que metade do menor lado.")
+    interno = cantos * (largura - 2 * espessura, altura - 2 * espessura)
+    return (np.concatenate((externo, interno)), [np.arange(4), np.arange(4, 8)],
+            _tampa_entre_contornos(np.arange(4), np.arange(4, 8)))
+
+def perfil_i(altura, largura_mesa, espessura_alma, espessura_mesa):
+    """Perfil I (viga): duas mesas de largura_mesa ligadas por uma alma, centrado na origem."""
+    if 2 * espessura_mesa >= altura or espessura_alma >= largura_mesa:
+        raise ValueError("As espessuras devem caber na altura e na largura do perfil.")
+    h, b, a = altura / 2, largura_mesa / 2, espessura_alma / 2
+    m = h - espessura_mesa
+    pontos = np.array([[-b, -h], [b, -h], [b, -m], [a, -m], [a, m], [b, m],
+                       [b, h], [-b, h], [-b, m], [-a, m], [-a, -m], [-b, -m]], dtype=float)
+    return pontos, [np.arange(12)], _triangular_poligono(pontos)
+
+def _normalizar(vetores):
+    return vetores / np.maximum(np.linalg.norm(vetores, axis=-1, keepdims=True), 1e-300)
+
+def _escalar(a, b):
+    """Produto escalar no último eixo, somado em ordem fixa (a mesma de nucleos.py)."""
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1] + a[..., 2] * b[..., 2]
+
+def _normais_referencial(caminhos, tangentes, up):
+    """
+    Normal do referencial de cada anel (P, K, 3).
+
+    Com 'up', a normal é o 'up' projetado no plano do anel (trocado pelo eixo X a
+    partir do primeiro anel em que a tangente fica paralela a ele). Sem 'up', usa
+    referenciais de rotação mínima (dupla reflexão de Wang et al.), que não giram
+    em torno do caminho: o laço é só sobre os K anéis, vetorizado nos P caminhos
+    (no backend 'numba' de nucleos.py, um caminho por thread).
+    """
+    if up is not None:
+        up = np.broadcast_to(np.asarray(up, dtype=float), tangentes.shape)
+        paralela = np.isclose(np.abs(np.einsum('pki,pki->pk', tangentes, up)), 1.0)
+        paralela = np.logical_or.accumulate(paralela, axis=1)
+        up = np.where(paralela[..., None], np.array([1.0, 0.0, 0.0]), up)
+        return _normalizar(up - np.einsum('pki,pki->pk', up, tangentes)[..., None] * tangentes)
+
+    # Normal inicial: o eixo menos alinhado com a primeira tangente, ortogonalizado
+    t0 = tangentes[:, 0]
+    eixo = np.eye(3)[np.argmin(np.abs(t0), axis=1)]
+    normais = np.empty_like(tangentes)
+    normais[:, 0] = _normalizar(eixo - np.einsum('pi,pi->p', eixo, t0)[:, None] * t0)
+    nucleo = nucleos.nucleo('transportar_normais')
+    if nucleo is not None:
+        nucleo(caminhos, tangentes, normais)
+        return normais
+    for k in range(caminhos.shape[1] - 1):
+        # Reflete o referencial no plano bissetor do passo e depois no das tangentes
+        v1 = caminhos[:, k + 1] - caminhos[:, k]
+        c1 = np.maximum(_escalar(v1, v1), 1e-300)[:, None]
+        r = normais[:, k] - 2 / c1 * _escalar(v1, normais[:, k])[:, None] * v1
+        t = tangentes[:, k] - 2 / c1 * _escalar(v1, tangentes[:, k])[:, None] * v1
+        v2 = tangentes[:, k + 1] - t
+        c2 = _escalar(v2, v2)[:, None]
+        normais[:, k + 1] = _normalizar(r - np.where(c2 > 1e-24, 2 / np.maximum(c2, 1e-300), 0.0)
+                                        * _escalar(v2, r)[:, None] * v2)
+    return normais
+
+def _indices_varredura(perfil, num_aneis, tampas=True):
+    """
+    Faces e arestas de um caminho de num_aneis anéis (índices do anel k começam em k * M).
+
+    Cada quadrilátero da parede é cortado pela diagonal que liga o ponto j do anel
+    k ao ponto j + 1 do anel k + 1; os furos e os perfis espelhados (contorno
+    externo horário) têm o enrolamento invertido, para que as normais apontem
+    sempre para fora do material.
+    """
+    pontos, contornos, tampa = perfil
+    pontos = np.asarray(pontos).reshape((-1,) + np.shape(pontos)[-2:])[0]
+    num_pontos = len(pontos)
+    espelhado = _area_com_sinal(pontos[contornos[0]]) < 0
+    inicio_aresta = np.concatenate(contornos)
+    fim_aresta = np.concatenate([np.roll(contorno, -1) for contorno in contornos])
+    inverter = np.concatenate([np.full(len(contorno), (c > 0) != espelhado) for c, contorno in enumerate(contornos)])
+
+    base = (np.arange(num_aneis - 1) * num_pontos)[:, None]
+    a, b = base + inicio_aresta, base + fim_aresta
+    a_prox, b_prox = a + num_pontos, b + num_pontos
+    normal = np.stack((np.stack((a, b_prox, a_prox), axis=-1), np.stack((a, b, b_prox), axis=-1)), axis=2)
+    invertida = np.stack((np.stack((a, a_prox, b_prox), axis=-1), np.stack((a, b_prox, b), axis=-1)), axis=2)
+    faces = [np.where(inverter[None, :, None, None], invertida, normal).reshape(-1, 3)]
+    if tampas:
+        # A tampa do fim olha para a frente do caminho e a do início para trás
+        inicio, fim = tampa[:, ::-1], tampa + (num_aneis - 1) * num_pontos
+        faces += [inicio[:, ::-1], fim[:, ::-1]] if espelhado else [inicio, fim]
+
+    # Arestas: o contorno de cada anel e as linhas longitudinais da borda externa
+    aneis = (np.arange(num_aneis) * num_pontos)[:, None, None] + np.column_stack((inicio_aresta, fim_aresta))
+    longitudinais = np.stack((base + contornos[0], base + contornos[0] + num_pontos), axis=-1)
+    arestas = np.concatenate((aneis.reshape(-1, 2), longitudinais.reshape(-1, 2)))
+    return np.concatenate(faces), arestas
+
+def _uvs_varredura(perfil, pontos_perfil, caminhos, faces, num_paredes):
+    """
+    Coordenadas de textura (P, F, 3, 2) por canto das faces locais de cada caminho.
+    """
+    _, contornos, _ = perfil
+    num_pontos = pontos_perfil.shape[1]
+    anel, ponto = faces // num_pontos, faces % num_pontos
+
+    # u: fração do perímetro de cada contorno (do primeiro perfil: a topologia é a mesma)
+    u = np.zeros(num_pontos)
+    for contorno in contornos:
+        lados = np.linalg.norm(pontos_perfil[0, np.roll(contorno, -1)] - pontos_perfil[0, contorno], axis=1)
+        u[contorno] = np.concatenate(([0.0], np.cumsum(lados)[:-1])) / lados.sum()
+    u = u[ponto]
+    # Na costura os cantos de uma mesma face ficam a mais de meia volta: os do início ganham 1
+    u += (u < 0.5) & (u.max(axis=1, keepdims=True) - u.min(axis=1, keepdims=True) > 0.5)
+
+    externo = contornos[0]
+    perimetro = np.linalg.norm(pontos_perfil[:, np.roll(externo, -1)] - pontos_perfil[:, externo], axis=2).sum(axis=1)
+    arco = np.concatenate((np.zeros((len(caminhos), 1)),
+                           np.cumsum(np.linalg.norm(np.diff(caminhos, axis=1), axis=2), axis=1)), axis=1)
+    v = arco[:, anel] / perimetro[:, None, None]
+    uvs = np.stack((np.broadcast_to(u, v.shape), v), axis=-1)
+
+    # Tampas: projeção planar do perfil, centrada na caixa envolvente
+    minimo, maximo = pontos_perfil.min(axis=1), pontos_perfil.max(axis=1)
+    lado = np.maximum((maximo - minimo).max(axis=1), 1e-12)
+    planar = (pontos_perfil - ((minimo + maximo) / 2)[:, None]) / lado[:, None, None] + 0.5
+    uvs[:, num_paredes:] = planar[:, ponto[num_paredes:]]
+    return uvs
+
+def varrer_perfil(perfil, caminhos, tangentes=None, escalas=1.0, up=None, tampas=True, retornar_uvs=False):
+    """
+    Varre um perfil ao longo de um ou vários caminhos e devolve uma única malha.
+
+    Sem tangentes, cada caminho é uma polilinha: nos pontos internos o anel fica no
+    plano bissetor dos dois segmentos e é esticado na direção da dobra (junta em
+    meia-esquadria), de forma que as paredes dos dois segmentos continuam retas
+    até a junta (cotovelos em gomos). Com tangentes (ex.: derivadas de uma curva),
+    cada anel fica perpendicular à sua tangente.
+
+    Args:
+        perfil (tuple): (pontos, contornos, tampa), ver o cabeçalho do módulo. Os
+                        pontos podem ser (P, M, 2), um perfil por caminho com a
+                        mesma topologia (ex.: canos de raios diferentes).
+        caminhos (np.array): Pontos (K, 3) de um caminho ou (P, K, 3) de P caminhos.
+        tangentes (np.array): Tangentes com o mesmo formato, ou None.
+        escalas (float ou np.array): Escala do perfil em cada anel, (K,) ou (P, K);
+                                     varia o diâmetro ao longo do caminho (reduções).
+        up (tuple): Vetor de referência das normais; None usa referenciais de
+                    rotação mínima.
+        tampas (bool): Fecha o início e o fim de cada caminho.
+        retornar_uvs (bool): Se True, devolve também as coordenadas de textura por
+                             canto de face (F, 3, 2) (ver o cabeçalho do módulo).
+
+    Returns:
+        tuple: (vertices (P*K*M, 3), arestas (E, 2), faces (F, 3)); os vértices e
+               as faces de cada caminho são contíguos e na ordem dos caminhos.
+               Com retornar_uvs=True, seguidos das coordenadas de textura.
+    """
+    pontos_perfil = np.asarray(perfil[0], dtype=float)
+    pontos_perfil = pontos_perfil.reshape((-1,) + pontos_perfil.shape[-2:])
+    caminhos = np.asarray(caminhos, dtype=float)
+    caminhos = caminhos.reshape((-1,) + caminhos.shape[-2:])
+    num_caminhos, num_aneis = caminhos.shape[:2]
+    if num_aneis < 2:
+        raise ValueError("Cada caminho precisa de pelo menos dois pontos.")
+
+    segmentos = _normalizar(np.diff(caminhos, axis=1))
+    meia_esquadria = tangentes is None
+    if meia_esquadria:
+        tangentes = np.concatenate((segmentos[:, :1], segmentos[:, :-1] + segmentos[:, 1:], segmentos[:, -1:]), axis=1)
+    tangentes = _normalizar(np.broadcast_to(np.asarray(tangentes, dtype=float), caminhos.shape))
+
+    normais = _normais_referencial(caminhos, tangentes, up)
+    binormais = np.cross(tangentes, normais)
+    deslocamentos = (pontos_perfil[:, None, :, 0, None] * normais[:, :, None] +
+                     pontos_perfil[:, None, :, 1, None] * binormais[:, :, None])
+    if meia_esquadria and num_aneis > 2:
+        # O anel da junta é a seção do segmento anterior cortada pelo plano
+        # bissetor: estica de 1 / cos(meio ângulo) a componente na direção da dobra
+        dobra = segmentos[:, 1:] - segmentos[:, :-1]
+        dobra -= np.einsum('pki,pki->pk', dobra, tangentes[:, 1:-1])[..., None] * tangentes[:, 1:-1]
+        dobra = np.where(np.linalg.norm(dobra, axis=-1, keepdims=True) > 1e-12, _normalizar(dobra), 0.0)
+        cosseno = np.einsum('pki,pki->pk', tangentes[:, 1:-1], segmentos[:, :-1])
+        esticar = (1 / np.maximum(cosseno, 1e-6) - 1)[..., None, None]
+        internos = deslocamentos[:, 1:-1]
+        internos += esticar * np.einsum('pkmi,pki->pkm', internos, dobra)[..., None] * dobra[:, :, None]
+    escalas = np.broadcast_to(np.asarray(escalas, dtype=float), (num_caminhos, num_aneis))
+    vertices = caminhos[:, :, None] + escalas[..., None, None] * deslocamentos
+
+    faces, arestas = _indices_varredura(perfil, num_aneis, tampas)
+    deslocamento_indices = (np.arange(num_caminhos) * num_aneis * pontos_perfil.shape[1])[:, None, None]
+    malha = (vertices.reshape(-1, 3), (arestas[None] + deslocamento_indices).reshape(-1, 2),
+             (faces[None] + deslocamento_indices).reshape(-1, 3))
+    if retornar_uvs:
+        num_paredes = 2 * (num_aneis - 1) * sum(len(contorno) for contorno in perfil[1])
+        return malha + (_uvs_varredura(perfil, pontos_perfil, caminhos, faces, num_paredes).reshape(-1, 3, 2),)
+    return malha
+
+def arestas_sem_par(faces):
+    """
+    Número de arestas orientadas (a, b) sem exatamente uma aresta oposta (b, a).
+    Zero indica uma malha fechada (estanque) com enrolamento consistente.
+    """
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    origem, destino = faces.ravel(), np.roll(faces, -1, axis=1).ravel()
+    maximo = max(int(faces.max()) + 1, 1) if len(faces) else 1
+    diretas, contagem_diretas = np.unique(origem * maximo + destino, return_counts=True)
+    opostas = np.unique(destino * maximo + origem)
+    return int(np.count_nonzero(~np.isin(diretas, opostas)) + np.count_nonzero(contagem_diretas > 1))
+
+if __name__ == '__main__':
+    import time
+    import matplotlib
+    matplotlib.use('TkAgg')
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+    from solidos.cano_curvo import caminho_hermite
+    from solidos.spline_hermite import SplineHermite
+
+    # --- Rede de tubulação: milhares de trechos curvos em uma chamada ---
+    gerador = np.random.default_rng(0)
+    num_canos, num_aneis = 2000, 30
+    P1 = gerador.uniform(-4, 4, (num_canos, 3))
+    T0, T1 = gerador.uniform(-8, 8, (2, num_canos, 3))
+    inicio = time.perf_counter()
+    caminhos = SplineHermite(np.stack((np.zeros((num_canos, 3)), P1), axis=1),
+                             np.stack((T0, T1), axis=1)).amostrar(num_aneis, uniforme=False)
+    vertices, arestas, faces = varrer_perfil(perfil_anel(0.5, 0.1, 12), caminhos)
+    tempo = time.perf_counter() - inicio
+    print(f"{num_canos} canos x {num_aneis - 1} trechos: {len(vertices)} vértices, {len(faces)} faces "
+          f"em {tempo * 1000:.0f} ms; arestas sem par: {arestas_sem_par(faces)}")
+
+    # --- Exemplos: cotovelo em gomos, redução, viga I sobre curvas de Hermite ---
+    cotovelo = varrer_perfil(perfil_anel(1.0, 0.2, 24), [[0, 0, 0], [0, 0, 4], [0.6, 0, 6.2], [2.2, 0, 7.8],
+                                                        [4.4, 0, 8.4], [8, 0, 8.4]])
+    reducao = varrer_perfil(perfil_anel(1.0, 0.15, 24), np.linspace([12, 0, 0], [12, 0, 8], 12),
+                            escalas=np.interp(np.linspace(0, 1, 12), [0, 0.4, 0.6, 1], [1, 1, 0.6, 0.6]))
+    viga = varrer_perfil(perfil_i(1.2, 0.8, 0.12, 0.12),
+                         caminho_hermite([[-2, 6, 0], [4, 8, 3], [10, 6, 6]], [[8, 0, 2], [6, 2, 4], [6, -4, 2]], 16),
+                         up=(0, 0, 1))
+    for nome, (v, a, f) in (('cotovelo', cotovelo), ('redução', reducao), ('viga I', viga)):
+        print(f"{nome:<9}{len(v):>6} vértices {len(f):>6} faces, arestas sem par: {arestas_sem_par(f)}")
+
+    fig = plt.figure(figsize=(12, 9))
+    ax = fig.add_subplot(projection='3d')
+    for (v, _, f), cor in ((cotovelo, 'deepskyblue'), (reducao, 'lightgreen'), (viga, 'gray')):
+        ax.add_collection3d(Poly3DCollection(v[f], facecolors=cor, edgecolors='black', linewidths=0.2))
+    ax.set_xlim(-3, 14); ax.set_ylim(-6, 11); ax.set_zlim(-2, 15)
+    ax.set_title('Sólidos de Varredura: cotovelo, redução e viga I')
+    plt.show()
@@ -0,0 +1,159 @@
+import numpy as np
+
+from camera import Camera
+from buffer_profundidade import projetar_vertices, rasterizar_triangulos, faces_na_frente
+from iluminacao import normais_malha
+from perfil import etapa
+
+# --- Mapas de Sombra para a Luz Direcional ---
+# A luz direcional de iluminacao.py ilumina todas as faces voltadas para ela, mesmo
+# as que estão atrás de outro objeto. O MapaSombra rasteriza a cena só em
+# profundidade, do ponto de vista da luz: uma Camera ortográfica (matriz_visao +
+# matriz_projecao_ortografica) enquadrando a esfera envolvente da cena, com o
+# buffer de profundidade em float32. No passo principal, cada pixel visível é
+# levado de volta ao mundo (a partir do seu z), projetado na câmera da luz e
+# comparado com o mapa; o PCF faz a média do teste em uma janela de texels ao
+# redor, suavizando o serrilhado da borda das sombras.
+#
+# O passo da luz usa as mesmas peças do passo principal: o recorte pelo frustum
+# com as esferas envolventes das faces (Camera.esferas_no_frustum, como em
+# vistas.py), faces_na_frente e rasterizar_triangulos, cujas caixas envolventes
+# já descartam o que cai fora do mapa. Ele não sombreia nem grava cor e só
+# rasteriza as faces de costas para a luz (sólidos fechados, enrolamento
+# anti-horário visto de fora): o mapa guarda a face de trás de cada objeto, o que
+# elimina a "acne" das faces iluminadas testando contra si mesmas e corta pela
+# metade os triângulos rasterizados. As faces de costas para a luz já não recebem
+# a luz difusa, então não perdem nada com isso.
+#
+# Medições e imagens com e sem sombras: python demo_sombras.py
+
+class MapaSombra:
+    """
+    Mapa de profundidade de uma luz direcional sobre uma cena.
+
+    O mapa só depende da cena e da luz: pode ser reaproveitado em todos os quadros
+    em que só a câmera se move (passe-o como sombras= em rasterizar_quadro).
+
+    Args:
+        vertices (np.array): Vértices (N, 3) da cena.
+        faces (np.array): Faces (F, 3).
+        direcao_luz (tuple): Direção *para onde* a luz aponta (como em iluminar).
+        res (int): Resolução (res x res) do mapa.
+        margem (float): Folga do enquadramento em relação à esfera envolvente.
+    """
+
+    def __init__(self, vertices, faces, direcao_luz=(-0.3, -0.5, -1.0), res=512, margem=1.02):
+        vertices = np.asarray(vertices, dtype=float)
+        faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+        self.res = res
+        self.direcao_luz = np.asarray(direcao_luz, dtype=float) / np.linalg.norm(direcao_luz)
+
+        # --- 1. Câmera ortográfica da luz enquadrando a esfera envolvente ---
+        centro = (vertices.min(axis=0) + vertices.max(axis=0)) / 2
+        raio = max(np.linalg.norm(vertices - centro, axis=1).max(), 1e-9) * margem
+        up = np.eye(3)[np.argmin(np.abs(self.direcao_luz))]
+        self.camera = Camera(centro - 2 * raio * self.direcao_luz, centro, up, near=raio * 0.5,
+                             far=raio * 3.5, projecao='ortografica', meia_altura=raio)
+        # Tamanho de um texel e de uma unidade de profundidade NDC no mundo
+        self.texel = 2 * raio / (res - 1)
+        self.escala_z = 2 / (self.camera.far - self.camera.near)
+
+        # --- 2. Passo só de profundidade ---
+        with etapa('mapa_sombra', entrada=len(faces)) as e:
+            tri = vertices[faces]
+            centros = tri.mean(axis=1)
+            raios = np.linalg.norm(tri - centros[:, None], axis=2).max(axis=1)
+            pontos, z, w = projetar_vertices(vertices, self.camera.visao_projecao, res, res)
+            validos = self.camera.esferas_no_frustum(centros, raios) & faces_na_frente(w, faces)
+            # Área com sinal no mapa: negativa para as faces de costas para a luz
+            a, b = pontos[faces[:, 1]] - pontos[faces[:, 0]], pontos[faces[:, 2]] - pontos[faces[:, 0]]
+            validos &= a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0] < 0
+            self.profundidade, _ = rasterizar_triangulos(pontos, z, faces, res, res, validos=validos,
+                                                         dtype=np.float32)
+            e.saida = int(np.count_nonzero(validos))
+
+    def visibilidade(self, pontos, normais=None, janela_pcf=3, vies=1.0):
+        """
+        Fração da luz que chega a cada ponto (0 = na sombra, 1 = iluminado).
+
+        Args:
+            pontos (np.array): Pontos (K, 3) no mundo.
+            normais (np.array, opcional): Normais (K, 3), para o viés proporcional
+                                          à inclinação da superfície em relação à luz.
+            janela_pcf (int): Lado da janela de texels do PCF (1 = teste simples).
+            vies (float): Viés da comparação, em texels.
+
+        Returns:
+            np.array: Visibilidade (K,) em [0, 1].
+        """
+        pontos_luz, z, _ = projetar_vertices(pontos, self.camera.visao_projecao, self.res, self.res)
+        # O viés cresce com a inclinação: um texel cobre mais profundidade em superfícies rasantes
+        tangente = 1.0
+        if normais is not None:
+            cosseno = np.clip(-(np.asarray(normais, dtype=float) @ self.direcao_luz), 0.1, 1.0)
+            tangente = 1.0 + np.sqrt(1 - cosseno ** 2) / cosseno
+        z = (z - vies * self.texel * tangente * self.escala_z).astype(np.float32)
+
+        base = np.rint(pontos_luz).astype(np.int64)
+        raio = janela_pcf // 2
+        iluminados = np.zeros(len(z))
+        for dy in range(-raio, raio + 1):
+            for dx in range(-raio, raio + 1):
+                x, y = base[:, 0] + dx, base[:, 1] + dy
+                dentro = (x >= 0) & (x < self.res) & (y >= 0) & (y < self.res)
+                # Fora do mapa não há oclusor registrado: iluminado
+                profundidade = np.full(len(z), np.inf, dtype=np.float32)
+                profundidade[dentro] = self.profundidade[y[dentro], x[dentro]]
+                iluminados += z <= profundidade
+        return iluminados / janela_pcf ** 2
+
+def posicoes_pixels(buffer_z, pixels, mat_transform):
+    """
+    Leva pixels do buffer de profundidade de volta ao mundo (inverso de projetar_vertices).
+
+    Args:
+        buffer_z (np.array): Buffer (altura, largura) com a profundidade NDC.
+        pixels (np.array): Índices lineares (K,) dos pixels (y * largura + x).
+        mat_transform (np.array): Matriz de visão-projeção usada na rasterização.
+
+    Returns:
+        np.array: Pontos (K, 3) no mundo.
+    """
+    altura, largura = buffer_z.shape
+    ndc = np.empty((len(pixels), 4))
+    ndc[:, 0] = (pixels % largura) / (largura - 1) * 2 - 1
+    ndc[:, 1] = (pixels // largura) / (altura - 1) * 2 - 1
+    ndc[:, 2] = buffer_z.reshape(-1)[pixels]
+    ndc[:, 3] = 1.0
+    mundo = ndc @ np.linalg.inv(mat_transform).T
+    return mundo[:, :3] / mundo[:, 3:]
+
+def aplicar_sombras(framebuffer, buffer_face, buffer_z, mat_transform, vertices, faces, cores_sombra, mapa,
+                    janela_pcf=3):
+    """
+    Escurece os pixels visíveis conforme a visibilidade no mapa de sombra.
+
+    O framebuffer já tem as cores iluminadas; cada pixel é interpolado entre elas
+    e cores_sombra (as mesmas faces só com a luz ambiente) pela visibilidade.
+
+    Args:
+        framebuffer (np.array): Imagem (altura, largura, 3) já sombreada.
+        buffer_face, buffer_z (np.array): Buffers do passo principal.
+        mat_transform (np.array): Visão-projeção do passo principal.
+        vertices, faces: Malha da cena.
+        cores_sombra (np.array): Cores (F, 3) das faces sem a luz direcional.
+        mapa (MapaSombra): Mapa de sombra da luz.
+        janela_pcf (int): Lado da janela do PCF.
+
+    Returns:
+        int: Número de pixels com alguma sombra.
+    """
+    pixels = np.flatnonzero(buffer_face.reshape(-1) >= 0)
+    f = buffer_face.reshape(-1)[pixels]
+    normais_faces, _ = normais_malha(vertices, faces)
+    visivel = mapa.visibilidade(posicoes_pixels(buffer_z, pixels, mat_transform), normais_faces[f], janela_pcf)
+    sombreados = visivel < 1
+    pixels, f, visivel = pixels[sombreados], f[sombreados], visivel[sombreados, None]
+    destino = framebuffer.reshape(-1, 3)
+    destino[pixels] = cores_sombra[f] + visivel * (destino[pixels] - cores_sombra[f])
+    return len(pixels)
@@ -38,37 +38,8 @@ def aplicar_transformacao(vertices, matriz):
     return vertices_transformados[:, :3]
 
 # --- NOVA FUNÇÃO: Matriz de Visualização (Câmera) ---
-def matriz_visualizacao(eye, at, up):
-    """
-    Calcula a Matriz de Visualização (View Matrix) usando o algoritmo Look-At.
-    """
-    # Passo 1: Calcular a base vetorial do novo sistema (eixos da câmera)
-    # Eixo Z da câmera (aponta do alvo para a câmera)
-    z_cam = eye - at
-    z_cam = z_cam / np.linalg.norm(z_cam)
-
-    # Eixo X da câmera (perpendicular ao Z da câmera e ao 'up' do mundo)
-    x_cam = np.cross(up, z_cam)
-    x_cam = x_cam / np.linalg.norm(x_cam)
-
-    # Eixo Y da câmera (perpendicular aos eixos X e Z da câmera)
-    y_cam = np.cross(z_cam, x_cam)
-
-    # Passo 2: Construir a matriz de transformação
-    # A matriz é composta por uma rotação e uma translação
-    # A rotação alinha os eixos do mundo com os da câmera
-    rotacao = np.array([
-        [x_cam[0], x_cam[1], x_cam[2], 0],
-        [y_cam[0], y_cam[1], y_cam[2], 0],
-        [z_cam[0], z_cam[1], z_cam[2], 0],
-        [0, 0, 0, 1]
-    ])
-
-    # A translação move o mundo para que a posição 'eye' da câmera fique na origem
-    translacao = matriz_translacao(-eye[0], -eye[1], -eye[2])
-
-    # A matriz de visualização final é a combinação das duas
-    return rotacao @ translacao
+# A matriz de visualização é a mesma de camera.py (antes duplicada aqui)
+from camera import matriz_visao as matriz_visualizacao
 
 # --- SESSÃO 3: Composição da Cena (Inalterada) ---
 
@@ -0,0 +1,280 @@
+import numpy as np
+
+# --- Texturas com Mipmaps ---
+# Os geradores de 'solidos' devolvem, com retornar_uvs=True, as coordenadas de
+# textura de cada canto de face (F, 3, 2): por canto e não por vértice, para que a
+# costura de cilindros e canos (u voltando de 1 para 0) não exija duplicar vértices.
+# rasterizar_quadro(..., uvs=..., texturas={material: Textura(imagem)}) aplica as
+# texturas às faces opacas desses materiais:
+# 1. As coordenadas de cada pixel são interpoladas com correção de perspectiva:
+#    as baricêntricas de tela são pesadas por 1/w de cada vértice, como u/w e v/w
+#    variam linearmente na tela.
+# 2. A mesma interpolação nos pixels vizinhos (x+1, y) e (x, y+1), com o plano do
+#    mesmo triângulo, dá as derivadas de (u, v) na tela e daí o nível de detalhe.
+# 3. A Textura guarda a pirâmide de mipmaps (cada nível é a média 2x2 do anterior),
+#    calculada uma vez; a amostragem bilinear ou trilinear é feita em lote, com um
+#    laço só sobre os níveis presentes no quadro.
+# A iluminação e as sombras são calculadas com a cor base branca para essas faces
+# e a amostra da textura multiplica o resultado, então Lambert, Blinn-Phong e o
+# mapa de sombra continuam valendo sem mudanças.
+#
+# Medições e imagens com cada filtro: python demo_texturas.py
+
+FILTROS = ('vizinho', 'bilinear', 'trilinear')
+
+class Textura:
+    """
+    Imagem RGB com a pirâmide de mipmaps pré-calculada.
+
+    Args:
+        imagem (np.array): Imagem (H, W, 3) com valores em [0, 1]; a linha 0 é v = 0
+                           (a base da imagem, como no framebuffer).
+        repetir (bool): Endereçamento fora de [0, 1]: repete a textura (True) ou
+                        estende a borda (False).
+    """
+
+    def __init__(self, imagem, repetir=True):
+        nivel = np.asarray(imagem, dtype=np.float32)[..., :3]
+        self.repetir = repetir
+        self.niveis = [nivel]
+        while max(nivel.shape[:2]) > 1:
+            # Dimensão ímpar: a última linha/coluna é repetida (ou dá a volta) antes da média 2x2
+            altura, largura = nivel.shape[:2]
+            modo = 'wrap' if repetir else 'edge'
+            nivel = np.pad(nivel, ((0, altura % 2), (0, largura % 2), (0, 0)), mode=modo)
+            nivel = nivel.reshape(nivel.shape[0] // 2, 2, nivel.shape[1] // 2, 2, 3).mean(axis=(1, 3))
+            self.niveis.append(nivel)
+        self.media = self.niveis[-1].reshape(3).astype(float)
+
+    @property
+    def tamanho(self):
+        """(largura, altura) do nível 0."""
+        return self.niveis[0].shape[1], self.niveis[0].shape[0]
+
+    def _enderecar(self, indices, tamanho):
+        return indices % tamanho if self.repetir else np.clip(indices, 0, tamanho - 1)
+
+    def _vizinho(self, nivel, uv):
+        imagem = self.niveis[nivel]
+        altura, largura = imagem.shape[:2]
+        x = self._enderecar(np.floor(uv[:, 0] * largura).astype(np.int64), largura)
+        y = self._enderecar(np.floor(uv[:, 1] * altura).astype(np.int64), altura)
+        return imagem[y, x]
+
+    def _bilinear(self, nivel, uv):
+        imagem = self.niveis[nivel]
+        altura, largura = imagem.shape[:2]
+        # Centros dos texels em (i + 0.5) / tamanho
+        x, y = uv[:, 0] * largura - 0.5, uv[:, 1] * altura - 0.5
+        x0, y0 = np.floor(x), np.floor(y)
+        fx, fy = (x - x0)[:, None], (y - y0)[:, None]
+        x0, y0 = x0.astype(np.int64), y0.astype(np.int64)
+        x1, y1 = self._enderecar(x0 + 1, largura), self._enderecar(y0 + 1, altura)
+        x0, y0 = self._enderecar(x0, largura), self._enderecar(y0, altura) * largura
+        y1 = y1 * largura
+        texels = imagem.reshape(-1, 3)
+        baixo = texels[y0 + x0] * (1 - fx) + texels[y0 + x1] * fx
+        cima = texels[y1 + x0] * (1 - fx) + texels[y1 + x1] * fx
+        return baixo * (1 - fy) + cima * fy
+
+    def amostrar(self, uv, lod=None, filtro='trilinear'):
+        """
+        Amostra a textura em lote.
+
+        Args:
+            uv (np.array): Coordenadas (K, 2).
+            lod (np.array, opcional): Nível de detalhe (K,) (log2 de texels por
+                                      pixel); None amostra o nível 0.
+            filtro (str): 'vizinho' (nível 0, texel mais próximo, sem mipmap),
+                          'bilinear' (nível mais próximo do lod, bilinear) ou
+                          'trilinear' (bilinear nos dois níveis vizinhos e
+                          interpolação linear entre eles).
+
+        Returns:
+            np.array: Cores (K, 3).
+        """
+        uv = np.asarray(uv, dtype=float)
+        if filtro == 'vizinho':
+            return self._vizinho(0, uv)
+        if filtro not in FILTROS:
+            raise ValueError(f"Filtro de textura desconhecido: {filtro!r} (use um de {FILTROS})")
+        ultimo = len(self.niveis) - 1
+        lod = np.zeros(len(uv)) if lod is None else np.clip(lod, 0.0, ultimo)
+        nivel = np.rint(lod).astype(np.int64) if filtro == 'bilinear' else np.floor(lod).astype(np.int64)
+        cores = np.empty((len(uv), 3), dtype=np.float32)
+        for n in np.unique(nivel).tolist():
+            selecao = np.flatnonzero(nivel == n)
+            amostra = self._bilinear(n, uv[selecao])
+            if filtro == 'trilinear' and n < ultimo:
+                t = (lod[selecao] - n)[:, None]
+                amostra = amostra + t * (self._bilinear(n + 1, uv[selecao]) - amostra)
+            cores[selecao] = amostra
+        return cores
+
+def planos_perspectiva(pontos_tela, w, faces, uvs):
+    """
+    Coeficientes dos planos de tela de (u/w, v/w, 1/w) de cada face: as três
+    grandezas são afins em (x, y) na tela, então cada uma vale c + cx*x + cy*y.
+
+    Returns:
+        np.array: Coeficientes (F, 3, 3): [face, (u/w, v/w, 1/w), (c, cx, cy)].
+    """
+    tri = pontos_tela[faces]
+    inv_w = 1.0 / w[faces]
+    d1, d2 = tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inv_area = 1.0 / (d1[:, 0] * d2[:, 1] - d2[:, 0] * d1[:, 1])
+        # Baricêntricas de tela b1 e b2 como funções afins de (x, y)
+        b1 = np.stack((d2[:, 0] * tri[:, 0, 1] - d2[:, 1] * tri[:, 0, 0], d2[:, 1], -d2[:, 0]), axis=1)
+        b2 = np.stack((d1[:, 1] * tri[:, 0, 0] - d1[:, 0] * tri[:, 0, 1], -d1[:, 1], d1[:, 0]), axis=1)
+        b1, b2 = b1 * inv_area[:, None], b2 * inv_area[:, None]
+    b0 = np.array([1.0, 0.0, 0.0]) - b1 - b2
+    baricentricas = np.stack((b0, b1, b2), axis=1)
+    # Cada vértice contribui com (u/w, v/w, 1/w)
+    valores = np.concatenate((np.asarray(uvs, dtype=float), np.ones(faces.shape + (1,))), axis=2) * inv_w[..., None]
+    return np.einsum('fiq,fic->fqc', valores, baricentricas)
+
+def coordenadas_pixels(pixels, faces_pixels, planos, largura):
+    """
+    Coordenadas de textura e derivadas na tela dos pixels visíveis.
+
+    Args:
+        pixels (np.array): Índices lineares (K,) dos pixels (y * largura + x).
+        faces_pixels (np.array): Face visível (K,) em cada pixel.
+        planos (np.array): Saída de planos_perspectiva.
+        largura (int): Largura da tela.
+
+    Returns:
+        tuple: (uv (K, 2), duv_dx (K, 2), duv_dy (K, 2)); as derivadas são as
+               diferenças até os pixels (x+1, y) e (x, y+1) no plano da mesma face.
+    """
+    coeficientes = planos[faces_pixels]
+    px, py = (pixels % largura).astype(float), (pixels // largura).astype(float)
+    valor = coeficientes[:, :, 0] + coeficientes[:, :, 1] * px[:, None] + coeficientes[:, :, 2] * py[:, None]
+    uv = valor[:, :2] / valor[:, 2:]
+    vizinho_x = valor + coeficientes[:, :, 1]
+    vizinho_y = valor + coeficientes[:, :, 2]
+    return uv, vizinho_x[:, :2] / vizinho_x[:, 2:] - uv, vizinho_y[:, :2] / vizinho_y[:, 2:] - uv
+
+def nivel_detalhe(duv_dx, duv_dy, tamanho):
+    """
+    log2 do maior passo em texels (do nível 0) entre pixels vizinhos, a métrica
+    usual de escolha do mipmap.
+    """
+    escala = np.asarray(tamanho, dtype=float)
+    passo = np.maximum(np.linalg.norm(duv_dx * escala, axis=1), np.linalg.norm(duv_dy * escala, axis=1))
+    return np.log2(np.maximum(passo, 1e-12))
+
+def validar_texturas(texturas):
+    """
+    Confere que cada material aponta para uma Textura (a pirâmide de mipmaps é
+    calculada uma vez, ao criá-la, e não a cada quadro).
+    """
+    for material, textura in texturas.items():
+        if not isinstance(textura, Textura):
+            raise ValueError(f"A textura de {material!r} deve ser uma Textura (crie Textura(imagem) uma vez "
+                             f"e reaproveite-a entre quadros), não {type(textura).__name__}.")
+
+def faces_texturizadas(cores_faces, texturas):
+    """
+    Índice (F,) da textura de cada face em list(texturas), ou -1 sem textura.
+    """
+    nomes, indice = np.unique(np.asarray(cores_faces), return_inverse=True)
+    materiais = list(texturas)
+    tabela = np.array([materiais.index(nome) if nome in texturas else -1 for nome in nomes.tolist()],
+                      dtype=np.int64)
+    return tabela[indice.reshape(-1)]
+
+def cores_base_texturizadas(cores_rgb, cores_faces, texturas, opacas=None):
+    """
+    Cores de material para a iluminação: branco nas faces opacas com textura (a
+    amostra é multiplicada depois) e a cor média da textura nas transparentes,
+    que são compostas sem amostrar a textura.
+
+    Returns:
+        np.array: Cópia de cores_rgb (F, 3) ajustada.
+    """
+    indice = faces_texturizadas(cores_faces, texturas)
+    cores_rgb = np.array(cores_rgb, dtype=float)
+    medias = np.array([textura.media for textura in texturas.values()]).reshape(-1, 3)
+    com_textura = indice >= 0
+    cores_rgb[com_textura] = medias[indice[com_textura]]
+    if opacas is None:
+        opacas = np.ones(len(cores_rgb), dtype=bool)
+    cores_rgb[com_textura & opacas] = 1.0
+    return cores_rgb
+
+def aplicar_texturas(framebuffer, buffer_face, pontos_tela, w, faces, uvs, cores_faces, texturas,
+                     filtro='trilinear'):
+    """
+    Multiplica os pixels visíveis das faces com textura pela amostra da textura.
+
+    O framebuffer deve ter sido sombreado com cores_base_texturizadas (branco
+    nessas faces).
+
+    Args:
+        framebuffer (np.array): Imagem (altura, largura, 3).
+        buffer_face (np.array): Buffer (altura, largura) de faces visíveis (-1 = fundo).
+        pontos_tela, w: Saída de projetar_vertices.
+        faces (np.array): Faces (F, 3).
+        uvs (np.array): Coordenadas de textura (F, 3, 2).
+        cores_faces (list): Material de cada face.
+        texturas (dict): material -> Textura.
+        filtro (str): Ver Textura.amostrar.
+
+    Returns:
+        int: Número de pixels texturizados.
+    """
+    largura = buffer_face.shape[1]
+    indice = faces_texturizadas(cores_faces, texturas)
+    pixels = np.flatnonzero(buffer_face.reshape(-1) >= 0)
+    f = buffer_face.reshape(-1)[pixels]
+    com_textura = indice[f] >= 0
+    pixels, f = pixels[com_textura], f[com_textura]
+    if len(pixels) == 0:
+        return 0
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    usadas = np.unique(f)
+    planos = np.empty((len(faces), 3, 3))
+    planos[usadas] = planos_perspectiva(pontos_tela, w, faces[usadas], np.asarray(uvs)[usadas])
+    uv, duv_dx, duv_dy = coordenadas_pixels(pixels, f, planos, largura)
+    destino = framebuffer.reshape(-1, 3)
+    for i, textura in enumerate(texturas.values()):
+        selecao = np.flatnonzero(indice[f] == i)
+        if len(selecao) == 0:
+            continue
+        lod = nivel_detalhe(duv_dx[selecao], duv_dy[selecao], textura.tamanho)
+        destino[pixels[selecao]] *= textura.amostrar(uv[selecao], lod, filtro)
+    return len(pixels)
+
+# --- Texturas Procedurais (rótulos e padrões de isolamento) ---
+
+def textura_listras(cor, res=256, periodo=16, cor_listra=(0.1, 0.1, 0.1), largura_listra=0.5):
+    """Listras diagonais (como as faixas de advertência de revestimentos), repetíveis."""
+    y, x = np.mgrid[0:res, 0:res]
+    listra = ((x + y) % periodo) < periodo * largura_listra
+    return np.where(listra[..., None], np.asarray(cor_listra, dtype=float), np.asarray(cor, dtype=float))
+
+def textura_xadrez(cor, res=256, casas=8, cor_escura=(0.25, 0.25, 0.25)):
+    """Xadrez com casas x casas quadrados."""
+    y, x = np.mgrid[0:res, 0:res] * casas // res
+    return np.where(((x + y) % 2 == 0)[..., None], np.asarray(cor, dtype=float), np.asarray(cor_escura, dtype=float))
+
+def textura_rotulo(cor, res=256, cor_fundo=(0.95, 0.95, 0.95), cor_texto=(0.05, 0.05, 0.05), semente=0):
+    """
+    Rótulo: uma faixa clara em volta do objeto com linhas de "texto" (blocos de
+    tamanhos aleatórios, como caracteres vistos de longe) sobre a cor do material.
+    """
+    gerador = np.random.default_rng(semente)
+    imagem = np.empty((res, res, 3))
+    imagem[:] = cor
+    faixa = slice(int(res * 0.35), int(res * 0.65))
+    imagem[faixa] = cor_fundo
+    altura_linha = max(res // 32, 2)
+    for linha in range(int(res * 0.38), int(res * 0.62) - altura_linha, 2 * altura_linha):
+        x = res // 16
+        while x < res - res // 16:
+            largura = int(gerador.integers(2, 6)) * max(res // 128, 1)
+            imagem[linha:linha + altura_linha, x:x + largura] = cor_texto
+            x += largura + max(res // 128, 1) * (1 + 3 * (gerador.random() < 0.2))
+    return imagem
@@ -0,0 +1,167 @@
+import numpy as np
+
+from buffer_profundidade import gerar_fragmentos
+
+# --- Transparência Independente de Ordem (OIT) ---
+# As faces opacas passam pelo z-buffer normalmente; as transparentes geram
+# fragmentos que são testados contra a profundidade opaca e compostos sobre o
+# framebuffer sem gravar profundidade.
+#
+# - 'oit': Weighted Blended OIT (McGuire & Bavoil, 2013). Cada fragmento soma
+#   cor*alfa*peso e alfa*peso em dois acumuladores por pixel e multiplica a
+#   "revelação" por (1 - alfa). Soma e produto são comutativos, então os lotes de
+#   fragmentos podem chegar em qualquer ordem: a memória extra é fixa (4 floats
+#   de acumulação + 1 de revelação por pixel) e não há ordenação global. O peso
+#   decresce com a profundidade para que a superfície mais próxima domine.
+# - 'ordenada': referência exata. Guarda todos os fragmentos transparentes,
+#   ordena por (pixel, z) e aplica o operador "over" de frente para trás. A
+#   memória cresce com o número de fragmentos.
+#
+# Os materiais da cena são as cores das faces, então a transparência é dada por
+# um dicionário {nome_da_cor: alfa}.
+
+MODOS = ('oit', 'ordenada')
+
+def alfas_faces(cores_faces, alfas):
+    """
+    Alfa de cada face.
+
+    Args:
+        cores_faces (list): Nome da cor (material) de cada face.
+        alfas (dict ou np.array): {nome_da_cor: alfa} (cores ausentes são opacas)
+                                  ou um array (F,) com o alfa de cada face.
+
+    Returns:
+        np.array: Alfas (F,) em [0, 1].
+    """
+    if isinstance(alfas, dict):
+        nomes, indice_cor = np.unique(np.asarray(cores_faces), return_inverse=True)
+        alfa_nome = np.array([alfas.get(nome, 1.0) for nome in nomes], dtype=float)
+        return np.clip(alfa_nome[indice_cor.reshape(-1)], 0.0, 1.0)
+    return np.clip(np.asarray(alfas, dtype=float).reshape(-1), 0.0, 1.0)
+
+def peso_profundidade(z, alfa, reversa=False):
+    """
+    Peso do Weighted Blended OIT (equação 10 de McGuire & Bavoil), com a
+    profundidade NDC z levada para a janela [0, 1] (0 no near).
+    """
+    z_janela = 1 - z if reversa else (z + 1) * 0.5
+    return alfa * np.clip(3e3 * (1 - z_janela) ** 3, 1e-2, 3e3)
+
+def _fragmentos_transparentes(pontos_tela, profundidade, faces, cores, buffer_z, validos, reversa=False):
+    """
+    Gera, em lotes, os fragmentos transparentes à frente da superfície opaca.
+
+    Yields:
+        tuple: (pixel, face, z, cor (n, 3)).
+    """
+    altura, largura = buffer_z.shape
+    z_opaco = buffer_z.reshape(-1)
+    for pixel, f, z, bar in gerar_fragmentos(pontos_tela, profundidade, faces, largura, altura, validos):
+        if reversa:
+            dentro = (z >= 0) & (z <= 1)
+            dentro[dentro] = z[dentro] > z_opaco[pixel[dentro]]
+        else:
+            dentro = (z >= -1) & (z <= 1)
+            dentro[dentro] = z[dentro] < z_opaco[pixel[dentro]]
+        pixel, f, z, bar = pixel[dentro], f[dentro], z[dentro], bar[dentro]
+        if pixel.size == 0:
+            continue
+        if cores.ndim == 2:
+            cor = cores[f]
+        else:
+            cor = np.einsum('ij,ijk->ik', bar, cores[f])
+        yield pixel, f, z, cor
+
+def compor_oit_ponderado(framebuffer, buffer_z, pontos_tela, profundidade, faces, cores, alfas, validos=None,
+                         reversa=False):
+    """
+    Compõe as faces transparentes sobre o framebuffer com Weighted Blended OIT.
+
+    Args:
+        framebuffer (np.array): Imagem (altura, largura, 3) já com as faces opacas.
+        buffer_z (np.array): Profundidade (altura, largura) das faces opacas.
+        pontos_tela, profundidade (np.array): Saída de projetar_vertices.
+        faces (np.array): Array (F, 3) de índices.
+        cores (np.array): (F, 3) para flat ou (F, 3, 3) para Gouraud.
+        alfas (np.array): Alfa (F,) de cada face.
+        validos (np.array, opcional): Máscara (F,) das faces transparentes a compor.
+        reversa (bool): Profundidade em Z reverso (ver camera.matriz_projecao_perspectiva).
+
+    Returns:
+        dict: 'fragmentos' compostos e 'bytes_buffers' (memória dos acumuladores).
+    """
+    num_pixels = buffer_z.size
+    acumulado = np.zeros((num_pixels, 4))
+    log_revelacao = np.zeros(num_pixels)
+    fragmentos = 0
+
+    for pixel, f, z, cor in _fragmentos_transparentes(pontos_tela, profundidade, faces, cores, buffer_z,
+                                                      validos, reversa):
+        alfa = alfas[f]
+        peso = peso_profundidade(z, alfa, reversa)
+        for canal in range(3):
+            acumulado[:, canal] += np.bincount(pixel, weights=cor[:, canal] * peso, minlength=num_pixels)
+        acumulado[:, 3] += np.bincount(pixel, weights=peso, minlength=num_pixels)
+        # A revelação é o produto de (1 - alfa); somar logaritmos mantém tudo em bincount
+        log_revelacao += np.bincount(pixel, weights=np.log1p(-alfa), minlength=num_pixels)
+        fragmentos += pixel.size
+
+    # --- Composição final: média ponderada das cores sobre o fundo opaco ---
+    revelacao = np.exp(log_revelacao)[:, None]
+    media = acumulado[:, :3] / np.maximum(acumulado[:, 3:], 1e-5)
+    destino = framebuffer.reshape(-1, 3)
+    destino[:] = media * (1 - revelacao) + destino * revelacao
+    return {'fragmentos': fragmentos, 'bytes_buffers': acumulado.nbytes + log_revelacao.nbytes}
+
+def compor_ordenado(framebuffer, buffer_z, pontos_tela, profundidade, faces, cores, alfas, validos=None,
+                    reversa=False):
+    """
+    Compõe as faces transparentes ordenando todos os fragmentos por pixel e
+    profundidade (resultado exato, usado como referência para o modo 'oit').
+
+    Args e Returns: os mesmos de compor_oit_ponderado; 'bytes_buffers' é a
+    memória dos fragmentos guardados para a ordenação.
+    """
+    lotes = list(_fragmentos_transparentes(pontos_tela, profundidade, faces, cores, buffer_z, validos, reversa))
+    if not lotes:
+        return {'fragmentos': 0, 'bytes_buffers': 0}
+    pixel = np.concatenate([lote[0] for lote in lotes])
+    alfa = alfas[np.concatenate([lote[1] for lote in lotes])]
+    z = np.concatenate([lote[2] for lote in lotes])
+    cor = np.concatenate([lote[3] for lote in lotes])
+    bytes_fragmentos = pixel.nbytes + alfa.nbytes + z.nbytes + cor.nbytes
+
+    # --- Ordenação de frente para trás dentro de cada pixel ---
+    ordem = np.lexsort((-z if reversa else z, pixel))
+    pixel, alfa, cor = pixel[ordem], alfa[ordem], cor[ordem]
+
+    # Transmitância antes de cada fragmento: produto de (1 - alfa) dos fragmentos
+    # mais próximos do mesmo pixel (soma acumulada de logaritmos por segmento)
+    log_transmissao = np.log1p(-np.minimum(alfa, 1 - 1e-7))
+    acumulado = np.cumsum(log_transmissao)
+    inicio = np.ones(pixel.size, dtype=bool)
+    inicio[1:] = pixel[1:] != pixel[:-1]
+    base = (acumulado - log_transmissao)[inicio]
+    segmento = np.cumsum(inicio) - 1
+    transmissao = np.exp(acumulado - log_transmissao - base[segmento])
+
+    num_pixels = buffer_z.size
+    contribuicao = cor * (alfa * transmissao)[:, None]
+    soma = np.stack([np.bincount(pixel, weights=contribuicao[:, canal], minlength=num_pixels)
+                     for canal in range(3)], axis=1)
+    revelacao = np.exp(np.bincount(pixel, weights=log_transmissao, minlength=num_pixels))[:, None]
+    destino = framebuffer.reshape(-1, 3)
+    destino[:] = soma + destino * revelacao
+    return {'fragmentos': int(pixel.size), 'bytes_buffers': bytes_fragmentos + ordem.nbytes}
+
+def compor_transparentes(framebuffer, buffer_z, pontos_tela, profundidade, faces, cores, alfas, validos=None,
+                         modo='oit', reversa=False):
+    """Despacha para compor_oit_ponderado ('oit') ou compor_ordenado ('ordenada')."""
+    if modo == 'oit':
+        return compor_oit_ponderado(framebuffer, buffer_z, pontos_tela, profundidade, faces, cores, alfas, validos,
+                                    reversa)
+    if modo == 'ordenada':
+        return compor_ordenado(framebuffer, buffer_z, pontos_tela, profundidade, faces, cores, alfas, validos,
+                               reversa)
+    raise ValueError(f"Modo de transparência desconhecido: {modo!r} (use um de {MODOS})")
@@ -0,0 +1,200 @@
+import time
+import numpy as np
+
+from camera import Camera
+from mundo import compor_cena
+from buffer_profundidade import rasterizar_triangulos
+from iluminacao import cores_sombreadas, sombrear_framebuffer
+from rasterizacao import cores_rgb_faces, rasterizar_linhas, rasterizar_quadro
+from perfil import etapa
+
+# --- Vistas de Engenharia em Várias Viewports ---
+# As revisões de projeto usam as vistas clássicas (frontal, superior, lateral) em
+# projeção ortográfica e uma isométrica, todas da mesma cena. Em vez de rodar o
+# pipeline inteiro uma vez por vista, rasterizar_vistas:
+# - transforma os vértices uma única vez para todas as câmeras (uma multiplicação
+#   pela concatenação das K matrizes de visão-projeção);
+# - recorta as faces contra os K frustums em um único teste vetorizado e, no
+#   mesmo passo, descarta as faces de costas para cada câmera (back-face culling);
+# - converte as cores dos materiais uma vez;
+# e só então rasteriza cada vista na sua viewport de um framebuffer comum.
+#
+# A rasterização domina o custo e não pode ser compartilhada entre vistas; o
+# ganho sobre K chamadas de rasterizar_quadro vem sobretudo do descarte das
+# faces de costas, que corta pela metade os triângulos rasterizados. Ele supõe
+# sólidos fechados com enrolamento anti-horário visto de fora (a mesma convenção
+# das normais de iluminacao.py).
+
+VISTAS = {
+    # nome: (direção do alvo para a câmera, up, projeção)
+    'frontal': ((0.0, -1.0, 0.0), (0.0, 0.0, 1.0), 'ortografica'),
+    'superior': ((0.0, 0.0, 1.0), (0.0, 1.0, 0.0), 'ortografica'),
+    'lateral': ((1.0, 0.0, 0.0), (0.0, 0.0, 1.0), 'ortografica'),
+    'isometrica': ((1.0, -1.0, 1.0), (0.0, 0.0, 1.0), 'ortografica'),
+    'obliqua': ((0.0, -1.0, 0.0), (0.0, 0.0, 1.0), 'obliqua'),
+}
+
+# Terceiro diedro: a superior acima da frontal e a lateral direita ao lado dela
+DISPOSICAO_PADRAO = ('superior', 'isometrica', 'frontal', 'lateral')
+
+def cameras_engenharia(vertices, nomes=DISPOSICAO_PADRAO, margem=1.05):
+    """
+    Cria as câmeras das vistas de engenharia enquadrando toda a cena.
+
+    Args:
+        vertices (np.array): Vértices (N, 3) da cena, usados para a esfera envolvente.
+        nomes (tuple): Vistas de VISTAS, na ordem das viewports.
+        margem (float): Folga do enquadramento em relação à esfera envolvente.
+
+    Returns:
+        list: Uma Camera por vista.
+    """
+    vertices = np.asarray(vertices, dtype=float)
+    centro = (vertices.min(axis=0) + vertices.max(axis=0)) / 2
+    raio = np.linalg.norm(vertices - centro, axis=1).max()
+    distancia = 3 * raio
+
+    cameras = []
+    for nome in nomes:
+        direcao, up, projecao = VISTAS[nome]
+        direcao = np.asarray(direcao) / np.linalg.norm(direcao)
+        camera = Camera(centro + distancia * direcao, centro, up, near=distancia - 1.01 * raio,
+                        far=distancia + 1.01 * raio, projecao=projecao)
+        meia_altura = raio * margem
+        if projecao == 'obliqua':
+            # O cisalhamento desloca os pontos até fator * raio na tela
+            angulo = np.radians(camera.angulo_obliquo)
+            meia_altura += raio * camera.fator_obliquo * max(abs(np.cos(angulo)), abs(np.sin(angulo)))
+        camera.meia_altura = meia_altura
+        cameras.append(camera)
+    return cameras
+
+def rasterizar_vistas(vertices_cena, faces_cena, cores_faces, vertices_linha, arestas_linha, cameras, res,
+                      colunas=2, sombreamento='flat', direcao_luz=(-0.3, -0.5, -1.0), descartar_costas=True):
+    """
+    Rasteriza a cena vista por várias câmeras em um único framebuffer, com uma
+    viewport (res x res) por câmera dispostas em uma grade.
+
+    Sem descartar_costas, cada viewport é igual ao rasterizar_quadro da sua
+    câmera com o mesmo sombreamento; a transformação, o recorte e a conversão de
+    cores são feitos uma única vez para todas.
+
+    Args:
+        cameras (list): Câmeras (Camera) das viewports, da esquerda para a direita
+                        e de cima para baixo.
+        res (int): Resolução de cada viewport.
+        colunas (int): Viewports por linha da grade.
+        sombreamento (str): 'flat', 'gouraud' ou None (cores dos materiais sem luz).
+        descartar_costas (bool): Descarta as faces de costas para a câmera. Em sólidos
+                                 fechados o resultado só muda em empates de
+                                 profundidade entre superfícies coincidentes.
+
+    Returns:
+        np.array: Framebuffer RGB (linhas * res, colunas * res, 3) com valores em
+                  [0, 1]; a linha 0 é a base da imagem (exibir com origin='lower').
+    """
+    num_vistas = len(cameras)
+    linhas = -(-num_vistas // colunas)
+    framebuffer = np.zeros((linhas * res, colunas * res, 3))
+    vertices = np.asarray(vertices_cena, dtype=float)
+    faces_array = np.asarray(faces_cena, dtype=np.int64).reshape(-1, 3)
+
+    # --- 1. Uma Transformação para Todas as Vistas ---
+    with etapa('transformacao_visao', entrada=len(vertices) * num_vistas):
+        # (4, 4K): as K matrizes transpostas lado a lado; o resultado é (N, K, 4)
+        matrizes = np.concatenate([camera.visao_projecao.T for camera in cameras], axis=1)
+        v_clip = (np.hstack((vertices, np.ones((len(vertices), 1)))) @ matrizes).reshape(-1, num_vistas, 4)
+        v_clip_linha = (np.hstack((vertices_linha, np.ones((len(vertices_linha), 1)))) @ matrizes
+                        ).reshape(-1, num_vistas, 4)
+
+    # --- 2. Um Recorte para Todas as Vistas ---
+    with etapa('recorte', entrada=len(faces_array) * num_vistas) as e:
+        tri = vertices[faces_array]
+        centros = tri.mean(axis=1)
+        raios = np.linalg.norm(tri - centros[:, None], axis=2).max(axis=1)
+        planos = np.concatenate([camera.planos_frustum for camera in cameras])
+        distancias = (centros @ planos[:, :3].T + planos[:, 3]).reshape(-1, num_vistas, 6)
+        visiveis = (distancias >= -raios[:, None, None]).all(axis=2)
+        # Como em faces_na_frente: todos os vértices à frente da câmera (w > 0)
+        visiveis &= (v_clip[faces_array, :, 3] > 0).all(axis=1)
+        if descartar_costas:
+            # Área com sinal do triângulo projetado: positiva quando ele aparece no
+            # sentido anti-horário, isto é, de frente para a câmera
+            with np.errstate(divide='ignore', invalid='ignore'):
+                xy = (v_clip[:, :, :2] / v_clip[:, :, 3:])[faces_array]
+            a, b = xy[:, 1] - xy[:, 0], xy[:, 2] - xy[:, 0]
+            visiveis &= a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0] > 0
+        e.saida = int(np.count_nonzero(visiveis))
+
+    with etapa('sombreamento', entrada=len(faces_array)):
+        cores_rgb = cores_rgb_faces(cores_faces)
+
+    # --- 3. Rasterizar Cada Viewport ---
+    for k, camera in enumerate(cameras):
+        if sombreamento is None:
+            cores = cores_rgb
+        else:
+            # O termo especular depende do observador, então a luz é avaliada por vista
+            with etapa('sombreamento', entrada=len(faces_array)):
+                cores = cores_sombreadas(vertices, faces_array, cores_rgb, camera.posicao, direcao_luz,
+                                         sombreamento=sombreamento)
+        with etapa('projecao', entrada=len(vertices)):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                v_cn = v_clip[:, k, :3] / v_clip[:, k, 3:]
+            pontos = (v_cn[:, :2] + 1) / 2 * (res - 1)
+        with etapa('rasterizacao', entrada=int(np.count_nonzero(visiveis[:, k]))) as e:
+            buffer_z, buffer_face = rasterizar_triangulos(pontos, v_cn[:, 2], faces_array, res, res,
+                                                          validos=visiveis[:, k], reversa=camera.reversa,
+                                                          dtype=np.float32 if camera.reversa else np.float64)
+            viewport = np.zeros((res, res, 3))
+            sombrear_framebuffer(viewport, buffer_face, pontos, faces_array, cores)
+            rasterizar_linhas(viewport, v_clip_linha[:, k], arestas_linha)
+            e.saida = int(np.count_nonzero(buffer_face >= 0))
+
+        # A primeira linha da grade fica no topo da imagem (linhas altas do array)
+        y0 = (linhas - 1 - k // colunas) * res
+        x0 = (k % colunas) * res
+        framebuffer[y0:y0 + res, x0:x0 + res] = viewport
+
+    return framebuffer
+
+if __name__ == '__main__':
+    import matplotlib
+    matplotlib.use('TkAgg')
+    import matplotlib.pyplot as plt
+
+    cena = compor_cena()
+    cameras = cameras_engenharia(cena[0])
+    res = 400
+
+    # --- Comparação: uma chamada com quatro viewports x quatro rasterizar_quadro ---
+    def quatro_quadros():
+        return [rasterizar_quadro(*cena, None, None, None, res, sombreamento='flat', camera=camera)
+                for camera in cameras]
+
+    tempos = {}
+    for nome, funcao in (('4x rasterizar_quadro', quatro_quadros),
+                         ('vistas sem descarte', lambda: rasterizar_vistas(*cena, cameras, res,
+                                                                           descartar_costas=False)),
+                         ('rasterizar_vistas', lambda: rasterizar_vistas(*cena, cameras, res))):
+        funcao()
+        medidas = []
+        for _ in range(5):
+            inicio = time.perf_counter()
+            funcao()
+            medidas.append(time.perf_counter() - inicio)
+        tempos[nome] = min(medidas)
+        print(f"{nome:<24}{tempos[nome] * 1000:>10.1f} ms")
+    for nome in ('vistas sem descarte', 'rasterizar_vistas'):
+        print(f"ganho de {nome:<15}{tempos['4x rasterizar_quadro'] / tempos[nome]:>10.2f}x")
+
+    framebuffer = rasterizar_vistas(*cena, cameras, res)
+    fig, ax = plt.subplots(figsize=(10, 10))
+    ax.imshow(framebuffer, origin='lower')
+    for k, nome in enumerate(DISPOSICAO_PADRAO):
+        ax.text((k % 2) * res + 8, (1 - k // 2) * res + res - 8, nome, color='white', va='top')
+    ax.axhline(res - 0.5, color='white', linewidth=1)
+    ax.axvline(res - 0.5, color='white', linewidth=1)
+    ax.set_xticks([]); ax.set_yticks([])
+    ax.set_title("Vistas de Engenharia (projeção ortográfica)")
+    plt.show()